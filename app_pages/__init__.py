@@ -0,0 +1,58 @@
+"""Pages of the app, run by st.navigation in main.py.
+
+Each page is a small script under this directory that renders one
+component with the shared resources below. Page modules are imported on
+first visit, so the login screen never loads pandas or plotly.
+"""
+import os
+import importlib
+
+import streamlit as st
+from database.db_manager import DatabaseManager
+from utils import profiler
+
+PAGES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Page title -> (script, icon, short label for the mobile nav)
+PAGES = {
+    "Dashboard": ("dashboard.py", "🏠", "Home"),
+    "Expenses": ("expenses.py", "💰", "Expense"),
+    "Dates": ("dates.py", "📅", "Dates"),
+    "Budget Tracker": ("budget.py", "📊", "Budget"),
+    "Friends": ("friends.py", "👥", "Friends"),
+    "Analytics": ("analytics.py", "📈", "Stats"),
+    "Profile": ("profile.py", "👤", "Profile"),
+}
+
+
+def page(title: str) -> st.Page:
+    """The st.Page of a page title, usable for navigation and st.page_link."""
+    script, icon, _ = PAGES[title]
+    return st.Page(os.path.join(PAGES_DIR, script), title=title, icon=icon, default=title == "Dashboard")
+
+
+def all_pages() -> list:
+    return [page(title) for title in PAGES]
+
+
+def login_page() -> st.Page:
+    return st.Page(os.path.join(PAGES_DIR, "login.py"), title="Login", default=True)
+
+
+@st.cache_resource
+def get_db() -> DatabaseManager:
+    """One DatabaseManager per process; building one runs the schema DDL."""
+    return DatabaseManager()
+
+
+def load_page(module_name: str, function_name: str):
+    """Import a page module on first use and return its render function."""
+    module = importlib.import_module(module_name)
+    # Wrap render_* functions in profile sections when OSCAR_PROFILE is set
+    profiler.instrument_module(module)
+    return getattr(module, function_name)
+
+
+def render_page(module_name: str, function_name: str):
+    """Render a page component for the logged-in user."""
+    load_page(module_name, function_name)(st.session_state.user, get_db())
@@ -0,0 +1,4 @@
+"""Analytics page."""
+from app_pages import render_page
+
+render_page("components.analytics", "render_analytics")
@@ -0,0 +1,4 @@
+"""Budget Tracker page."""
+from app_pages import render_page
+
+render_page("components.budget", "render_budget")
@@ -0,0 +1,4 @@
+"""Dashboard page."""
+from app_pages import render_page
+
+render_page("components.dashboard", "render_dashboard")
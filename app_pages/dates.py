@@ -0,0 +1,4 @@
+"""Dates page."""
+from app_pages import render_page
+
+render_page("components.dates", "render_dates")
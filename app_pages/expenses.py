@@ -0,0 +1,4 @@
+"""Expenses page."""
+from app_pages import render_page
+
+render_page("components.expenses", "render_expenses")
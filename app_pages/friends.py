@@ -0,0 +1,4 @@
+"""Friends page."""
+from app_pages import render_page
+
+render_page("components.friends", "render_friends")
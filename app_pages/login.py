@@ -0,0 +1,4 @@
+"""Login and registration page."""
+from app_pages import load_page
+
+load_page("components.auth", "render_auth")()
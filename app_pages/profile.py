@@ -0,0 +1,4 @@
+"""Profile page."""
+from app_pages import render_page
+
+render_page("components.profile", "render_profile")
@@ -1,6 +1,15 @@
 """Authentication modules."""
-from .authentication import AuthManager
-from .email_service import EmailService
-import sqlite3
+import importlib
 
-__all__ = ['AuthManager', 'EmailService']
\ No newline at end of file
+_EXPORTS = {
+    'AuthManager': 'authentication',
+    'EmailService': 'email_service',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,13 +1,20 @@
 """Authentication manager."""
-import bcrypt
 import secrets
 import logging
 from typing import Optional, Dict
+import config
 from database.db_manager import DatabaseManager
+from auth import hashing
+from auth.hashing import HashingBusyError
+from auth.throttling import RateLimiter, AUTH_REJECTIONS
 import sqlite3
 
 logger = logging.getLogger(__name__)
 
+# Shared by every session in this process
+_email_limiter = RateLimiter(config.LOGIN_ATTEMPTS_PER_EMAIL, 60)
+_ip_limiter = RateLimiter(config.LOGIN_ATTEMPTS_PER_IP, 60)
+
 
 class AuthManager:
     """Manages user authentication."""
@@ -17,19 +24,38 @@ class AuthManager:
         self.db = DatabaseManager()
     
     def hash_password(self, password: str) -> str:
-        """Hash password using bcrypt."""
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed.decode('utf-8')
+        """Hash password using bcrypt on the hashing worker pool."""
+        return hashing.hash_password(password)
     
     def verify_password(self, password: str, password_hash: str) -> bool:
-        """Verify password against hash."""
+        """Verify password against hash on the hashing worker pool."""
         try:
-            return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+            return hashing.check_password(password, password_hash)
+        except HashingBusyError:
+            raise
         except Exception as e:
             logger.error(f"Password verification error: {e}")
             return False
     
+    def allow_attempt(self, email: str, ip_address: str = None) -> bool:
+        """
+        Consume a login/registration token for the email and client IP.
+        
+        Called before any hashing so bursts are rejected cheaply.
+        
+        Returns:
+            False if either bucket is empty
+        """
+        if ip_address and not _ip_limiter.allow(ip_address):
+            AUTH_REJECTIONS.inc(reason='ip')
+            logger.warning(f"Rate limited auth attempts from {ip_address}")
+            return False
+        if email and not _email_limiter.allow(email.strip().lower()):
+            AUTH_REJECTIONS.inc(reason='email')
+            logger.warning(f"Rate limited auth attempts for {email}")
+            return False
+        return True
+    
     def generate_verification_token(self) -> str:
         """Generate a secure verification token."""
         return secrets.token_urlsafe(32)
@@ -83,9 +109,25 @@ class AuthManager:
             logger.warning(f"Unverified user attempted login: {email}")
             return None
         
+        _email_limiter.reset(email.strip().lower())
+        self._upgrade_hash(user, password)
         logger.info(f"Successful login: {email}")
         return user
     
+    def _upgrade_hash(self, user: Dict, password: str):
+        """Rehash a verified password whose bcrypt cost is below the target."""
+        if not hashing.needs_rehash(user['password_hash']):
+            return
+        try:
+            new_hash = self.hash_password(password)
+        except Exception as e:
+            # Best effort: try again on a later login rather than failing this one
+            logger.warning(f"Skipped rehash for user {user['id']}: {e}")
+            return
+        if self.db.update_password_hash(user['id'], new_hash):
+            logger.info(f"Rehashed password for user {user['id']} at {hashing.rounds_of(new_hash)} rounds")
+            user['password_hash'] = new_hash
+    
     def verify_email(self, email: str, token: str) -> bool:
         """
         Verify user email with token.
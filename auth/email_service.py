@@ -1,9 +1,8 @@
 """Email service for sending verification emails."""
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import logging
 import config
+from auth import outbox
 
 logger = logging.getLogger(__name__)
 
@@ -18,9 +17,89 @@ class EmailService:
         self.email_user = config.EMAIL_USER
         self.email_password = config.EMAIL_PASSWORD
     
+    def _verification_content(self, to_email: str, verification_token: str):
+        """Subject, plain text and HTML bodies of the verification email."""
+        verification_link = f"{config.APP_URL}/?verify={verification_token}&email={to_email}"
+        subject = f"Verify your {config.APP_NAME} account"
+        
+        # Plain text version
+        text = f"""
+        Welcome to {config.APP_NAME}!
+        
+        Please verify your email address by clicking the link below or copying it to your browser:
+        
+        {verification_link}
+        
+        If you didn't create an account, you can safely ignore this email.
+        
+        Best regards,
+        {config.APP_NAME} Team
+        """
+        
+        # HTML email body
+        html = f"""
+        <html>
+            <head>
+                <style>
+                    body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+                    .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+                    .header {{ background-color: #2C3E50; color: white; padding: 20px; text-align: center; border-radius: 10px 10px 0 0; }}
+                    .content {{ padding: 30px; background-color: #f4f4f4; border-radius: 0 0 10px 10px; }}
+                    .button {{ 
+                        display: inline-block; 
+                        padding: 15px 40px; 
+                        background-color: #FF9800; 
+                        color: white; 
+                        text-decoration: none; 
+                        border-radius: 8px;
+                        margin: 20px 0;
+                        font-weight: bold;
+                    }}
+                    .footer {{ text-align: center; padding: 20px; color: #777; font-size: 12px; }}
+                    .link {{ color: #666; word-break: break-all; }}
+                </style>
+            </head>
+            <body>
+                <div class="container">
+                    <div class="header">
+                        <h1 style="margin: 0;">💰 {config.APP_NAME}</h1>
+                    </div>
+                    <div class="content">
+                        <h2>Welcome! Please verify your email</h2>
+                        <p>Thank you for signing up for {config.APP_NAME}. To get started, please verify your email address by clicking the button below:</p>
+                        <center>
+                            <a href="{verification_link}" class="button">Verify Email Address</a>
+                        </center>
+                        <p>Or copy and paste this link into your browser:</p>
+                        <p class="link">{verification_link}</p>
+                        <p style="margin-top: 30px; color: #888;">If you didn't create an account, you can safely ignore this email.</p>
+                    </div>
+                    <div class="footer">
+                        <p>© 2025 {config.APP_NAME}. All rights reserved.</p>
+                    </div>
+                </div>
+            </body>
+        </html>
+        """
+        return subject, text, html
+    
+    def queue_verification_email(self, to_email: str, verification_token: str) -> bool:
+        """
+        Queue the verification email for the background delivery worker.
+        
+        Args:
+            to_email: Recipient email address
+            verification_token: Verification token
+            
+        Returns:
+            True if the email was queued
+        """
+        subject, text, html = self._verification_content(to_email, verification_token)
+        return bool(outbox.enqueue_email(to_email, subject, text, html))
+    
     def send_verification_email(self, to_email: str, verification_token: str) -> bool:
         """
-        Send verification email to user.
+        Send verification email to user immediately (bypasses the outbox).
         
         Args:
             to_email: Recipient email address
@@ -35,88 +114,17 @@ class EmailService:
             return False
         
         try:
-            verification_link = f"{config.APP_URL}/?verify={verification_token}&email={to_email}"
-            
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = f"Verify your {config.APP_NAME} account"
-            msg['From'] = self.email_user
-            msg['To'] = to_email
-            
-            # Plain text version
-            text = f"""
-            Welcome to {config.APP_NAME}!
-            
-            Please verify your email address by clicking the link below or copying it to your browser:
-            
-            {verification_link}
-            
-            If you didn't create an account, you can safely ignore this email.
-            
-            Best regards,
-            {config.APP_NAME} Team
-            """
-            
-            # HTML email body
-            html = f"""
-            <html>
-                <head>
-                    <style>
-                        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                        .header {{ background-color: #2C3E50; color: white; padding: 20px; text-align: center; border-radius: 10px 10px 0 0; }}
-                        .content {{ padding: 30px; background-color: #f4f4f4; border-radius: 0 0 10px 10px; }}
-                        .button {{ 
-                            display: inline-block; 
-                            padding: 15px 40px; 
-                            background-color: #FF9800; 
-                            color: white; 
-                            text-decoration: none; 
-                            border-radius: 8px;
-                            margin: 20px 0;
-                            font-weight: bold;
-                        }}
-                        .footer {{ text-align: center; padding: 20px; color: #777; font-size: 12px; }}
-                        .link {{ color: #666; word-break: break-all; }}
-                    </style>
-                </head>
-                <body>
-                    <div class="container">
-                        <div class="header">
-                            <h1 style="margin: 0;">💰 {config.APP_NAME}</h1>
-                        </div>
-                        <div class="content">
-                            <h2>Welcome! Please verify your email</h2>
-                            <p>Thank you for signing up for {config.APP_NAME}. To get started, please verify your email address by clicking the button below:</p>
-                            <center>
-                                <a href="{verification_link}" class="button">Verify Email Address</a>
-                            </center>
-                            <p>Or copy and paste this link into your browser:</p>
-                            <p class="link">{verification_link}</p>
-                            <p style="margin-top: 30px; color: #888;">If you didn't create an account, you can safely ignore this email.</p>
-                        </div>
-                        <div class="footer">
-                            <p>© 2025 {config.APP_NAME}. All rights reserved.</p>
-                        </div>
-                    </div>
-                </body>
-            </html>
-            """
-            
-            # Attach both plain text and HTML versions
-            part1 = MIMEText(text, 'plain')
-            part2 = MIMEText(html, 'html')
-            msg.attach(part1)
-            msg.attach(part2)
+            subject, text, html = self._verification_content(to_email, verification_token)
+            msg = outbox.build_message(to_email, subject, text, html)
             
             # Send email
             logger.info(f"Attempting to send verification email to: {to_email}")
             
-            with smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=10) as server:
-                server.set_debuglevel(0)  # Set to 1 for debugging
-                server.starttls()
-                server.login(self.email_user, self.email_password)
-                server.send_message(msg)
+            session = outbox.SMTPSession()
+            try:
+                session.send(msg)
+            finally:
+                session.close()
             
             logger.info(f"Verification email sent successfully to: {to_email}")
             return True
@@ -0,0 +1,212 @@
+"""bcrypt hashing on a bounded worker process pool.
+
+bcrypt costs hundreds of milliseconds of CPU per call. Running it on the
+Streamlit script thread lets a burst of logins starve every other session,
+so hashing goes to a small process pool with a hard limit on queued work.
+Callers get HashingBusyError instead of waiting when the queue is full,
+and also when a job times out or the pool keeps failing.
+A job keeps its queue slot until the pool has actually finished it, and a
+pool whose worker died is replaced on the next call.
+"""
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+import config
+from utils.metrics import BCRYPT_DURATION, REGISTRY
+
+logger = logging.getLogger(__name__)
+
+HASH_QUEUE_REJECTIONS = REGISTRY.counter(
+    'oscar_bcrypt_queue_rejections_total', 'bcrypt jobs rejected because the queue was full.')
+
+
+class HashingBusyError(Exception):
+    """Raised when the hashing queue is full."""
+
+
+def _hashpw(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+
+def _checkpw(password: bytes, password_hash: bytes) -> bool:
+    return bcrypt.checkpw(password, password_hash)
+
+
+def _measure_rounds(rounds: int, samples: int = 3) -> float:
+    """Best-of-n seconds for one bcrypt hash at the given cost."""
+    salt = bcrypt.gensalt(rounds)
+    best = float('inf')
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.hashpw(b"calibration-password", salt)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(1, config.AUTH_HASH_QUEUE))
+
+
+def _get_pool():
+    """Create the worker pool on first use; None means hash inline."""
+    global _pool
+    if config.AUTH_HASH_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            try:
+                _pool = ProcessPoolExecutor(
+                    max_workers=config.AUTH_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            except (OSError, NotImplementedError) as e:
+                logger.warning(f"bcrypt worker pool unavailable, hashing inline: {e}")
+                config.AUTH_HASH_WORKERS = 0
+                return None
+        return _pool
+
+
+def _discard_pool(pool):
+    """Forget a broken pool so the next _get_pool call starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _release_slot(future=None):
+    _slots.release()
+
+
+def _run(operation: str, func, *args):
+    """
+    Run a bcrypt call on the pool.
+
+    Raises:
+        HashingBusyError: The queue is full, the job timed out or the pool
+            failed twice in a row
+    """
+    if not _slots.acquire(blocking=False):
+        HASH_QUEUE_REJECTIONS.inc()
+        raise HashingBusyError("Authentication service is busy")
+
+    start = time.perf_counter()
+    future = None
+    try:
+        for attempt in range(2):
+            pool = _get_pool()
+            if pool is None:
+                return func(*args)
+            try:
+                future = pool.submit(func, *args)
+                return future.result(timeout=config.AUTH_HASH_TIMEOUT)
+            except BrokenProcessPool as e:
+                # A worker died (e.g. OOM-killed); every later submit would fail too
+                logger.warning("bcrypt worker pool is broken, restarting it")
+                _discard_pool(pool)
+                if attempt:
+                    raise HashingBusyError("Authentication service is unavailable") from e
+                future = None
+            except FutureTimeoutError as e:
+                future.cancel()
+                raise HashingBusyError("Authentication service timed out") from e
+    finally:
+        # A job still running after a timeout holds its slot until it finishes
+        if future is None:
+            _release_slot()
+        else:
+            future.add_done_callback(_release_slot)
+        BCRYPT_DURATION.observe(time.perf_counter() - start, operation=operation)
+
+
+_target_rounds = None
+_calibration_lock = threading.Lock()
+
+
+def calibrate_rounds(target_ms: float, min_rounds: int, max_rounds: int) -> int:
+    """
+    Pick the highest bcrypt cost whose hash time stays within target_ms.
+    
+    Measures once at min_rounds on the worker pool (where hashing really
+    runs) and extrapolates, since each extra round doubles the work.
+    """
+    pool = _get_pool()
+    if pool is None:
+        seconds = _measure_rounds(min_rounds)
+    else:
+        seconds = pool.submit(_measure_rounds, min_rounds).result(timeout=config.AUTH_HASH_TIMEOUT * 3)
+
+    rounds = min_rounds
+    while rounds < max_rounds and seconds * 2 * 1000 <= target_ms:
+        rounds += 1
+        seconds *= 2
+    logger.info(f"bcrypt calibrated to {rounds} rounds (~{seconds * 1000:.0f} ms per hash)")
+    return rounds
+
+
+def target_rounds() -> int:
+    """bcrypt cost for new hashes; calibrated once per process."""
+    global _target_rounds
+    if _target_rounds is None:
+        with _calibration_lock:
+            if _target_rounds is None:
+                if config.BCRYPT_ROUNDS:
+                    _target_rounds = config.BCRYPT_ROUNDS
+                else:
+                    try:
+                        _target_rounds = calibrate_rounds(config.BCRYPT_TARGET_MS,
+                                                          config.BCRYPT_MIN_ROUNDS, config.BCRYPT_MAX_ROUNDS)
+                    except Exception as e:
+                        logger.error(f"bcrypt calibration failed, using 12 rounds: {e}")
+                        _target_rounds = 12
+    return _target_rounds
+
+
+def start_calibration():
+    """Calibrate in the background so the first login does not pay for it."""
+    if _target_rounds is None:
+        threading.Thread(target=target_rounds, name='oscar-bcrypt-calibration', daemon=True).start()
+
+
+def rounds_of(password_hash: str) -> int:
+    """Cost factor encoded in a bcrypt hash such as $2b$12$..., or 0 if unknown."""
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return 0
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """
+    True when a stored hash uses a lower cost than the current target.
+    
+    Calibration is per process and noisy, so a hash stronger than this
+    process's target is kept rather than weakened or rewritten back and forth.
+    """
+    return rounds_of(password_hash) < target_rounds()
+
+
+def hash_password(password: str, rounds: int = None) -> str:
+    """Hash a password with bcrypt on the worker pool."""
+    rounds = rounds or target_rounds()
+    return _run('hash', _hashpw, password.encode('utf-8'), rounds).decode('utf-8')
+
+
+def check_password(password: str, password_hash: str) -> bool:
+    """Verify a password against a bcrypt hash on the worker pool."""
+    return _run('verify', _checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+def shutdown():
+    """Stop the worker pool (used by benchmarks and tests)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
@@ -0,0 +1,228 @@
+"""Email outbox drained by a background delivery worker.
+
+Callers add messages to the email_outbox table and return immediately. A
+daemon thread claims due messages in batches and sends them over one SMTP
+session that stays open while there is work, so a slow mail server no
+longer blocks registration. Failed sends are retried with exponential
+backoff until OUTBOX_MAX_ATTEMPTS.
+"""
+import time
+import smtplib
+import logging
+import threading
+from datetime import datetime, timedelta
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from typing import Optional
+import config
+from database.db_manager import DatabaseManager
+from utils.metrics import REGISTRY, SMTP_SEND_DURATION
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+OUTBOX_ENQUEUED = REGISTRY.counter(
+    'oscar_outbox_enqueued_total', 'Messages added to the email outbox.')
+OUTBOX_MESSAGES = REGISTRY.counter(
+    'oscar_outbox_messages_total', 'Outbox delivery attempts by result (sent/retry/failed).', ('result',))
+SMTP_CONNECTIONS = REGISTRY.counter(
+    'oscar_smtp_connections_total', 'SMTP sessions opened for outgoing mail.')
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.strftime(TIMESTAMP_FORMAT)
+
+
+def build_message(to_email: str, subject: str, text_body: str, html_body: str = None) -> MIMEMultipart:
+    """Assemble a plain-text + HTML message from the configured sender."""
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = subject
+    msg['From'] = config.EMAIL_FROM
+    msg['To'] = to_email
+    msg.attach(MIMEText(text_body, 'plain'))
+    if html_body:
+        msg.attach(MIMEText(html_body, 'html'))
+    return msg
+
+
+def _is_permanent(error: Exception) -> bool:
+    """5xx replies and refused recipients will not succeed on retry."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and 500 <= error.smtp_code < 600 \
+        and not isinstance(error, smtplib.SMTPAuthenticationError)
+
+
+class SMTPSession:
+    """Lazily opened SMTP connection reused across messages."""
+
+    def __init__(self):
+        self._server = None
+        self.last_used = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return self._server is not None
+
+    def _connect(self):
+        server = smtplib.SMTP(config.SMTP_SERVER, config.SMTP_PORT, timeout=10)
+        try:
+            if config.SMTP_STARTTLS:
+                server.starttls()
+            if config.EMAIL_USER and config.EMAIL_PASSWORD:
+                server.login(config.EMAIL_USER, config.EMAIL_PASSWORD)
+        except Exception:
+            server.close()
+            raise
+        SMTP_CONNECTIONS.inc()
+        self._server = server
+
+    def send(self, msg):
+        """Send one message, reconnecting once if the server dropped the session."""
+        start = time.perf_counter()
+        try:
+            if self._server is None:
+                self._connect()
+            try:
+                self._server.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                self._server = None
+                self._connect()
+                self._server.send_message(msg)
+        except Exception:
+            SMTP_SEND_DURATION.observe(time.perf_counter() - start, result='error')
+            raise
+        SMTP_SEND_DURATION.observe(time.perf_counter() - start, result='sent')
+        self.last_used = time.monotonic()
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                self._server.close()
+            self._server = None
+
+
+class OutboxWorker:
+    """Drains the email outbox on a daemon thread."""
+
+    def __init__(self, db: DatabaseManager = None):
+        self.db = db or DatabaseManager()
+        self.session = SMTPSession()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def deliver(self, row: dict) -> bool:
+        """Send one claimed outbox row and record the outcome."""
+        now = datetime.now()
+        try:
+            self.session.send(build_message(row['to_email'], row['subject'], row['text_body'], row['html_body']))
+        except Exception as e:
+            if not isinstance(e, smtplib.SMTPRecipientsRefused):
+                self.session.close()
+            attempts = row['attempts'] + 1
+            if _is_permanent(e) or attempts >= config.OUTBOX_MAX_ATTEMPTS:
+                logger.error(f"Giving up on email {row['id']} to {row['to_email']}: {e}")
+                self.db.mark_email_failed(row['id'], str(e))
+                OUTBOX_MESSAGES.inc(result='failed')
+            else:
+                delay = config.OUTBOX_RETRY_SECONDS * 2 ** (attempts - 1)
+                logger.warning(f"Email {row['id']} failed (attempt {attempts}), retrying in {delay:.0f}s: {e}")
+                self.db.mark_email_failed(row['id'], str(e), _timestamp(now + timedelta(seconds=delay)))
+                OUTBOX_MESSAGES.inc(result='retry')
+            return False
+        self.db.mark_email_sent(row['id'], _timestamp(now))
+        OUTBOX_MESSAGES.inc(result='sent')
+        return True
+
+    def drain_once(self) -> int:
+        """Deliver every message that is currently due. Returns the number sent."""
+        sent = 0
+        batch_size = max(1, config.OUTBOX_BATCH_SIZE)
+        while not self._stop.is_set():
+            now = datetime.now()
+            lease_until = now + timedelta(seconds=max(60, 10 * batch_size))
+            batch = self.db.claim_outbox_batch(_timestamp(now), _timestamp(lease_until), batch_size)
+            if not batch:
+                break
+            sent += sum(self.deliver(row) for row in batch)
+        return sent
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self.drain_once()
+            except Exception as e:
+                logger.error(f"Outbox worker error: {e}")
+            if self.session.is_open and time.monotonic() - self.session.last_used > config.SMTP_IDLE_SECONDS:
+                self.session.close()
+            self._wake.wait(timeout=config.OUTBOX_POLL_SECONDS)
+        self.session.close()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='oscar-email-outbox', daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        """Check the outbox now instead of at the next poll."""
+        self._wake.set()
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def start_outbox_worker() -> OutboxWorker:
+    """Start the process-wide delivery worker once."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = OutboxWorker()
+            _worker.start()
+        return _worker
+
+
+def stop_outbox_worker():
+    """Stop the delivery worker (used by benchmarks and tests)."""
+    global _worker
+    with _worker_lock:
+        if _worker is not None:
+            _worker.stop()
+            _worker = None
+
+
+def wake_worker():
+    """Tell the delivery worker that new messages were queued."""
+    if _worker is not None:
+        _worker.wake()
+
+
+def enqueue_email(to_email: str, subject: str, text_body: str, html_body: str = None,
+                  db: DatabaseManager = None) -> Optional[int]:
+    """
+    Queue an email and nudge the worker.
+
+    Returns:
+        Outbox id, or None on failure
+    """
+    if not config.EMAIL_FROM:
+        logger.error("Email configuration missing. Please set EMAIL_USER or EMAIL_FROM in .env")
+        return None
+    email_id = (db or DatabaseManager()).enqueue_email(to_email, subject, text_body, html_body,
+                                                      _timestamp(datetime.now()))
+    if email_id:
+        OUTBOX_ENQUEUED.inc()
+        wake_worker()
+    return email_id
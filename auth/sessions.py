@@ -0,0 +1,160 @@
+"""Server-side login sessions with signed opaque tokens.
+
+A session token is `<random>.<signature>`. Only the SHA-256 of the random
+part is stored, so a leaked database cannot be replayed, and the HMAC
+signature lets forged tokens be rejected without touching the database.
+Any Streamlit process sharing SESSION_SECRET and the database can resume
+a session, so logins survive reruns, refreshes and worker restarts
+without another bcrypt check. Without SESSION_SECRET a random secret is
+generated once and stored in the database, so it is shared all the same.
+
+The token travels in the page URL: a copied link logs its recipient in
+until the session expires or its owner logs out.
+"""
+import hmac
+import base64
+import hashlib
+import secrets
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional, Dict
+import config
+from database.db_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_secret = None
+_secret_lock = threading.Lock()
+
+
+def _get_secret(db: DatabaseManager) -> Optional[bytes]:
+    """Signing key: SESSION_SECRET, or one generated once and kept in the database."""
+    global _secret
+    if _secret is None:
+        with _secret_lock:
+            if _secret is None:
+                if config.SESSION_SECRET:
+                    _secret = config.SESSION_SECRET.encode('utf-8')
+                else:
+                    stored = db.get_or_create_app_secret('session_secret', secrets.token_urlsafe(32))
+                    if stored:
+                        _secret = stored.encode('utf-8')
+    return _secret
+
+
+def _sign(value: str, secret: bytes) -> str:
+    digest = hmac.new(secret, value.encode('utf-8'), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:18]).decode('ascii')
+
+
+def _hash_token(value: str) -> str:
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.strftime(TIMESTAMP_FORMAT)
+
+
+class SessionManager:
+    """Creates, validates and renews login sessions."""
+
+    def __init__(self, db: DatabaseManager = None):
+        """Initialize session manager."""
+        self.db = db or DatabaseManager()
+        self.ttl = timedelta(hours=config.SESSION_TTL_HOURS)
+
+    def _signature(self, value: str) -> Optional[str]:
+        secret = _get_secret(self.db)
+        return _sign(value, secret) if secret else None
+
+    def _unpack(self, token: str) -> Optional[str]:
+        """Return the random part of a correctly signed token."""
+        if not token or '.' not in token:
+            return None
+        value, signature = token.rsplit('.', 1)
+        expected = self._signature(value)
+        if not expected or not hmac.compare_digest(expected, signature):
+            return None
+        return value
+
+    def create_session(self, user_id: int) -> Optional[str]:
+        """
+        Start a session for a user.
+
+        Returns:
+            Signed token to hand to the client, or None if it could not be stored
+        """
+        value = secrets.token_urlsafe(32)
+        signature = self._signature(value)
+        expires_at = _timestamp(datetime.now() + self.ttl)
+        if not signature or not self.db.create_session(user_id, _hash_token(value), expires_at):
+            return None
+        return f"{value}.{signature}"
+
+    def validate_session(self, token: str) -> Optional[Dict]:
+        """
+        Resolve a token to its user, renewing the session when past half its TTL.
+
+        Returns:
+            User dictionary with session_expires_at, or None if invalid/expired
+        """
+        value = self._unpack(token)
+        if not value:
+            return None
+
+        now = datetime.now()
+        user = self.db.get_session_user(_hash_token(value), _timestamp(now))
+        if not user:
+            return None
+
+        session_id = user.pop('session_id')
+        expires_at = datetime.strptime(user['session_expires_at'][:19], TIMESTAMP_FORMAT)
+        if expires_at - now < self.ttl / 2:
+            new_expiry = _timestamp(now + self.ttl)
+            if self.db.extend_session(session_id, new_expiry):
+                user['session_expires_at'] = new_expiry
+        return user
+
+    def renew_if_needed(self, token: str, expires_at: str) -> Optional[str]:
+        """
+        Slide an active session's expiry without re-reading the user.
+
+        Returns:
+            The new expiry timestamp if renewed, otherwise None
+        """
+        value = self._unpack(token)
+        if not value or not expires_at:
+            return None
+        now = datetime.now()
+        if datetime.strptime(expires_at[:19], TIMESTAMP_FORMAT) - now >= self.ttl / 2:
+            return None
+        user = self.db.get_session_user(_hash_token(value), _timestamp(now))
+        if not user:
+            return None
+        new_expiry = _timestamp(now + self.ttl)
+        return new_expiry if self.db.extend_session(user['session_id'], new_expiry) else None
+
+    def end_session(self, token: str) -> bool:
+        """Delete a session on logout."""
+        value = self._unpack(token)
+        if not value:
+            return False
+        return self.db.delete_session(_hash_token(value))
+
+    def purge_expired(self) -> bool:
+        """Delete sessions past their expiry; run periodically."""
+        return self.db.delete_expired_sessions(_timestamp(datetime.now()))
+
+
+_manager = None
+
+
+def get_session_manager() -> SessionManager:
+    """Process-wide SessionManager, built on first use."""
+    global _manager
+    if _manager is None:
+        _manager = SessionManager(DatabaseManager())
+    return _manager
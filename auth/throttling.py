@@ -0,0 +1,51 @@
+"""Token-bucket rate limiting for authentication attempts."""
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import Tuple
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+AUTH_REJECTIONS = REGISTRY.counter(
+    'oscar_auth_rejections_total', 'Authentication attempts rejected before hashing.', ('reason',))
+
+
+class RateLimiter:
+    """
+    Per-key token buckets holding `capacity` tokens refilled at `per_seconds`.
+
+    At most max_keys buckets are kept, least recently used first out; an
+    evicted key simply starts again with a full bucket.
+    """
+
+    def __init__(self, capacity: int, per_seconds: float, max_keys: int = 10000):
+        self.capacity = float(capacity)
+        self.refill_rate = capacity / per_seconds
+        self.max_keys = max_keys
+        self._buckets: 'OrderedDict[str, Tuple[float, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _refilled(self, key: str, now: float) -> float:
+        tokens, updated = self._buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - updated) * self.refill_rate)
+
+    def allow(self, key: str, cost: float = 1.0) -> bool:
+        """Take `cost` tokens from the key's bucket; False when it is empty."""
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._refilled(key, now)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return allowed
+
+    def reset(self, key: str):
+        """Restore a full bucket (e.g. after a successful login)."""
+        with self._lock:
+            self._buckets.pop(key, None)
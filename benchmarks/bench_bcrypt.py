@@ -0,0 +1,86 @@
+"""bcrypt verify throughput per cost level.
+
+Reports single-thread latency and verifies/sec for each cost, plus the
+throughput of the hashing worker pool, and the cost the startup
+calibration would pick for the configured target.
+
+Usage:
+    python -m benchmarks.bench_bcrypt --min-rounds 8 --max-rounds 13 --output bcrypt.json
+"""
+import json
+import time
+import argparse
+import platform
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+import config
+from auth import hashing
+from benchmarks.bench_db import percentile
+
+PASSWORD = b"benchmark-password"
+
+
+def bench_rounds(rounds: int, iterations: int, workers: int) -> dict:
+    """Time inline verifies and pooled verifies at one cost level."""
+    password_hash = bcrypt.hashpw(PASSWORD, bcrypt.gensalt(rounds))
+
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        bcrypt.checkpw(PASSWORD, password_hash)
+        durations.append(time.perf_counter() - start)
+    inline_seconds = sum(durations)
+
+    pooled = {}
+    if workers:
+        decoded = password_hash.decode('utf-8')
+        hashing.check_password(PASSWORD.decode('utf-8'), decoded)  # warm the pool
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda _: hashing.check_password(PASSWORD.decode('utf-8'), decoded),
+                              range(iterations)))
+        elapsed = time.perf_counter() - start
+        pooled = {'pool_workers': config.AUTH_HASH_WORKERS,
+                  'pool_verifies_per_sec': round(iterations / elapsed, 2)}
+
+    return {
+        'rounds': rounds,
+        'iterations': iterations,
+        'p50_ms': round(percentile(durations, 50) * 1000, 2),
+        'p95_ms': round(percentile(durations, 95) * 1000, 2),
+        'verifies_per_sec': round(iterations / inline_seconds, 2),
+        **pooled,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bcrypt verify throughput per cost")
+    parser.add_argument('--min-rounds', type=int, default=8)
+    parser.add_argument('--max-rounds', type=int, default=13)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--pool', action='store_true', help="Also measure the hashing worker pool")
+    parser.add_argument('--output', help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    results = [bench_rounds(r, args.iterations, config.AUTH_HASH_WORKERS if args.pool else 0)
+               for r in range(args.min_rounds, args.max_rounds + 1)]
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'target_ms': config.BCRYPT_TARGET_MS,
+        'calibrated_rounds': hashing.calibrate_rounds(config.BCRYPT_TARGET_MS,
+                                                      config.BCRYPT_MIN_ROUNDS, config.BCRYPT_MAX_ROUNDS),
+        'results': results,
+    }
+    hashing.shutdown()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""DatabaseManager benchmark suite.
+
+Seeds a synthetic dataset, then times every DatabaseManager read/write
+method and reports p50/p95/p99 latency, ops/sec and rows/sec as JSON.
+
+Usage:
+    python -m benchmarks.bench_db --users 20 --expenses 200 --output sqlite.json
+    python -m benchmarks.bench_db --database-url postgresql://localhost/oscar_bench --reset
+"""
+import os
+import math
+import json
+import time
+import random
+import argparse
+import tempfile
+import platform
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+from database.db_manager import DatabaseManager
+from benchmarks.datagen import generate_dataset, reset_database, EMAIL_TEMPLATE
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def _row_count(result) -> int:
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        return 1
+    return 1 if result else 0
+
+
+def summarize(name: str, durations: List[float], rows: int) -> Dict:
+    """Latency percentiles and throughput for one benchmark."""
+    total = sum(durations)
+    return {
+        'name': name,
+        'iterations': len(durations),
+        'p50_ms': round(percentile(durations, 50) * 1000, 3),
+        'p95_ms': round(percentile(durations, 95) * 1000, 3),
+        'p99_ms': round(percentile(durations, 99) * 1000, 3),
+        'mean_ms': round(total / len(durations) * 1000, 3) if durations else 0.0,
+        'ops_per_sec': round(len(durations) / total, 1) if total else 0.0,
+        'rows_per_sec': round(rows / total, 1) if total else 0.0,
+    }
+
+
+class BenchmarkContext:
+    """Shared state for benchmark cases: the DB, seeded ids and created rows."""
+
+    def __init__(self, db: DatabaseManager, user_ids: List[int], seed: int):
+        self.db = db
+        self.user_ids = user_ids
+        self.rng = random.Random(seed)
+        self.today = datetime.now()
+        self.created: Dict[str, List] = {}
+        friends = db.execute_query('SELECT id, user_id FROM friends', fetch=True) or []
+        self.friends = [(f['user_id'], f['id']) for f in friends]
+        reminders = db.execute_query('SELECT id, user_id FROM reminders', fetch=True) or []
+        self.reminders = [(r['user_id'], r['id']) for r in reminders]
+        self.expenses: Dict[int, List[int]] = {}
+        for e in db.execute_query('SELECT id, user_id FROM expenses', fetch=True) or []:
+            self.expenses.setdefault(e['user_id'], []).append(e['id'])
+
+    def user(self) -> int:
+        return self.rng.choice(self.user_ids)
+
+    def friend(self):
+        return self.rng.choice(self.friends)
+
+    def reminder(self):
+        return self.rng.choice(self.reminders)
+
+    def month(self) -> str:
+        return (self.today - timedelta(days=30 * self.rng.randint(0, 5))).strftime("%Y-%m")
+
+    def remember(self, key: str, value):
+        if value:
+            self.created.setdefault(key, []).append(value)
+        return value
+
+    def take(self, key: str):
+        return self.created[key].pop()
+
+    def take_expenses(self, count: int):
+        """(user_id, ids) of up to count seeded expenses of one user, removed from the pool."""
+        user_id = max(self.expenses, key=lambda u: len(self.expenses[u]))
+        ids, self.expenses[user_id] = self.expenses[user_id][:count], self.expenses[user_id][count:]
+        return user_id, ids
+
+    def take_reminder(self) -> int:
+        """Prefer reminders created by add_reminder; fall back to seeded ones."""
+        if self.created.get('reminders'):
+            return self.created['reminders'].pop()
+        return self.reminders.pop()[1]
+
+
+def _cases(ctx: BenchmarkContext) -> List[tuple]:
+    """(name, callable) pairs; order matters where deletes consume created rows."""
+    db = ctx.db
+    counter = iter(range(10 ** 9))
+
+    def new_user():
+        n = next(counter)
+        email = f"bench-new-{os.getpid()}-{n}@example.com"
+        return ctx.remember('users', (db.create_user(email, "x", "New User", f"token-{n}"), email))
+
+    def add_expense():
+        user_id = ctx.user()
+        expense_id = db.add_expense(user_id, "Bench expense", 12.5, "Food & Dining", "Cash",
+                                    ctx.today.strftime("%Y-%m-%d"), None)
+        return ctx.remember('expenses', (user_id, expense_id))
+
+    pages = {}
+
+    def update_expenses_bulk():
+        """Recategorize a page of 50 expenses, tracking versions so no update conflicts."""
+        user_id = ctx.user()
+        if user_id not in pages:
+            pages[user_id] = db.get_expenses_page(user_id, limit=50)
+        rows = pages[user_id]
+        category = ctx.rng.choice(["Food & Dining", "Shopping", "Travel"])
+        result = db.update_expenses_bulk(user_id, [{**row, 'category': category} for row in rows])
+        for row in rows:
+            row['version'] += 1
+        return result['updated'] if result else []
+
+    def add_reminder():
+        result = db.add_reminder({
+            'user_id': ctx.user(), 'title': "Bench reminder", 'type': "Bill Payment",
+            'due_date': (ctx.today + timedelta(days=5)).strftime("%Y-%m-%d"), 'amount': 50.0,
+        })
+        # SQLite returns the new id; PostgreSQL only reports success
+        if isinstance(result, int) and not isinstance(result, bool):
+            ctx.remember('reminders', result)
+        return result
+
+    def add_friend():
+        user_id = ctx.user()
+        phone = f"+1 555 {ctx.rng.randrange(10 ** 7):07d}"
+        friend_id = db.add_friend(user_id, "Bench Friend", phone=phone, email=f"friend{phone[-4:]}@example.com")
+        return ctx.remember('friends', (user_id, friend_id))
+
+    def add_transaction():
+        user_id, friend_id = ctx.friend()
+        transaction_id = db.add_transaction(user_id, friend_id, ctx.rng.choice(['lent', 'borrowed']),
+                                            10.0, "Bench", ctx.today.strftime("%Y-%m-%d"))
+        return ctx.remember('transactions', (user_id, transaction_id))
+
+    def create_session():
+        token_hash = f"{os.getpid()}-{next(counter)}".rjust(64, '0')
+        db.create_session(ctx.user(), token_hash, (ctx.today + timedelta(days=7)).strftime("%Y-%m-%d %H:%M:%S"))
+        return ctx.remember('sessions', token_hash)
+
+    def get_session_user():
+        return db.get_session_user(ctx.rng.choice(ctx.created['sessions']), ctx.today.strftime("%Y-%m-%d %H:%M:%S"))
+
+    return [
+        # Users
+        ('create_user', new_user),
+        ('get_user_by_email', lambda: db.get_user_by_email(EMAIL_TEMPLATE.format(ctx.rng.randrange(len(ctx.user_ids))))),
+        ('get_user_by_id', lambda: db.get_user_by_id(ctx.user())),
+        ('get_data_version', lambda: db.get_data_version(ctx.user())),
+        ('verify_user', lambda: db.verify_user(ctx.rng.choice(ctx.created['users'])[1])),
+        ('update_user_profile', lambda: db.update_user_profile(ctx.user(), {'occupation': 'Benchmarker'})),
+        ('update_password_hash', lambda: db.update_password_hash(ctx.rng.choice(ctx.created['users'])[0], "x")),
+        # Sessions
+        ('create_session', create_session),
+        ('get_session_user', get_session_user),
+        ('extend_session', lambda: db.extend_session(1, (ctx.today + timedelta(days=7)).strftime("%Y-%m-%d %H:%M:%S"))),
+        ('delete_session', lambda: db.delete_session(ctx.take('sessions'))),
+        ('delete_expired_sessions', lambda: db.delete_expired_sessions(ctx.today.strftime("%Y-%m-%d %H:%M:%S"))),
+        # Email outbox
+        ('enqueue_email', lambda: db.enqueue_email("bench@example.com", "Bench", "Body", None, ctx.today.strftime("%Y-%m-%d %H:%M:%S"))),
+        ('claim_outbox_batch', lambda: db.claim_outbox_batch(
+            ctx.today.strftime("%Y-%m-%d %H:%M:%S"), (ctx.today + timedelta(minutes=5)).strftime("%Y-%m-%d %H:%M:%S"), 20)),
+        ('mark_email_sent', lambda: db.mark_email_sent(1, ctx.today.strftime("%Y-%m-%d %H:%M:%S"))),
+        ('get_outbox_counts', db.get_outbox_counts),
+        # Maintenance jobs
+        ('save_job_checkpoint', lambda: db.save_job_checkpoint('bench', ctx.rng.randrange(10 ** 6), 'running')),
+        ('get_job_checkpoint', lambda: db.get_job_checkpoint('bench')),
+        ('get_column_chunk', lambda: db.get_column_chunk('friends', ['phone', 'email', 'notes'], 0, 500)),
+        # Expenses
+        ('add_expense', add_expense),
+        ('get_expenses', lambda: db.get_expenses(ctx.user())),
+        ('get_user_expenses', lambda: db.get_user_expenses(ctx.user())),
+        ('get_user_expenses[month]', lambda: db.get_user_expenses(ctx.user(), month=ctx.month())),
+        ('get_user_expenses[category]', lambda: db.get_user_expenses(ctx.user(), category="Food & Dining")),
+        ('get_expense_stats', lambda: db.get_expense_stats(ctx.user())),
+        ('get_expense_stats[month]', lambda: db.get_expense_stats(ctx.user(), month=ctx.month())),
+        ('count_user_expenses', lambda: db.count_user_expenses(ctx.user())),
+        ('count_user_expenses[month]', lambda: db.count_user_expenses(ctx.user(), month=ctx.month())),
+        ('monthly_totals', lambda: db.monthly_totals(ctx.user())),
+        ('monthly_totals[limit]', lambda: db.monthly_totals(ctx.user(), limit=6)),
+        ('weekday_totals', lambda: db.weekday_totals(ctx.user())),
+        ('category_totals', lambda: db.category_totals(ctx.user())),
+        ('category_totals[month]', lambda: db.category_totals(ctx.user(), month=ctx.month())),
+        ('summary', lambda: db.summary(ctx.user())),
+        ('summary[month]', lambda: db.summary(ctx.user(), month=ctx.month())),
+        ('get_dashboard_summary', lambda: db.get_dashboard_summary(ctx.user(), ctx.today.strftime("%Y-%m-%d"))),
+        ('get_expenses_page', lambda: db.get_expenses_page(ctx.user(), offset=50)),
+        ('get_expenses_page[amount]', lambda: db.get_expenses_page(ctx.user(), sort_by='amount', offset=50)),
+        ('get_expenses_page[month]', lambda: db.get_expenses_page(ctx.user(), month=ctx.month())),
+        ('update_expenses_bulk', update_expenses_bulk),
+        ('delete_expense', lambda: db.delete_expense(*ctx.take('expenses'))),
+        ('delete_expenses_bulk', lambda: db.delete_expenses_bulk(*ctx.take_expenses(10))),
+        # Budgets
+        ('save_budget_settings', lambda: db.save_budget_settings(ctx.user(), 2500.0, 'USD', {'Food & Dining': 400})),
+        ('get_budget_settings', lambda: db.get_budget_settings(ctx.user())),
+        # Reminders
+        ('add_reminder', add_reminder),
+        ('query_reminders', lambda: db.query_reminders(ctx.user(), status='pending')),
+        ('query_reminders[all]', lambda: db.query_reminders(ctx.user(), descending=True)),
+        ('query_reminders[type]', lambda: db.query_reminders(ctx.user(), reminder_type='Subscription', descending=True)),
+        ('query_reminders[window]', lambda: db.query_reminders(
+            ctx.user(), status='pending', due_from=ctx.today.strftime("%Y-%m-%d"),
+            due_to=(ctx.today + timedelta(days=30)).strftime("%Y-%m-%d"))),
+        ('update_reminder_status', lambda: db.update_reminder_status(ctx.reminder()[1], 'pending')),
+        ('mark_reminder_complete', lambda: db.mark_reminder_complete(*ctx.reminder())),
+        ('delete_reminder', lambda: db.delete_reminder(ctx.take_reminder())),
+        ('set_occurrence_status', lambda: db.set_occurrence_status(ctx.reminder()[1], ctx.today.strftime("%Y-%m-%d"), 'completed')),
+        ('get_reminder_overrides', lambda: db.get_reminder_overrides(
+            ctx.user(), ctx.today.strftime("%Y-%m-%d"), (ctx.today + timedelta(days=30)).strftime("%Y-%m-%d"))),
+        ('get_due_notifications', lambda: db.get_due_notifications(ctx.today.strftime("%Y-%m-%d"))),
+        # Friends
+        ('add_friend', add_friend),
+        ('get_user_friends', lambda: db.get_user_friends(ctx.user())),
+        ('find_friends_by_contact', lambda: db.find_friends_by_contact(ctx.user(), phone="+1 555 0000042",
+                                                                       email="friend0042@example.com")),
+        ('update_friend_balance', lambda: db.update_friend_balance(ctx.friend()[1], 0.0)),
+        # Transactions
+        ('add_transaction', add_transaction),
+        ('get_friend_transactions', lambda: db.get_friend_transactions(*ctx.friend())),
+        ('delete_transaction', lambda: db.delete_transaction(*ctx.take('transactions'))),
+        ('delete_friend', lambda: db.delete_friend(*ctx.take('friends'))),
+    ]
+
+
+def run_benchmark(name: str, func: Callable, iterations: int, warmup: int = 3) -> Dict:
+    """Time a callable and summarize the samples."""
+    for _ in range(min(warmup, iterations // 10)):
+        func()
+    durations, rows = [], 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = func()
+        durations.append(time.perf_counter() - start)
+        rows += _row_count(result)
+    return summarize(name, durations, rows)
+
+
+def run_suite(db: DatabaseManager, users: int, expenses: int, iterations: int, seed: int = 42,
+              only: List[str] = None) -> Dict:
+    """Seed the database and run every benchmark case."""
+    start = time.perf_counter()
+    dataset = generate_dataset(db, users, expenses, seed)
+    seed_seconds = time.perf_counter() - start
+
+    ctx = BenchmarkContext(db, dataset['user_ids'], seed)
+    results = []
+    for name, func in _cases(ctx):
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        results.append(run_benchmark(name, func, iterations))
+
+    dataset.pop('user_ids')
+    return {
+        'backend': 'postgres' if db.use_postgres else 'sqlite',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'iterations': iterations,
+        'seed': seed,
+        'dataset': dataset,
+        'seed_seconds': round(seed_seconds, 3),
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DatabaseManager methods")
+    parser.add_argument('--database-url', help="PostgreSQL URL; SQLite temp file when omitted")
+    parser.add_argument('--sqlite', help="SQLite file to use instead of a temp file")
+    parser.add_argument('--reset', action='store_true', help="Truncate tables first (required for reused DBs)")
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--expenses', type=int, default=200, help="Expenses per user")
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--only', nargs='*', help="Run only benchmarks with these name prefixes")
+    parser.add_argument('--output', help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_path = args.sqlite or os.path.join(tmp, 'bench.db')
+        db = DatabaseManager(sqlite_path, database_url=args.database_url)
+        if args.reset:
+            reset_database(db)
+        elif db.execute_query('SELECT COUNT(*) AS n FROM users', fetchone=True)['n']:
+            parser.error("Target database is not empty; pass --reset to truncate it")
+
+        report = run_suite(db, args.users, args.expenses, args.iterations, args.seed, args.only)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Field encryption throughput and token size.
+
+Compares building a Fernet per call (the old get_cipher) with the cached
+keyring, single calls with encrypt_many/decrypt_many, and reports the
+stored size of current and legacy double-encoded tokens.
+
+Usage:
+    python -m benchmarks.bench_encryption --values 5000
+"""
+import json
+import time
+import base64
+import argparse
+from datetime import datetime
+from cryptography.fernet import Fernet
+import config
+from utils import encryption
+
+
+def _rate(func, count: int) -> float:
+    start = time.perf_counter()
+    func()
+    return round(count / (time.perf_counter() - start), 1)
+
+
+def run_encryption_benchmark(values: int) -> dict:
+    """Values per second for each encryption path."""
+    config.ENCRYPTION_KEY = config.ENCRYPTION_KEY or Fernet.generate_key().decode()
+    encryption.reset_cipher()
+    key = config.ENCRYPTION_KEY.split(',')[0].encode()
+    plain = [f"+1-555-{n:07d}" for n in range(values)]
+    tokens = encryption.encrypt_many(plain)
+    legacy = base64.urlsafe_b64encode(tokens[0].encode()).decode()
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'values': values,
+        'encrypt_per_call_cipher_per_sec': _rate(lambda: [Fernet(key).encrypt(v.encode()) for v in plain], values),
+        'encrypt_cached_per_sec': _rate(lambda: [encryption.encrypt_data(v) for v in plain], values),
+        'encrypt_many_per_sec': _rate(lambda: encryption.encrypt_many(plain), values),
+        'decrypt_cached_per_sec': _rate(lambda: [encryption.decrypt_data(t) for t in tokens], values),
+        'decrypt_many_per_sec': _rate(lambda: encryption.decrypt_many(tokens), values),
+        'token_bytes': len(tokens[0]),
+        'legacy_token_bytes': len(legacy),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark field encryption")
+    parser.add_argument('--values', type=int, default=5000)
+    parser.add_argument('--output', help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    output = json.dumps(run_encryption_benchmark(args.values), indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
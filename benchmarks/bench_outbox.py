@@ -0,0 +1,123 @@
+"""Email delivery throughput: one SMTP connection per message vs the outbox.
+
+Starts a local aiosmtpd server (optionally slowed down per message),
+queues N verification emails in a temporary SQLite outbox and compares
+sending them inline, one connection each as registration used to, with
+draining the outbox over a single reused session.
+
+Requires aiosmtpd (`pip install aiosmtpd`), which is only needed here.
+
+Usage:
+    python -m benchmarks.bench_outbox --messages 50 --delay 0.02
+"""
+import os
+import json
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+from datetime import datetime
+
+
+class _SinkHandler:
+    """Accepts every message after an optional delay."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received += 1
+        return '250 Message accepted for delivery'
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def run_outbox_benchmark(messages: int, delay: float) -> dict:
+    """Time inline sends and an outbox drain against a local SMTP sink."""
+    try:
+        from aiosmtpd.controller import Controller
+    except ImportError:
+        raise SystemExit("aiosmtpd is required: pip install aiosmtpd")
+
+    import config
+    from database.db_manager import DatabaseManager
+    from auth import outbox
+    from auth.email_service import EmailService
+
+    handler = _SinkHandler(delay)
+    controller = Controller(handler, hostname='127.0.0.1', port=_free_port())
+    controller.start()
+    config.SMTP_SERVER, config.SMTP_PORT = controller.hostname, controller.port
+    config.SMTP_STARTTLS = False
+    config.EMAIL_USER, config.EMAIL_PASSWORD = '', ''
+    config.EMAIL_FROM = 'oscar-bench@example.com'
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DatabaseManager(os.path.join(tmp, 'outbox.db'))
+            service = EmailService()
+            recipients = [f"bench-{n}@example.com" for n in range(messages)]
+
+            start = time.perf_counter()
+            for recipient in recipients:
+                subject, text, html = service._verification_content(recipient, "token")
+                session = outbox.SMTPSession()
+                session.send(outbox.build_message(recipient, subject, text, html))
+                session.close()
+            inline_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for recipient in recipients:
+                subject, text, html = service._verification_content(recipient, "token")
+                outbox.enqueue_email(recipient, subject, text, html, db=db)
+            enqueue_seconds = time.perf_counter() - start
+
+            worker = outbox.OutboxWorker(db)
+            connections_before = outbox.SMTP_CONNECTIONS.value()
+            start = time.perf_counter()
+            sent = worker.drain_once()
+            drain_seconds = time.perf_counter() - start
+            worker.session.close()
+            connections = outbox.SMTP_CONNECTIONS.value() - connections_before
+            counts = db.get_outbox_counts()
+    finally:
+        controller.stop()
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'messages': messages,
+        'server_delay_ms': delay * 1000,
+        'inline_ms_per_message': round(inline_seconds / messages * 1000, 2),
+        'enqueue_ms_per_message': round(enqueue_seconds / messages * 1000, 2),
+        'outbox_ms_per_message': round(drain_seconds / messages * 1000, 2),
+        'outbox_sent': sent,
+        'outbox_smtp_connections': int(connections),
+        'outbox_status_counts': counts,
+        'received': handler.received,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark inline SMTP sends against the email outbox")
+    parser.add_argument('--messages', type=int, default=50)
+    parser.add_argument('--delay', type=float, default=0.0, help="Seconds the sink waits per message")
+    parser.add_argument('--output', help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    output = json.dumps(run_outbox_benchmark(args.messages, args.delay), indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Synthetic dataset generator.
+
+Creates N verified users with M expenses each plus friends, transactions and
+reminders. Distributions are seeded so every run produces the same data:
+
+- expense amounts are log-normal per category, dated over the last year
+  with more activity in recent months and on weekends
+- 0-12 friends per user with a handful of lent/borrowed transactions each;
+  half have an encrypted phone and email with blind indexes
+- 2-20 reminders per user, mostly pending, due within -60..+90 days;
+  a quarter of them recurring
+"""
+import random
+import argparse
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List
+import bcrypt
+from database.db_manager import DatabaseManager
+from utils.encryption import encrypt_many, blind_index, field_encryption_enabled
+
+logger = logging.getLogger(__name__)
+
+PASSWORD = "benchmark-password"
+EMAIL_TEMPLATE = "bench-user-{}@example.com"
+
+# (category, weight, median amount, sigma)
+CATEGORIES = [
+    ("Food & Dining", 30, 18.0, 0.6),
+    ("Transportation", 15, 12.0, 0.7),
+    ("Shopping", 14, 45.0, 0.9),
+    ("Entertainment", 8, 25.0, 0.7),
+    ("Bills & Utilities", 8, 90.0, 0.5),
+    ("Healthcare", 5, 60.0, 0.9),
+    ("Education", 3, 120.0, 0.8),
+    ("Travel", 4, 250.0, 0.9),
+    ("Other", 13, 20.0, 1.0),
+]
+PAYMENT_METHODS = [("Credit Card", 40), ("Debit Card", 25), ("UPI", 15), ("Cash", 15), ("Net Banking", 5)]
+TITLES = {
+    "Food & Dining": ["Groceries", "Lunch", "Dinner out", "Coffee", "Takeaway"],
+    "Transportation": ["Fuel", "Metro card", "Taxi", "Parking", "Bus fare"],
+    "Shopping": ["Clothes", "Electronics", "Home supplies", "Books", "Gift"],
+    "Entertainment": ["Movies", "Concert", "Streaming", "Games", "Museum"],
+    "Bills & Utilities": ["Electricity", "Internet", "Phone bill", "Water", "Gas"],
+    "Healthcare": ["Pharmacy", "Doctor visit", "Dentist", "Gym"],
+    "Education": ["Course fee", "Textbooks", "Workshop"],
+    "Travel": ["Flight", "Hotel", "Train ticket", "Car rental"],
+    "Other": ["Misc", "Donation", "Repair", "Subscription"],
+}
+REMINDER_TYPES = [("Bill Payment", 35), ("Subscription", 25), ("EMI", 15), ("Insurance", 10), ("Tax", 5), ("Other", 10)]
+REMINDER_STATUSES = [("pending", 70), ("completed", 25), ("cancelled", 5)]
+RECURRENCES = [(None, 75), ("Monthly", 15), ("Weekly", 5), ("Yearly", 5)]
+FRIEND_NAMES = ["Alex", "Sam", "Priya", "Chen", "Maria", "Omar", "Lena", "Ravi",
+                "Yuki", "Noah", "Ana", "Tom", "Ivy", "Ken", "Zoe", "Raj"]
+
+
+def _weighted(rng: random.Random, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights, k=1)[0]
+
+
+def _expense_date(rng: random.Random, today: datetime) -> str:
+    """Date within the last year, skewed towards recent months and weekends."""
+    days_ago = min(int(rng.expovariate(1 / 90)), 364)
+    day = today - timedelta(days=days_ago)
+    if day.weekday() < 5 and rng.random() < 0.25:
+        day += timedelta(days=5 - day.weekday())
+        if day > today:
+            day = today
+    return day.strftime("%Y-%m-%d")
+
+
+def _placeholders(db: DatabaseManager, count: int) -> str:
+    marker = '%s' if db.use_postgres else '?'
+    return ', '.join([marker] * count)
+
+
+def _insert_many(db: DatabaseManager, table: str, columns: List[str], rows: List[tuple]):
+    if not rows:
+        return
+    query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({_placeholders(db, len(columns))})"
+    with db.get_connection() as conn:
+        conn.cursor().executemany(query, rows)
+
+
+def reset_database(db: DatabaseManager):
+    """Remove all rows from the application tables."""
+    tables = ['maintenance_jobs', 'email_outbox', 'sessions', 'transactions', 'friends', 'reminders', 'expenses', 'budget_settings', 'users']
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        if db.use_postgres:
+            cursor.execute(f"TRUNCATE {', '.join(tables)} RESTART IDENTITY CASCADE")
+        else:
+            for table in tables:
+                cursor.execute(f"DELETE FROM {table}")
+
+
+def generate_dataset(db: DatabaseManager, users: int = 20, expenses_per_user: int = 200,
+                     seed: int = 42, bcrypt_rounds: int = 4) -> Dict:
+    """
+    Populate the database with a reproducible synthetic dataset.
+
+    Args:
+        db: Target database manager
+        users: Number of users to create
+        expenses_per_user: Expenses generated for every user
+        seed: Random seed
+        bcrypt_rounds: Cost of the shared password hash (low to keep setup fast)
+
+    Returns:
+        Dictionary with created user ids and row counts per table
+    """
+    rng = random.Random(seed)
+    today = datetime.now()
+    password_hash = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(bcrypt_rounds)).decode('utf-8')
+    verified = True if db.use_postgres else 1
+
+    user_ids = []
+    for i in range(users):
+        email = EMAIL_TEMPLATE.format(i)
+        user_id = db.create_user(email, password_hash, f"Bench User {i}", None)
+        if not user_id:
+            user_id = db.get_user_by_email(email)['id']
+        user_ids.append(user_id)
+    with db.get_connection() as conn:
+        marker = '%s' if db.use_postgres else '?'
+        conn.cursor().executemany(
+            f"UPDATE users SET is_verified = {marker}, monthly_budget = {marker} WHERE id = {marker}",
+            [(verified, float(rng.choice([1500, 2000, 3000, 4500])), uid) for uid in user_ids]
+        )
+
+    expense_rows, friend_rows, reminder_rows = [], [], []
+    encrypted = field_encryption_enabled()
+    for user_id in user_ids:
+        for _ in range(expenses_per_user):
+            category, _, median, sigma = rng.choices(CATEGORIES, weights=[c[1] for c in CATEGORIES], k=1)[0]
+            amount = round(rng.lognormvariate(0, sigma) * median, 2)
+            expense_rows.append((
+                user_id, rng.choice(TITLES[category]), amount, category,
+                _weighted(rng, PAYMENT_METHODS), _expense_date(rng, today),
+                "Synthetic note" if rng.random() < 0.2 else None
+            ))
+
+        for name in rng.sample(FRIEND_NAMES, rng.randint(0, 12)):
+            phone = email = None
+            if rng.random() < 0.5:
+                phone = f"+1 555 {rng.randrange(10 ** 7):07d}"
+                email = f"{name.lower()}{phone[-4:]}@example.com"
+            if encrypted:
+                friend_rows.append((user_id, name, *encrypt_many([phone, email]), None,
+                                    blind_index('phone', phone), blind_index('email', email), 0))
+            else:
+                friend_rows.append((user_id, name, phone, email, None, None, None, 0))
+
+        for _ in range(rng.randint(2, 20)):
+            reminder_type = _weighted(rng, REMINDER_TYPES)
+            due = today + timedelta(days=rng.randint(-60, 90))
+            notify_days = rng.choice([1, 3, 7])
+            recurrence = _weighted(rng, RECURRENCES)
+            reminder_rows.append((
+                user_id, f"{reminder_type} {rng.randint(1, 99)}", reminder_type,
+                due.strftime("%Y-%m-%d"), round(rng.uniform(10, 800), 2) if rng.random() < 0.8 else None,
+                None, notify_days, _weighted(rng, REMINDER_STATUSES),
+                (due - timedelta(days=notify_days)).strftime("%Y-%m-%d"),
+                (True if db.use_postgres else 1) if recurrence else (False if db.use_postgres else 0), recurrence
+            ))
+
+    _insert_many(db, 'expenses', ['user_id', 'title', 'amount', 'category', 'payment_method', 'date', 'notes'],
+                 expense_rows)
+    _insert_many(db, 'friends', ['user_id', 'name', 'phone', 'email', 'notes', 'phone_bidx', 'email_bidx', 'balance'], friend_rows)
+    _insert_many(db, 'reminders', ['user_id', 'title', 'type', 'due_date', 'amount', 'description',
+                                   'notify_days_before', 'status', 'notify_on', 'recurring', 'recurrence_type'],
+                 reminder_rows)
+
+    # Transactions go through add_transaction semantics so balances stay consistent
+    friends = db.execute_query('SELECT id, user_id FROM friends', fetch=True) or []
+    transaction_rows, balances = [], {}
+    for friend in friends:
+        for _ in range(rng.randint(0, 6)):
+            trans_type = rng.choice(['lent', 'borrowed'])
+            amount = round(rng.uniform(5, 150), 2)
+            date = (today - timedelta(days=rng.randint(0, 180))).strftime("%Y-%m-%d")
+            transaction_rows.append((friend['user_id'], friend['id'], trans_type, amount, "Shared expense", date))
+            balances[friend['id']] = balances.get(friend['id'], 0) + (amount if trans_type == 'lent' else -amount)
+    _insert_many(db, 'transactions', ['user_id', 'friend_id', 'transaction_type', 'amount', 'description', 'date'],
+                 transaction_rows)
+    with db.get_connection() as conn:
+        marker = '%s' if db.use_postgres else '?'
+        conn.cursor().executemany(
+            f"UPDATE friends SET balance = {marker} WHERE id = {marker}",
+            [(round(balance, 2), friend_id) for friend_id, balance in balances.items()]
+        )
+
+    summary = {
+        'user_ids': user_ids,
+        'users': len(user_ids),
+        'expenses': len(expense_rows),
+        'friends': len(friend_rows),
+        'transactions': len(transaction_rows),
+        'reminders': len(reminder_rows),
+    }
+    logger.info(f"Generated dataset: {summary['users']} users, {summary['expenses']} expenses")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Oscar dataset")
+    parser.add_argument('--sqlite', default='bench.db', help="SQLite file (ignored with --database-url)")
+    parser.add_argument('--database-url', help="PostgreSQL URL")
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--expenses', type=int, default=200, help="Expenses per user")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--reset', action='store_true', help="Delete existing rows first")
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.sqlite, database_url=args.database_url)
+    if args.reset:
+        reset_database(db)
+    summary = generate_dataset(db, args.users, args.expenses, args.seed)
+    summary.pop('user_ids')
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
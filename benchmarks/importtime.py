@@ -0,0 +1,133 @@
+"""Cold-start import time report.
+
+Imports each target module in a fresh interpreter with `-X importtime`,
+and reports the total import time, the heaviest top-level packages and
+whether any of the heavy libraries were loaded. With --first-paint it
+also times a cold AppTest run of main.py, i.e. the login screen.
+
+Usage:
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --runs 5 --first-paint --output importtime.json
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# main: the app script; the rest are loaded by workers and CLIs on their own
+TARGETS = ['main', 'config', 'database.db_manager', 'auth.hashing', 'auth.outbox', 'utils.notifications']
+HEAVY = ['pandas', 'numpy', 'plotly', 'bcrypt', 'cryptography', 'email_validator', 'dns', 'streamlit']
+
+FIRST_PAINT = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file('main.py', default_timeout=120).run()
+print("first_paint_ms", round((time.perf_counter() - start) * 1000, 1))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Rows of `-X importtime` output as {'name', 'self_us', 'cumulative_us', 'depth'}."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append({
+            'name': name.strip(),
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us),
+            'depth': (len(name) - len(name.lstrip())) // 2,
+        })
+    return rows
+
+
+def measure_import(target: str) -> List[Dict]:
+    """Import one module in a fresh interpreter and return the parsed timings."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {target}'],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def summarize(target: str, runs: List[List[Dict]], top: int) -> Dict:
+    totals = [sum(row['cumulative_us'] for row in rows if row['depth'] == 0) / 1000 for rows in runs]
+    # Heaviest top-level packages of the median run, counting each package once
+    rows = sorted(runs, key=lambda r: sum(row['cumulative_us'] for row in r if row['depth'] == 0))[len(runs) // 2]
+    packages = {}
+    for row in rows:
+        package = row['name'].split('.')[0]
+        if package != target.split('.')[0]:
+            packages[package] = max(packages.get(package, 0), row['cumulative_us'])
+    loaded = {row['name'].split('.')[0] for row in rows}
+    return {
+        'target': target,
+        'median_ms': round(statistics.median(totals), 1),
+        'min_ms': round(min(totals), 1),
+        'heaviest': [{'package': name, 'ms': round(us / 1000, 1)}
+                     for name, us in sorted(packages.items(), key=lambda item: -item[1])[:top]],
+        'heavy_loaded': sorted(name for name in HEAVY if name in loaded),
+    }
+
+
+def measure_first_paint(runs: int) -> Dict:
+    """Wall time of a cold AppTest run of main.py, which renders the login page."""
+    timings = []
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, 'DATABASE_NAME': os.path.join(tmp, 'oscar.db')}
+        for _ in range(runs):
+            result = subprocess.run([sys.executable, '-c', FIRST_PAINT], cwd=ROOT, env=env,
+                                    capture_output=True, text=True)
+            if result.returncode != 0:
+                raise RuntimeError(f"first paint failed:\n{result.stderr[-2000:]}")
+            timings.append(next(float(line.split()[1]) for line in result.stdout.splitlines()
+                                if line.startswith('first_paint_ms')))
+    return {'median_ms': round(statistics.median(timings), 1), 'min_ms': round(min(timings), 1)}
+
+
+def run_report(targets: List[str], runs: int, top: int, first_paint: bool) -> Dict:
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'runs': runs,
+        'imports': [summarize(target, [measure_import(target) for _ in range(runs)], top) for target in targets],
+    }
+    if first_paint:
+        report['first_paint'] = measure_first_paint(runs)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report cold-start import times")
+    parser.add_argument('targets', nargs='*', default=TARGETS, help="Modules to import")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--top', type=int, default=8, help="Heaviest packages to list per target")
+    parser.add_argument('--first-paint', action='store_true', help="Also time a cold AppTest run of main.py")
+    parser.add_argument('--output', help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    report = run_report(args.targets, args.runs, args.top, args.first_paint)
+    for entry in report['imports']:
+        heaviest = ', '.join(f"{item['package']} {item['ms']}" for item in entry['heaviest'][:4])
+        print(f"{entry['target']:<24}{entry['median_ms']:>9.1f} ms   {heaviest}")
+        if entry['heavy_loaded']:
+            print(f"{'':<24}loads: {', '.join(entry['heavy_loaded'])}")
+    if 'first_paint' in report:
+        print(f"{'first paint (login)':<24}{report['first_paint']['median_ms']:>9.1f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""Concurrent-session load test driving main.py through Streamlit's AppTest.
+
+Seeds a synthetic SQLite dataset, then runs K simulated users in parallel.
+Each user logs in, cycles through Dashboard, Expenses, Analytics and Friends
+and adds an expense on every loop. Every script run is timed and the report
+gives latency percentiles and error rates per action as JSON.
+
+Usage:
+    python -m benchmarks.loadtest --concurrency 8 --loops 5 --output load.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+PAGES = ["Dashboard", "Expenses", "Analytics", "Friends"]
+
+
+class LoadStats:
+    """Thread-safe collection of per-action timings and errors."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.error_messages: List[str] = []
+        self._lock = threading.Lock()
+
+    def record(self, action: str, seconds: float, error: str = None):
+        with self._lock:
+            self.samples.setdefault(action, []).append(seconds)
+            if error:
+                self.errors[action] = self.errors.get(action, 0) + 1
+                if len(self.error_messages) < 20:
+                    self.error_messages.append(f"{action}: {error}")
+
+    def report(self) -> Dict:
+        from benchmarks.bench_db import percentile
+        actions = []
+        for action, samples in sorted(self.samples.items()):
+            errors = self.errors.get(action, 0)
+            actions.append({
+                'action': action,
+                'runs': len(samples),
+                'errors': errors,
+                'error_rate': round(errors / len(samples), 4),
+                'p50_ms': round(percentile(samples, 50) * 1000, 1),
+                'p95_ms': round(percentile(samples, 95) * 1000, 1),
+                'p99_ms': round(percentile(samples, 99) * 1000, 1),
+                'max_ms': round(max(samples) * 1000, 1),
+            })
+        total = sum(len(s) for s in self.samples.values())
+        total_errors = sum(self.errors.values())
+        return {
+            'runs': total,
+            'errors': total_errors,
+            'error_rate': round(total_errors / total, 4) if total else 0.0,
+            'actions': actions,
+            'error_messages': self.error_messages,
+        }
+
+
+def _timed_run(at, stats: LoadStats, action: str, timeout: float):
+    """Run the script once and record latency plus any uncaught exception."""
+    start = time.perf_counter()
+    error = None
+    try:
+        at.run(timeout=timeout)
+        if at.exception:
+            error = at.exception[0].message
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    stats.record(action, time.perf_counter() - start, error)
+    return error is None
+
+
+def _button(at, label: str = None, key: str = None):
+    """First button matching a key or label (form submit buttons included)."""
+    if key:
+        return at.button(key=key)
+    return next(b for b in at.button if b.label == label)
+
+
+def login(at, email: str, password: str, stats: LoadStats, timeout: float) -> bool:
+    _timed_run(at, stats, 'open', timeout)
+    at.text_input[0].input(email)
+    at.text_input[1].input(password)
+    _button(at, label="Sign In").click()
+    _timed_run(at, stats, 'login', timeout)
+    if not at.session_state['authenticated']:
+        stats.record('login', 0.0, f"login rejected for {email}")
+        return False
+    return True
+
+
+def navigate(at, page: str, stats: LoadStats, timeout: float):
+    from app_pages import PAGES as PAGE_SCRIPTS
+    at.switch_page(f"app_pages/{PAGE_SCRIPTS[page][0]}")
+    _timed_run(at, stats, f"page:{page}", timeout)
+
+
+def add_expense(at, rng: random.Random, stats: LoadStats, timeout: float):
+    title = next(t for t in at.text_input if t.label == "Title*")
+    title.input(f"Load test {rng.randint(1, 9999)}")
+    amount = next(n for n in at.number_input if n.label == "Amount*")
+    amount.set_value(round(rng.uniform(1, 200), 2))
+    _button(at, label="Add Expense").click()
+    _timed_run(at, stats, 'add_expense', timeout)
+
+
+def simulate_user(index: int, email: str, password: str, loops: int, stats: LoadStats,
+                  seed: int, timeout: float):
+    """One simulated session: login, then navigate and add expenses."""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed + index)
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    if not login(at, email, password, stats, timeout):
+        return
+
+    for _ in range(loops):
+        for page in PAGES:
+            navigate(at, page, stats, timeout)
+            if page == "Expenses":
+                add_expense(at, rng, stats, timeout)
+
+
+def run_load_test(concurrency: int, loops: int, users: int, expenses: int, seed: int = 42,
+                  timeout: float = 60.0) -> Dict:
+    """Seed a dataset and drive `concurrency` sessions against it."""
+    from database.db_manager import DatabaseManager
+    from benchmarks.datagen import generate_dataset, EMAIL_TEMPLATE, PASSWORD
+
+    db = DatabaseManager()
+    dataset = generate_dataset(db, max(users, concurrency), expenses, seed)
+    dataset.pop('user_ids')
+
+    stats = LoadStats()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(simulate_user, i, EMAIL_TEMPLATE.format(i % dataset['users']), PASSWORD,
+                        loops, stats, seed, timeout)
+            for i in range(concurrency)
+        ]
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                stats.record('session', 0.0, f"{type(e).__name__}: {e}")
+    elapsed = time.perf_counter() - start
+
+    report = stats.report()
+    report.update({
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'concurrency': concurrency,
+        'loops': loops,
+        'dataset': dataset,
+        'elapsed_seconds': round(elapsed, 2),
+        'runs_per_sec': round(report['runs'] / elapsed, 2) if elapsed else 0.0,
+    })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent AppTest load test for main.py")
+    parser.add_argument('--concurrency', type=int, default=4, help="Simulated concurrent users")
+    parser.add_argument('--loops', type=int, default=3, help="Navigation loops per user")
+    parser.add_argument('--users', type=int, default=20, help="Users in the synthetic dataset")
+    parser.add_argument('--expenses', type=int, default=200, help="Expenses per user")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--timeout', type=float, default=60.0, help="Per-run timeout in seconds")
+    parser.add_argument('--output', help="Write JSON report to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Must be set before the app modules construct their DatabaseManager
+        os.environ['DATABASE_NAME'] = os.path.join(tmp, 'loadtest.db')
+        os.environ.pop('DATABASE_URL', None)
+        # Match the dataset's cheap hashes so logins do not trigger a one-off rehash
+        os.environ.setdefault('BCRYPT_ROUNDS', '4')
+        report = run_load_test(args.concurrency, args.loops, args.users, args.expenses,
+                               args.seed, args.timeout)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+    return 1 if report['error_rate'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""Per-page query-count and latency budget check.
+
+Renders every page component through AppTest against a seeded SQLite
+dataset, counts the DB statements it issues and times the render. Fails
+(exit code 1) when a page exceeds the budget declared in
+components/page_budgets.json.
+
+Usage:
+    python -m benchmarks.page_budgets
+    python -m benchmarks.page_budgets --runs 5 --output budgets.json
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+from typing import Dict, List
+
+BUDGETS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            'components', 'page_budgets.json')
+
+PAGES = {
+    'render_dashboard': 'components.dashboard',
+    'render_expenses': 'components.expenses',
+    'render_dates': 'components.dates',
+    'render_budget': 'components.budget',
+    'render_friends': 'components.friends',
+    'render_analytics': 'components.analytics',
+    'render_profile': 'components.profile',
+}
+
+# Session state key of each page's lazy tabs (see components/tabs.py)
+PAGE_TABS = {
+    'render_expenses': 'expense_tab',
+    'render_dates': 'dates_tab',
+    'render_budget': 'budget_tab',
+    'render_friends': 'friends_tab',
+    'render_analytics': 'analytics_tab',
+    'render_profile': 'profile_tab',
+}
+
+PAGE_SCRIPT = """
+import time
+import importlib
+import streamlit as st
+from app_pages import all_pages
+
+# Register the pages so that st.page_link works
+st.navigation(all_pages(), position="hidden")
+page = getattr(importlib.import_module(st.session_state['_budget_module']), st.session_state['_budget_func'])
+start = time.perf_counter()
+page(st.session_state.user, st.session_state['_budget_db'])
+st.session_state['_budget_elapsed'] = time.perf_counter() - start
+"""
+
+
+def load_budgets(path: str = BUDGETS_PATH) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def measure_page(func: str, module: str, user: Dict, db, runs: int) -> Dict:
+    """
+    Render a page `runs` times per tab; report the max statements and median time.
+    
+    Pages with lazy tabs only run the selected tab, so one discovery render
+    first finds the tab labels, then every tab is rendered `runs` times and
+    the page is measured by its heaviest tab.
+    """
+    from streamlit.testing.v1 import AppTest
+    from database.db_manager import add_query_listener, remove_query_listener
+
+    statements: List[str] = []
+    listener = lambda statement, seconds: statements.append(' '.join(statement.split()))
+
+    tab_key = PAGE_TABS.get(func)
+    query_counts: Dict = {}
+    timings: Dict = {}
+    names = {None: 'default'}
+    repeated, errors = set(), []
+
+    def render(tab):
+        at = AppTest.from_string(PAGE_SCRIPT, default_timeout=60)
+        at.session_state.user = user
+        at.session_state['_budget_db'] = db
+        at.session_state['_budget_module'] = module
+        at.session_state['_budget_func'] = func
+        if tab:
+            at.session_state[tab_key] = tab
+        statements.clear()
+        at.run()
+        if at.exception:
+            errors.append(at.exception[0].message)
+            return None
+        return at
+
+    add_query_listener(listener)
+    try:
+        tabs: List = [None]
+        if tab_key:
+            at = render(None)
+            if at is not None and at.tabs:
+                names[None] = at.tabs[0].label
+                tabs += [t.label for t in at.tabs][1:]
+        for _ in range(runs):
+            for tab in tabs:
+                at = render(tab)
+                if at is None:
+                    continue
+                query_counts.setdefault(tab, []).append(len(statements))
+                timings.setdefault(tab, []).append(at.session_state['_budget_elapsed'])
+                repeated.update(s for s in statements if statements.count(s) > 1)
+    finally:
+        remove_query_listener(listener)
+
+    return {
+        'page': func,
+        'queries': max(max(counts) for counts in query_counts.values()) if query_counts else None,
+        'ms': round(max(statistics.median(t) for t in timings.values()) * 1000, 1) if timings else None,
+        'tabs': {names.get(tab, tab): {'queries': max(query_counts[tab]),
+                                         'ms': round(statistics.median(timings[tab]) * 1000, 1)}
+                 for tab in query_counts} if tab_key else {},
+        'repeated_statements': sorted(repeated),
+        'errors': errors,
+    }
+
+
+def check_budgets(results: List[Dict], budgets: Dict) -> List[str]:
+    """Human-readable budget violations."""
+    failures = []
+    for result in results:
+        page = result['page']
+        budget = budgets.get(page)
+        if result['errors']:
+            failures.append(f"{page}: raised {result['errors'][0]}")
+            continue
+        if not budget:
+            failures.append(f"{page}: no budget declared in {os.path.basename(BUDGETS_PATH)}")
+            continue
+        if result['queries'] > budget['max_queries']:
+            failures.append(f"{page}: {result['queries']} queries > budget {budget['max_queries']}")
+        if result['ms'] > budget['max_ms']:
+            failures.append(f"{page}: {result['ms']} ms > budget {budget['max_ms']} ms")
+    return failures
+
+
+def run_checks(runs: int = 3, users: int = 3, expenses: int = 300, seed: int = 42,
+               pages: List[str] = None) -> Dict:
+    """Seed a dataset and measure every page against its budget."""
+    from database.db_manager import DatabaseManager
+    from benchmarks.datagen import generate_dataset
+
+    db = DatabaseManager()
+    dataset = generate_dataset(db, users, expenses, seed)
+    user = db.get_user_by_id(dataset['user_ids'][0])
+
+    results = [measure_page(func, module, user, db, runs)
+               for func, module in PAGES.items() if not pages or func in pages]
+    failures = check_budgets(results, load_budgets())
+    return {'results': results, 'failures': failures}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check per-page query and latency budgets")
+    parser.add_argument('--runs', type=int, default=3, help="Renders per page (median time is used)")
+    parser.add_argument('--expenses', type=int, default=300, help="Expenses for the measured user")
+    parser.add_argument('--pages', nargs='*', help="Only check these render_* functions")
+    parser.add_argument('--output', help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_NAME'] = os.path.join(tmp, 'budgets.db')
+        os.environ.pop('DATABASE_URL', None)
+        report = run_checks(args.runs, expenses=args.expenses, pages=args.pages)
+
+    for result in report['results']:
+        print(f"{result['page']:<20} {str(result['queries']):>4} queries {str(result['ms']):>8} ms")
+        for tab, numbers in result['tabs'].items():
+            print(f"    {tab:<20} {numbers['queries']:>2} queries {numbers['ms']:>8} ms")
+        for statement in result['repeated_statements']:
+            print(f"    repeated: {statement[:100]}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if report['failures']:
+        print("\nBudget exceeded:")
+        for failure in report['failures']:
+            print(f"  {failure}")
+        return 1
+    print("\nAll pages within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
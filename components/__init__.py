@@ -1,22 +1,26 @@
-"""UI components for Oscar Finance Tracker."""
-from .auth import render_auth
-from .dashboard import render_dashboard
-from .expenses import render_expenses
-from .reminders import render_reminders
-from .dates import render_dates
-from .budget import render_budget
-from .friends import render_friends
-from .analytics import render_analytics
-from .profile import render_profile
+"""UI components for Oscar Finance Tracker.
 
-__all__ = [
-    'render_auth',
-    'render_dashboard',
-    'render_expenses',
-    'render_reminders',
-    'render_dates',
-    'render_budget',
-    'render_friends',
-    'render_analytics',
-    'render_profile'
-]
\ No newline at end of file
+Page renderers are re-exported lazily so that loading one page (or the
+login screen) does not import pandas and plotly for all the others.
+"""
+import importlib
+
+_EXPORTS = {
+    'render_auth': 'auth',
+    'render_dashboard': 'dashboard',
+    'render_expenses': 'expenses',
+    'render_reminders': 'reminders',
+    'render_dates': 'dates',
+    'render_budget': 'budget',
+    'render_friends': 'friends',
+    'render_analytics': 'analytics',
+    'render_profile': 'profile',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
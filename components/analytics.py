@@ -1,35 +1,84 @@
+import threading
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
+from typing import Optional
 from database.db_manager import DatabaseManager
+from components.tabs import lazy_tabs
+from utils.metrics import record_cache
+
+# Set by the builders below, whose bodies st.cache_data only runs on a miss
+_builds = threading.local()
 
 def render_analytics(user: dict, db: DatabaseManager):
     """Render analytics page"""
     st.markdown("### Analytics")
     
-    tab1, tab2, tab3 = st.tabs(["Overview", "Trends", "Insights"])
-    
-    with tab1:
-        render_analytics_overview(user, db)
-    
-    with tab2:
-        render_trends(user, db)
-    
-    with tab3:
-        render_insights(user, db)
+    lazy_tabs("analytics_tab", {
+        "Overview": render_analytics_overview,
+        "Trends": render_trends,
+        "Insights": render_insights,
+    }, user, db)
+
+def _cached(cache: str, builder, *args):
+    """Call a cached builder and count the lookup as a hit or a miss."""
+    _builds.missed = False
+    result = builder(*args)
+    record_cache(cache, hit=not _builds.missed)
+    return result
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def _build_overview(_db: DatabaseManager, user_id: int, data_version: int, current_month: str,
+                    last_month: str) -> dict:
+    """
+    Monthly totals and the category pie spec of the overview tab.
+    
+    Cached per (user_id, data_version, months): the version changes on every
+    expense write, so entries never go stale and the totals are only
+    queried and plotted once per change.
+    """
+    _builds.missed = True
+    categories = _db.category_totals(user_id, month=current_month)
+    last = _db.summary(user_id, month=last_month)
+    
+    overview = {
+        'current_total': sum(c['total'] for c in categories),
+        'current_count': sum(c['count'] for c in categories),
+        'last_total': last['total'],
+        'last_count': last['count'],
+        'figure': None,
+    }
+    if not categories:
+        return overview
+    
+    fig = px.pie(
+        values=[round(c['total'], 2) for c in categories], 
+        names=[c['category'] for c in categories],
+        color_discrete_sequence=px.colors.sequential.Oranges_r,
+        hole=0.4
+    )
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font_color='white',
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=-0.3, xanchor="center", x=0.5, font=dict(size=10)),
+        margin=dict(l=10, r=10, t=10, b=10),
+        height=280
+    )
+    overview['figure'] = fig.to_dict()
+    return overview
 
 def render_analytics_overview(user: dict, db: DatabaseManager):
     """Render analytics overview"""
     current_month = datetime.now().strftime("%Y-%m")
     last_month = (datetime.now().replace(day=1) - timedelta(days=1)).strftime("%Y-%m")
     
-    current_expenses = db.get_user_expenses(user['id'], month=current_month)
-    last_expenses = db.get_user_expenses(user['id'], month=last_month)
-    
-    current_total = sum(exp['amount'] for exp in current_expenses) if current_expenses else 0
-    last_total = sum(exp['amount'] for exp in last_expenses) if last_expenses else 0
+    overview = _cached('analytics_overview', _build_overview, db, user['id'], db.get_data_version(user['id']),
+                       current_month, last_month)
+    current_total = overview['current_total']
+    last_total = overview['last_total']
     
     if last_total > 0:
         change = ((current_total - last_total) / last_total) * 100
@@ -47,12 +96,12 @@ def render_analytics_overview(user: dict, db: DatabaseManager):
         <div style="flex: 1; background: rgba(30, 45, 65, 0.5); border-radius: 10px; padding: 12px; text-align: center;">
             <p style="color: rgba(255,255,255,0.5); font-size: 0.6rem; text-transform: uppercase; margin: 0;">This Month</p>
             <p style="color: #FF9000; font-size: 1.2rem; font-weight: 700; margin: 4px 0 0 0;">${current_total:,.2f}</p>
-            <p style="color: rgba(255,255,255,0.4); font-size: 0.55rem; margin: 2px 0 0 0;">{len(current_expenses)} transactions</p>
+            <p style="color: rgba(255,255,255,0.4); font-size: 0.55rem; margin: 2px 0 0 0;">{overview['current_count']} transactions</p>
         </div>
         <div style="flex: 1; background: rgba(30, 45, 65, 0.5); border-radius: 10px; padding: 12px; text-align: center;">
             <p style="color: rgba(255,255,255,0.5); font-size: 0.6rem; text-transform: uppercase; margin: 0;">Last Month</p>
             <p style="color: white; font-size: 1.2rem; font-weight: 700; margin: 4px 0 0 0;">${last_total:,.2f}</p>
-            <p style="color: rgba(255,255,255,0.4); font-size: 0.55rem; margin: 2px 0 0 0;">{len(last_expenses)} transactions</p>
+            <p style="color: rgba(255,255,255,0.4); font-size: 0.55rem; margin: 2px 0 0 0;">{overview['last_count']} transactions</p>
         </div>
     </div>
     """, unsafe_allow_html=True)
@@ -69,56 +118,36 @@ def render_analytics_overview(user: dict, db: DatabaseManager):
     st.markdown("---")
     st.markdown("#### Spending by Category")
     
-    if current_expenses:
-        df = pd.DataFrame(current_expenses)
-        category_totals = df.groupby('category')['amount'].sum().reset_index()
-        
-        fig = px.pie(
-            category_totals, 
-            values='amount', 
-            names='category',
-            color_discrete_sequence=px.colors.sequential.Oranges_r,
-            hole=0.4
-        )
-        fig.update_layout(
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font_color='white',
-            showlegend=True,
-            legend=dict(orientation="h", yanchor="bottom", y=-0.3, xanchor="center", x=0.5, font=dict(size=10)),
-            margin=dict(l=10, r=10, t=10, b=10),
-            height=280
-        )
-        st.plotly_chart(fig, use_container_width=True)
+    if overview['figure']:
+        st.plotly_chart(overview['figure'], use_container_width=True)
     else:
         st.info("No expenses this month")
 
-def render_trends(user: dict, db: DatabaseManager):
-    """Render spending trends"""
-    st.markdown("#### Spending Trends")
-    
-    all_expenses = db.get_user_expenses(user['id'])
+@st.cache_data(max_entries=512, show_spinner=False)
+def _build_trends(_db: DatabaseManager, user_id: int, data_version: int, months: int = 6) -> dict:
+    """
+    Spec of the monthly spending line, cached like _build_overview.
     
-    if not all_expenses:
-        st.info("Start tracking expenses to see trends!")
-        return
+    Expenses are summed per month in the database, so the figure holds at
+    most `months` points however long the history is.
     
-    df = pd.DataFrame(all_expenses)
-    df['date'] = pd.to_datetime(df['date'])
-    df['month'] = df['date'].dt.to_period('M')
+    Returns:
+        {'expenses': whether there are any, 'figure': the spec, or None
+        with fewer than two months}
+    """
+    _builds.missed = True
+    monthly_totals = _db.monthly_totals(user_id, limit=months)
     
-    monthly_totals = df.groupby('month')['amount'].sum().reset_index()
-    monthly_totals['month'] = monthly_totals['month'].astype(str)
-    monthly_totals = monthly_totals.tail(6)
+    if not monthly_totals:
+        return {'expenses': False, 'figure': None}
     
     if len(monthly_totals) < 2:
-        st.info("Need at least 2 months of data")
-        return
+        return {'expenses': True, 'figure': None}
     
     fig = go.Figure()
     fig.add_trace(go.Scatter(
-        x=monthly_totals['month'],
-        y=monthly_totals['amount'],
+        x=[m['month'] for m in monthly_totals],
+        y=[round(m['total'], 2) for m in monthly_totals],
         mode='lines+markers',
         line=dict(color='#FF9000', width=3),
         marker=dict(size=10),
@@ -135,27 +164,56 @@ def render_trends(user: dict, db: DatabaseManager):
         margin=dict(l=10, r=10, t=10, b=30),
         height=250
     )
+    return {'expenses': True, 'figure': fig.to_dict()}
+
+def render_trends(user: dict, db: DatabaseManager):
+    """Render spending trends"""
+    st.markdown("#### Spending Trends")
+    
+    trends = _cached('analytics_trends', _build_trends, db, user['id'], db.get_data_version(user['id']))
     
-    st.plotly_chart(fig, use_container_width=True)
+    if not trends['expenses']:
+        st.info("Start tracking expenses to see trends!")
+        return
+    
+    if not trends['figure']:
+        st.info("Need at least 2 months of data")
+        return
+    
+    st.plotly_chart(trends['figure'], use_container_width=True)
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def _build_insights(_db: DatabaseManager, user_id: int, data_version: int) -> Optional[dict]:
+    """All-time insight figures, cached like _build_overview; None without expenses."""
+    _builds.missed = True
+    categories = _db.category_totals(user_id)
+    if not categories:
+        return None
+    
+    weekdays = _db.weekday_totals(user_id)
+    count = sum(c['count'] for c in categories)
+    return {
+        'top_category': categories[0]['category'],
+        'top_amount': categories[0]['total'],
+        'top_day': max(weekdays, key=lambda d: d['total'])['day'] if weekdays else "-",
+        'avg_transaction': sum(c['total'] for c in categories) / count,
+        'count': count,
+    }
 
 def render_insights(user: dict, db: DatabaseManager):
     """Render spending insights"""
     st.markdown("#### Spending Insights")
     
-    all_expenses = db.get_user_expenses(user['id'])
+    insights = _cached('analytics_insights', _build_insights, db, user['id'], db.get_data_version(user['id']))
     
-    if not all_expenses:
+    if not insights:
         st.info("Add expenses to see insights!")
         return
     
-    df = pd.DataFrame(all_expenses)
-    df['date'] = pd.to_datetime(df['date'])
-    df['day_of_week'] = df['date'].dt.day_name()
-    
-    top_category = df.groupby('category')['amount'].sum().idxmax()
-    top_amount = df.groupby('category')['amount'].sum().max()
-    top_day = df.groupby('day_of_week')['amount'].sum().idxmax()
-    avg_transaction = df['amount'].mean()
+    top_category = insights['top_category']
+    top_amount = insights['top_amount']
+    top_day = insights['top_day']
+    avg_transaction = insights['avg_transaction']
     
     # 2x2 grid using HTML flexbox
     st.markdown(f"""
@@ -177,7 +235,7 @@ def render_insights(user: dict, db: DatabaseManager):
         </div>
         <div style="flex: 1 1 45%; min-width: 140px; background: rgba(156, 39, 176, 0.1); border: 1px solid rgba(156, 39, 176, 0.3); border-radius: 8px; padding: 10px;">
             <p style="color: rgba(255,255,255,0.5); font-size: 0.6rem; text-transform: uppercase; margin: 0;">Total Expenses</p>
-            <p style="color: #9C27B0; font-size: 0.95rem; font-weight: 600; margin: 4px 0;">{len(df)}</p>
+            <p style="color: #9C27B0; font-size: 0.95rem; font-weight: 600; margin: 4px 0;">{insights['count']}</p>
             <p style="color: rgba(255,255,255,0.4); font-size: 0.6rem; margin: 0;">All time</p>
         </div>
     </div>
@@ -1,10 +1,21 @@
 import streamlit as st
+import config
 from auth.authentication import AuthManager
 from auth.email_service import EmailService
+from auth.hashing import HashingBusyError
+from auth.sessions import get_session_manager
+from utils.validators import validate_email
 
-# Initialize managers
-auth_manager = AuthManager()
 email_service = EmailService()
+_auth_manager = None
+
+
+def get_auth_manager() -> AuthManager:
+    """Shared AuthManager, built on first use rather than at import."""
+    global _auth_manager
+    if _auth_manager is None:
+        _auth_manager = AuthManager()
+    return _auth_manager
 
 
 def render_auth():
@@ -17,7 +28,7 @@ def render_auth():
         email = query_params['email']
         
         # Verify the user
-        success = auth_manager.verify_email(email, verification_token)
+        success = get_auth_manager().verify_email(email, verification_token)
         
         if success:
             st.success("Email verified successfully! You can now login.")
@@ -70,11 +81,21 @@ def render_login():
         if submit:
             if not email or not password:
                 st.error("Please enter both email and password")
+            elif not get_auth_manager().allow_attempt(email, getattr(st.context, 'ip_address', None)):
+                st.error("Too many login attempts. Please wait a minute and try again.")
             else:
-                user = auth_manager.login_user(email, password)
+                try:
+                    user = get_auth_manager().login_user(email, password)
+                except HashingBusyError:
+                    st.error("The server is busy. Please try again in a moment.")
+                    return
                 if user:
                     st.session_state.authenticated = True
                     st.session_state.user = user
+                    token = get_session_manager().create_session(user['id'])
+                    if token:
+                        st.session_state.session_token = token
+                        st.query_params['session'] = token
                     st.success("Login successful!")
                     st.rerun()
                 else:
@@ -102,22 +123,31 @@ def render_register():
         submit = st.form_submit_button("Create Account", use_container_width=True, type="primary")
         
         if submit:
+            email_valid, email, email_message = validate_email(
+                email, check_deliverability=config.EMAIL_CHECK_DELIVERABILITY
+            )
             if not full_name or not email or not password or not confirm_password:
                 st.error("Please fill in all fields")
             elif password != confirm_password:
                 st.error("Passwords do not match")
             elif len(password) < 6:
                 st.error("Password must be at least 6 characters long")
-            elif '@' not in email or '.' not in email:
-                st.error("Please enter a valid email address")
+            elif not email_valid:
+                st.error(f"Please enter a valid email address. {email_message}")
+            elif not get_auth_manager().allow_attempt(email, getattr(st.context, 'ip_address', None)):
+                st.error("Too many attempts. Please wait a minute and try again.")
             else:
                 # Register user
-                result = auth_manager.register_user(email, password, full_name)
+                try:
+                    result = get_auth_manager().register_user(email, password, full_name)
+                except HashingBusyError:
+                    st.error("The server is busy. Please try again in a moment.")
+                    return
                 
                 if result:
-                    # Send verification email
+                    # Queue verification email for the background worker
                     try:
-                        email_sent = email_service.send_verification_email(
+                        email_sent = email_service.queue_verification_email(
                             email,
                             result['verification_token']
                         )
@@ -2,18 +2,16 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 from database.db_manager import DatabaseManager
+from components.tabs import lazy_tabs
 
 def render_budget(user: dict, db: DatabaseManager):
     """Render budget tracker page"""
     st.markdown("### Budget Tracker")
     
-    tab1, tab2 = st.tabs(["Overview", "Set Budgets"])
-    
-    with tab1:
-        render_budget_overview(user, db)
-    
-    with tab2:
-        render_set_budgets(user, db)
+    lazy_tabs("budget_tab", {
+        "Overview": render_budget_overview,
+        "Set Budgets": render_set_budgets,
+    }, user, db)
 
 def render_budget_overview(user: dict, db: DatabaseManager):
     """Render budget overview with horizontal category display"""
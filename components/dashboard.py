@@ -1,23 +1,27 @@
 import streamlit as st
-import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta
+from itertools import islice
 from database.db_manager import DatabaseManager
+from app_pages import page
+from utils.recurrence import expand_reminders
 
 def render_dashboard(user: dict, db: DatabaseManager):
     """Render dashboard page"""
     
     st.markdown(f"## Welcome, {user.get('full_name', 'User')}!")
     
-    monthly_budget = user.get('monthly_budget', 0) or 0
-    current_month = datetime.now().strftime("%Y-%m")
-    expenses = db.get_user_expenses(user['id'], month=current_month)
+    today = datetime.now().date()
+    # One round trip for the whole page
+    summary = db.get_dashboard_summary(user['id'], today.strftime("%Y-%m-%d"))
     
-    total_spent = sum(exp['amount'] for exp in expenses) if expenses else 0
+    monthly_budget = summary['monthly_budget']
+    expenses = summary['recent_expenses']
+    total_spent = summary['total']
     remaining = monthly_budget - total_spent
-    num_transactions = len(expenses)
+    num_transactions = summary['count']
     
     if monthly_budget > 0:
-        percentage_used = (total_spent / monthly_budget) * 100
+        percentage_used = summary['budget_used']
         if percentage_used < 50:
             status = "Excellent"
             status_color = "#4CAF50"
@@ -66,7 +70,7 @@ def render_dashboard(user: dict, db: DatabaseManager):
     # Recent Expenses
     st.markdown("#### Recent Expenses")
     if expenses:
-        for exp in expenses[:4]:
+        for exp in expenses:
             st.markdown(f"""
             <div style="padding: 8px 10px; margin: 4px 0; background: rgba(30, 45, 65, 0.4); border-radius: 8px; border-left: 2px solid #FF9000;">
                 <div style="display: flex; justify-content: space-between; align-items: center;">
@@ -79,9 +83,7 @@ def render_dashboard(user: dict, db: DatabaseManager):
             </div>
             """, unsafe_allow_html=True)
         
-        if st.button("View All →", key="view_exp", use_container_width=True):
-            st.session_state.current_page = "Expenses"
-            st.rerun()
+        st.page_link(page("Expenses"), label="View All →", use_container_width=True)
     else:
         st.info("No expenses yet")
     
@@ -89,7 +91,12 @@ def render_dashboard(user: dict, db: DatabaseManager):
     
     # Upcoming Reminders
     st.markdown("#### Upcoming Reminders")
-    reminders = db.get_user_reminders(user['id'])
+    reminders = summary['reminders']
+    if any(r.get('recurring') for r in reminders):
+        # Show each recurring series by its next occurrence instead of its start date
+        window_end = today + timedelta(days=366)
+        occurrences = expand_reminders(reminders, today, window_end, summary['overrides'], include_overdue=True)
+        reminders = list(islice((r for r in occurrences if r['status'] == 'pending'), 4))
     
     if reminders:
         for reminder in reminders[:4]:
@@ -118,8 +125,6 @@ def render_dashboard(user: dict, db: DatabaseManager):
             </div>
             """, unsafe_allow_html=True)
         
-        if st.button("View All →", key="view_rem", use_container_width=True):
-            st.session_state.current_page = "Dates"
-            st.rerun()
+        st.page_link(page("Dates"), label="View All →", use_container_width=True)
     else:
         st.info("No reminders")
\ No newline at end of file
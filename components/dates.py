@@ -1,23 +1,21 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime, timedelta
 from database.db_manager import DatabaseManager
+from components.tabs import lazy_tabs
+from utils.recurrence import RECURRENCE_TYPES, expand_reminders, to_date
+import config
 
 def render_dates(user: dict, db: DatabaseManager):
     """Render dates page"""
     st.markdown("### Important Dates & Reminders")
     
-    tab1, tab2, tab3 = st.tabs(["Add Reminder", "Upcoming", "All Reminders"])
-    
-    with tab1:
-        render_add_reminder(user, db)
-    
-    with tab2:
-        render_upcoming_reminders(user, db)
-    
-    with tab3:
-        render_all_reminders(user, db)
+    lazy_tabs("dates_tab", {
+        "Add Reminder": render_add_reminder,
+        "Upcoming": render_upcoming_reminders,
+        "All Reminders": render_all_reminders,
+    }, user, db)
 
+@st.fragment
 def render_add_reminder(user: dict, db: DatabaseManager):
     """Render add reminder form"""
     st.markdown("#### Create New Reminder")
@@ -27,8 +25,9 @@ def render_add_reminder(user: dict, db: DatabaseManager):
         
         col1, col2 = st.columns(2)
         with col1:
-            reminder_type = st.selectbox("Type", ["Bill Payment", "Subscription", "EMI", "Insurance", "Tax", "Other"])
+            reminder_type = st.selectbox("Type", config.REMINDER_TYPES)
             amount = st.number_input("Amount (optional)", min_value=0.0, step=100.0)
+            repeats = st.selectbox("Repeats", ["Never"] + RECURRENCE_TYPES)
         
         with col2:
             due_date = st.date_input("Due Date*", min_value=datetime.now().date())
@@ -48,42 +47,48 @@ def render_add_reminder(user: dict, db: DatabaseManager):
                     'amount': amount if amount > 0 else None,
                     'description': description if description else None,
                     'notify_days_before': notify_days,
+                    'recurring': repeats != "Never",
+                    'recurrence_type': repeats if repeats != "Never" else None,
                     'status': 'pending'
                 }
                 
                 if db.add_reminder(reminder_data):
                     st.success("Reminder added!")
-                    st.rerun()
                 else:
                     st.error("Failed to add reminder")
 
+@st.fragment
 def render_upcoming_reminders(user: dict, db: DatabaseManager):
     """Render upcoming reminders with horizontal action buttons"""
     st.markdown("#### Upcoming (Next 30 Days)")
     
-    reminders = db.get_reminders(user['id'], status='pending')
+    today = datetime.now().date()
+    thirty_days = today + timedelta(days=30)
+    reminders = db.query_reminders(user['id'], status='pending', due_from=today.strftime("%Y-%m-%d"),
+                                   due_to=thirty_days.strftime("%Y-%m-%d"))
     
     if not reminders:
         st.info("No upcoming reminders")
         return
     
-    df = pd.DataFrame(reminders)
-    df['due_date'] = pd.to_datetime(df['due_date'])
+    # Recurring series are expanded into their occurrences for the window
+    overrides = {}
+    if any(r.get('recurring') for r in reminders):
+        overrides = db.get_reminder_overrides(user['id'], today.strftime("%Y-%m-%d"), thirty_days.strftime("%Y-%m-%d"))
+    upcoming = [r for r in expand_reminders(reminders, today, thirty_days, overrides) if r['status'] == 'pending']
     
-    today = datetime.now()
-    thirty_days = today + timedelta(days=30)
-    upcoming = df[(df['due_date'] >= today) & (df['due_date'] <= thirty_days)].sort_values('due_date')
-    
-    if upcoming.empty:
+    if not upcoming:
         st.info("No reminders in the next 30 days")
         return
     
-    for _, reminder in upcoming.iterrows():
-        days_until = (reminder['due_date'] - today).days
+    for reminder in upcoming:
+        due_date = to_date(reminder['due_date'])
+        days_until = (due_date - today).days
         color = "#F44336" if days_until <= 3 else "#FF9800" if days_until <= 7 else "#4CAF50"
         days_text = "Today!" if days_until == 0 else f"{days_until}d"
         reminder_type = reminder.get('type') or reminder.get('reminder_type') or 'Reminder'
-        amount_text = f" • ${reminder['amount']:,.0f}" if pd.notna(reminder.get('amount')) and reminder['amount'] > 0 else ""
+        amount_text = f" • ${reminder['amount']:,.0f}" if reminder.get('amount') and reminder['amount'] > 0 else ""
+        repeat_text = f" • {reminder['recurrence_type']}" if reminder.get('recurring') else ""
         
         # Card with info
         st.markdown(f"""
@@ -91,11 +96,11 @@ def render_upcoming_reminders(user: dict, db: DatabaseManager):
             <div style="display: flex; justify-content: space-between; align-items: center;">
                 <div style="flex: 1;">
                     <p style="color: #ffffff; font-size: 0.85rem; font-weight: 500; margin: 0;">{reminder['title']}</p>
-                    <p style="color: rgba(255,255,255,0.4); font-size: 0.6rem; margin: 2px 0 0 0;">{reminder_type}{amount_text}</p>
+                    <p style="color: rgba(255,255,255,0.4); font-size: 0.6rem; margin: 2px 0 0 0;">{reminder_type}{amount_text}{repeat_text}</p>
                 </div>
                 <div style="text-align: right;">
                     <p style="color: {color}; font-size: 0.8rem; font-weight: 600; margin: 0;">{days_text}</p>
-                    <p style="color: rgba(255,255,255,0.4); font-size: 0.55rem; margin: 0;">{reminder['due_date'].strftime('%b %d')}</p>
+                    <p style="color: rgba(255,255,255,0.4); font-size: 0.55rem; margin: 0;">{due_date.strftime('%b %d')}</p>
                 </div>
             </div>
         </div>
@@ -103,22 +108,31 @@ def render_upcoming_reminders(user: dict, db: DatabaseManager):
         
         # Action buttons HORIZONTAL using HTML flexbox
         reminder_id = reminder['id']
+        occurrence = reminder['occurrence_date']
         st.markdown(f"""
-        <div id="actions_{reminder_id}" style="display: flex; flex-direction: row; gap: 6px; margin-bottom: 12px; margin-top: 4px;">
+        <div id="actions_{reminder_id}_{occurrence}" style="display: flex; flex-direction: row; gap: 6px; margin-bottom: 12px; margin-top: 4px;">
         """, unsafe_allow_html=True)
         
         btn_cols = st.columns([1, 1, 4])
-        with btn_cols[0]:
-            if st.button("Done", key=f"done_{reminder_id}"):
-                db.update_reminder_status(reminder_id, 'completed')
-                st.rerun()
-        with btn_cols[1]:
-            if st.button("Delete", key=f"del_up_{reminder_id}"):
-                db.delete_reminder(reminder_id)
-                st.rerun()
+        if reminder.get('recurring'):
+            # Only this occurrence changes; the series keeps repeating
+            with btn_cols[0]:
+                st.button("Done", key=f"done_{reminder_id}_{occurrence}", on_click=db.set_occurrence_status,
+                          args=(reminder_id, occurrence, 'completed'))
+            with btn_cols[1]:
+                st.button("Skip", key=f"skip_{reminder_id}_{occurrence}", on_click=db.set_occurrence_status,
+                          args=(reminder_id, occurrence, 'cancelled'))
+        else:
+            with btn_cols[0]:
+                st.button("Done", key=f"done_{reminder_id}", on_click=db.update_reminder_status,
+                          args=(reminder_id, 'completed'))
+            with btn_cols[1]:
+                st.button("Delete", key=f"del_up_{reminder_id}", on_click=db.delete_reminder,
+                          args=(reminder_id,))
         
         st.markdown("</div>", unsafe_allow_html=True)
 
+@st.fragment
 def render_all_reminders(user: dict, db: DatabaseManager):
     """Render all reminders with filters and horizontal action buttons"""
     st.markdown("#### All Reminders")
@@ -127,38 +141,31 @@ def render_all_reminders(user: dict, db: DatabaseManager):
     with col1:
         status_filter = st.selectbox("Status", ["All", "Pending", "Completed", "Cancelled"], key="rem_status")
     with col2:
-        type_filter = st.selectbox("Type", ["All", "Bill Payment", "Subscription", "EMI", "Insurance", "Tax", "Other"], key="rem_type")
+        type_filter = st.selectbox("Type", ["All"] + config.REMINDER_TYPES, key="rem_type")
     
-    if status_filter == "All":
-        reminders = db.get_all_reminders(user['id'])
-    else:
-        reminders = db.get_reminders(user['id'], status=status_filter.lower())
+    reminders = db.query_reminders(
+        user['id'],
+        status=None if status_filter == "All" else status_filter.lower(),
+        reminder_type=None if type_filter == "All" else type_filter,
+        descending=True
+    )
     
     if not reminders:
-        st.info("No reminders found")
-        return
-    
-    df = pd.DataFrame(reminders)
-    df['due_date'] = pd.to_datetime(df['due_date'])
-    
-    if type_filter != "All":
-        type_col = 'type' if 'type' in df.columns else 'reminder_type'
-        if type_col in df.columns:
-            df = df[df[type_col] == type_filter]
-    
-    if df.empty:
-        st.info("No reminders with selected filters")
+        if status_filter == "All" and type_filter == "All":
+            st.info("No reminders found")
+        else:
+            st.info("No reminders with selected filters")
         return
     
-    df = df.sort_values('due_date', ascending=False)
-    
-    for _, reminder in df.iterrows():
+    for reminder in reminders:
         reminder_type = reminder.get('type') or reminder.get('reminder_type') or 'Reminder'
         status = reminder.get('status', 'pending').capitalize()
         status_colors = {'Pending': '#FF9800', 'Completed': '#4CAF50', 'Cancelled': '#9E9E9E'}
         status_color = status_colors.get(status, '#FF9800')
-        due_date_str = reminder['due_date'].strftime('%b %d, %Y')
-        amount_text = f"${reminder['amount']:,.0f}" if pd.notna(reminder.get('amount')) and reminder['amount'] > 0 else ""
+        due_date_str = to_date(reminder['due_date']).strftime('%b %d, %Y')
+        if reminder.get('recurring') and reminder.get('recurrence_type'):
+            due_date_str = f"{reminder['recurrence_type']} from {due_date_str}"
+        amount_text = f"${reminder['amount']:,.0f}" if reminder.get('amount') and reminder['amount'] > 0 else ""
         
         st.markdown(f"""
         <div style="background: rgba(30, 45, 65, 0.5); border-radius: 6px; padding: 10px; border-left: 3px solid {status_color}; margin-bottom: 4px;">
@@ -178,19 +185,16 @@ def render_all_reminders(user: dict, db: DatabaseManager):
         
         with btn_cols[0]:
             if reminder.get('status') == 'pending':
-                if st.button("Complete", key=f"comp_{reminder_id}", help="Complete"):
-                    db.update_reminder_status(reminder_id, 'completed')
-                    st.rerun()
+                st.button("Complete", key=f"comp_{reminder_id}", help="Complete",
+                          on_click=db.update_reminder_status, args=(reminder_id, 'completed'))
         
         with btn_cols[1]:
             if reminder.get('status') != 'cancelled':
-                if st.button("Cancel", key=f"canc_{reminder_id}", help="Cancel"):
-                    db.update_reminder_status(reminder_id, 'cancelled')
-                    st.rerun()
+                st.button("Cancel", key=f"canc_{reminder_id}", help="Cancel",
+                          on_click=db.update_reminder_status, args=(reminder_id, 'cancelled'))
         
         with btn_cols[2]:
-            if st.button("Delete", key=f"del_all_{reminder_id}", help="Delete"):
-                db.delete_reminder(reminder_id)
-                st.rerun()
+            st.button("Delete", key=f"del_all_{reminder_id}", help="Delete",
+                      on_click=db.delete_reminder, args=(reminder_id,))
         
-        st.markdown('<div style="height: 8px;"></div>', unsafe_allow_html=True)
\ No newline at end of file
+        st.markdown('<div style="height: 8px;"></div>', unsafe_allow_html=True)
@@ -2,19 +2,35 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 from database.db_manager import DatabaseManager
+from components.tabs import lazy_tabs
+
+EXPENSE_CATEGORIES = ["Food & Dining", "Transportation", "Shopping", "Entertainment",
+                      "Bills & Utilities", "Healthcare", "Education", "Travel", "Other"]
+PAYMENT_METHODS = ["Cash", "Credit Card", "Debit Card", "UPI", "Net Banking", "Other"]
+# Expense grid columns, all editable in place
+EDITABLE_COLUMNS = ['date', 'title', 'category', 'payment_method', 'amount', 'notes']
+
+# Sort options of the expense grid: label -> (column, descending)
+SORT_OPTIONS = {
+    "Newest first": ('date', True),
+    "Oldest first": ('date', False),
+    "Highest amount": ('amount', True),
+    "Lowest amount": ('amount', False),
+    "Title A-Z": ('title', False),
+    "Category": ('category', False),
+}
+PAGE_SIZE = 25
 
 def render_expenses(user: dict, db: DatabaseManager):
     """Render expenses page"""
     st.markdown("### Expenses")
     
-    tab1, tab2 = st.tabs(["Add Expense", "View Expenses"])
-    
-    with tab1:
-        render_add_expense(user, db)
-    
-    with tab2:
-        render_view_expenses(user, db)
+    lazy_tabs("expense_tab", {
+        "Add Expense": render_add_expense,
+        "View Expenses": render_view_expenses,
+    }, user, db)
 
+@st.fragment
 def render_add_expense(user: dict, db: DatabaseManager):
     """Render add expense form"""
     st.markdown("#### Add New Expense")
@@ -25,18 +41,11 @@ def render_add_expense(user: dict, db: DatabaseManager):
         col1, col2 = st.columns(2)
         with col1:
             amount = st.number_input("Amount*", min_value=0.01, step=0.01)
-            category = st.selectbox(
-                "Category",
-                ["Food & Dining", "Transportation", "Shopping", "Entertainment", 
-                 "Bills & Utilities", "Healthcare", "Education", "Travel", "Other"]
-            )
+            category = st.selectbox("Category", EXPENSE_CATEGORIES)
         
         with col2:
             date = st.date_input("Date", value=datetime.now())
-            payment_method = st.selectbox(
-                "Payment Method",
-                ["Cash", "Credit Card", "Debit Card", "UPI", "Net Banking", "Other"]
-            )
+            payment_method = st.selectbox("Payment Method", PAYMENT_METHODS)
         
         notes = st.text_area("Notes (optional)", placeholder="Add notes...", height=60)
         
@@ -57,21 +66,19 @@ def render_add_expense(user: dict, db: DatabaseManager):
                 )
                 if success:
                     st.success("Expense added!")
-                    st.rerun()
                 else:
                     st.error("Failed to add expense")
 
+@st.fragment
 def render_view_expenses(user: dict, db: DatabaseManager):
-    """Render view expenses - compact with delete inside card"""
+    """Render view expenses - one page at a time in a selectable grid"""
     st.markdown("#### Your Expenses")
     
-    # Filters side by side using HTML
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
     with col1:
         category_filter = st.selectbox(
             "Category",
-            ["All Categories", "Food & Dining", "Transportation", "Shopping", 
-             "Entertainment", "Bills & Utilities", "Healthcare", "Education", "Travel", "Other"],
+            ["All Categories"] + EXPENSE_CATEGORIES,
             key="exp_cat"
         )
     
@@ -82,51 +89,145 @@ def render_view_expenses(user: dict, db: DatabaseManager):
             months.append(m.strftime("%Y-%m"))
         month_filter = st.selectbox("Month", months, key="exp_month")
     
+    with col3:
+        sort_label = st.selectbox("Sort", list(SORT_OPTIONS), key="exp_sort")
+    
     category = category_filter if category_filter != "All Categories" else None
     month = month_filter if month_filter != "All Time" else None
-    expenses = db.get_user_expenses(user['id'], category=category, month=month)
+    summary = db.count_user_expenses(user['id'], category=category, month=month)
     
-    if not expenses:
+    if not summary['count']:
         st.info("No expenses found")
         return
     
-    total = sum(e['amount'] for e in expenses)
     st.markdown(f"""
     <div style="background: rgba(30, 45, 65, 0.5); border-radius: 8px; padding: 8px 12px; margin-bottom: 10px;">
         <span style="color: rgba(255,255,255,0.6); font-size: 0.7rem;">Total: </span>
-        <span style="color: #FF9000; font-size: 1rem; font-weight: 700;">${total:,.2f}</span>
-        <span style="color: rgba(255,255,255,0.4); font-size: 0.65rem; margin-left: 8px;">({len(expenses)} items)</span>
+        <span style="color: #FF9000; font-size: 1rem; font-weight: 700;">${summary['total']:,.2f}</span>
+        <span style="color: rgba(255,255,255,0.4); font-size: 0.65rem; margin-left: 8px;">({summary['count']} items)</span>
     </div>
     """, unsafe_allow_html=True)
     
-    # Expense list with delete button INSIDE the card
-    for expense in expenses:
-        expense_id = expense['id']
-        
-        try:
-            exp_date = datetime.strptime(expense['date'], "%Y-%m-%d").strftime("%b %d")
-        except:
-            exp_date = str(expense['date'])[:10] if expense['date'] else ""
-        
-        col_card, col_btn = st.columns([6, 1])
+    # Back to the first page whenever the filters or the order change
+    view = (category, month, sort_label)
+    if st.session_state.get('exp_view') != view:
+        st.session_state.exp_view = view
+        st.session_state.exp_page = 1
+        st.session_state.exp_grid = st.session_state.get('exp_grid', 0) + 1
+    pages = max(1, -(-summary['count'] // PAGE_SIZE))
+    page = min(st.session_state.get('exp_page', 1), pages)
+    
+    sort_by, descending = SORT_OPTIONS[sort_label]
+    expenses = db.get_expenses_page(user['id'], category=category, month=month,
+                                    sort_by=sort_by, descending=descending,
+                                    limit=PAGE_SIZE, offset=(page - 1) * PAGE_SIZE)
+    
+    editing = st.toggle("Edit", key="exp_edit", help="Edit the expenses on this page in place")
+    # A new key per page, view and mode clears the row selection and pending edits
+    grid_key = f"exp_grid_{st.session_state.exp_grid}_{page}_{int(editing)}"
+    df = pd.DataFrame(expenses, columns=['id', 'version'] + EDITABLE_COLUMNS)
+    df['date'] = pd.to_datetime(df['date'], errors='coerce').dt.date
+    
+    if editing:
+        edited = st.data_editor(
+            df,
+            hide_index=True,
+            use_container_width=True,
+            num_rows="fixed",
+            key=grid_key,
+            column_order=EDITABLE_COLUMNS,
+            column_config={
+                'date': st.column_config.DateColumn("Date", format="MMM DD", required=True),
+                'title': st.column_config.TextColumn("Title", required=True),
+                'category': st.column_config.SelectboxColumn("Category", options=EXPENSE_CATEGORIES, required=True),
+                'payment_method': st.column_config.SelectboxColumn("Payment", options=PAYMENT_METHODS, required=True),
+                'amount': st.column_config.NumberColumn("Amount", format="$%.2f", min_value=0.01, required=True),
+                'notes': st.column_config.TextColumn("Notes"),
+            },
+        )
+        changes, invalid = _changed_rows(df, edited)
+        if invalid:
+            st.warning(f"{len(invalid)} edited row(s) need a title, an amount above zero and a date "
+                       f"and will not be saved: {', '.join(invalid)}")
+        selected = []
+    else:
+        event = st.dataframe(
+            df.drop(columns=['id', 'version', 'notes']),
+            hide_index=True,
+            use_container_width=True,
+            on_select="rerun",
+            selection_mode="multi-row",
+            key=grid_key,
+            column_config={
+                'date': st.column_config.DateColumn("Date", format="MMM DD"),
+                'title': st.column_config.TextColumn("Title"),
+                'category': st.column_config.TextColumn("Category"),
+                'payment_method': st.column_config.TextColumn("Payment"),
+                'amount': st.column_config.NumberColumn("Amount", format="$%.2f"),
+            },
+        )
+        selected = [int(df['id'].iloc[row]) for row in event.selection.rows if row < len(df)]
+        changes = []
+    
+    nav_prev, nav_label, nav_next, nav_action = st.columns([1, 2, 1, 2])
+    with nav_prev:
+        st.button("Prev", key="exp_prev", disabled=page <= 1, use_container_width=True,
+                  on_click=st.session_state.update, kwargs={'exp_page': page - 1})
+    with nav_label:
+        st.markdown(f"<p style='text-align: center; color: rgba(255,255,255,0.6); font-size: 0.8rem; margin: 8px 0;'>"
+                    f"Page {page} of {pages}</p>", unsafe_allow_html=True)
+    with nav_next:
+        st.button("Next", key="exp_next", disabled=page >= pages, use_container_width=True,
+                  on_click=st.session_state.update, kwargs={'exp_page': page + 1})
+    with nav_action:
+        if editing:
+            st.button(f"Save changes ({len(changes)})", key="exp_save", type="primary",
+                      disabled=not changes, use_container_width=True,
+                      on_click=_save_changes, args=(user['id'], db, changes))
+        else:
+            st.button(f"Delete selected ({len(selected)})", key="exp_delete", disabled=not selected,
+                      use_container_width=True, on_click=_delete_selected, args=(user['id'], db, selected))
+    
+    if st.session_state.get('exp_notice'):
+        st.warning(st.session_state.pop('exp_notice'))
 
-        with col_card:
-            # Card with delete button inside, using flexbox
-            st.markdown(f"""
-            <div style="background: rgba(30, 45, 65, 0.4); border-radius: 8px; padding: 10px; margin-bottom: 6px; border-left: 3px solid #FF9000; height: 100%;">
-                <div style="display: flex; justify-content: space-between; align-items: center; gap: 8px; height: 100%;">
-                    <div style="flex: 1; min-width: 0;">
-                        <p style="color: #ffffff; font-size: 0.85rem; font-weight: 500; margin: 0; overflow: hidden; text-overflow: ellipsis; white-space: nowrap;">{expense['title']}</p>
-                        <p style="color: rgba(255,255,255,0.4); font-size: 0.65rem; margin: 2px 0 0 0;">{expense['category']} • {expense['payment_method']} • {exp_date}</p>
-                    </div>
-                    <div style="display: flex; align-items: center; gap: 8px;">
-                        <span style="color: #FF9000; font-size: 0.95rem; font-weight: 600;">${expense['amount']:,.2f}</span>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col_btn:
-            if st.button("Delete", key=f"del_{expense_id}", help="Delete", use_container_width=True):
-                db.delete_expense(user['id'], expense_id)
-                st.rerun()
\ No newline at end of file
+# Button callbacks of the expense list. They only change the list, so the
+# click reruns just its fragment.
+
+def _save_changes(user_id: int, db: DatabaseManager, changes: list):
+    result = db.update_expenses_bulk(user_id, changes)
+    if result is None:
+        st.session_state.exp_notice = "Failed to save changes"
+        return
+    st.session_state.exp_grid += 1
+    if result['conflicts']:
+        st.session_state.exp_notice = (f"{len(result['conflicts'])} expense(s) were changed elsewhere "
+                                       f"and were not saved; they now show the latest values")
+
+def _delete_selected(user_id: int, db: DatabaseManager, expense_ids: list):
+    if db.delete_expenses_bulk(user_id, expense_ids):
+        st.session_state.exp_grid += 1
+    else:
+        st.session_state.exp_notice = "Failed to delete expenses"
+
+def _changed_rows(original: pd.DataFrame, edited: pd.DataFrame) -> tuple:
+    """
+    Rows of the editor that differ from what was loaded, as update_expenses_bulk
+    changes, and the original titles of edited rows that cannot be saved.
+    """
+    changes, invalid = [], []
+    for (_, before), (_, after) in zip(original.iterrows(), edited.iterrows()):
+        row = {column: after[column] for column in EDITABLE_COLUMNS}
+        row['title'] = str(row['title'] or '').strip()
+        row['notes'] = row['notes'] if isinstance(row['notes'], str) and row['notes'] else None
+        if not row['title'] or pd.isna(row['amount']) or row['amount'] <= 0 or pd.isna(row['date']):
+            invalid.append(str(before['title'] or f"#{int(before['id'])}"))
+            continue
+        row['amount'] = round(float(row['amount']), 2)
+        row['date'] = pd.Timestamp(row['date']).strftime("%Y-%m-%d")
+        if (row['title'] != before['title'] or row['amount'] != round(float(before['amount']), 2)
+                or row['category'] != before['category'] or row['payment_method'] != before['payment_method']
+                or pd.isna(before['date']) or row['date'] != before['date'].strftime("%Y-%m-%d")
+                or row['notes'] != (before['notes'] or None)):
+            changes.append({'id': int(before['id']), 'version': int(before['version']), **row})
+    return changes, invalid
@@ -2,22 +2,20 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 from database.db_manager import DatabaseManager
+from components.tabs import lazy_tabs
+from utils.validators import validate_email
 
 def render_friends(user: dict, db: DatabaseManager):
     """Render friends page"""
     st.markdown("### Friends & Shared Expenses")
     
-    tab1, tab2, tab3 = st.tabs(["Overview", "Add Friend", "Transactions"])
-    
-    with tab1:
-        render_friends_overview(user, db)
-    
-    with tab2:
-        render_add_friend(user, db)
-    
-    with tab3:
-        render_transactions(user, db)
+    lazy_tabs("friends_tab", {
+        "Overview": render_friends_overview,
+        "Add Friend": render_add_friend,
+        "Transactions": render_transactions,
+    }, user, db)
 
+@st.fragment
 def render_friends_overview(user: dict, db: DatabaseManager):
     """Render friends overview with horizontal owed/owe boxes"""
     friends = db.get_user_friends(user['id'])
@@ -79,34 +77,27 @@ def render_friends_overview(user: dict, db: DatabaseManager):
         btn_cols = st.columns([1, 1, 1, 2])
         
         with btn_cols[0]:
-            if st.button("Lent", key=f"lent_{friend_id}"):
-                st.session_state.selected_friend = friend_id
-                st.session_state.transaction_type = 'lent'
-                st.rerun()
+            st.button("Lent", key=f"lent_{friend_id}", on_click=st.session_state.update,
+                      kwargs={'selected_friend': friend_id, 'transaction_type': 'lent'})
         
         with btn_cols[1]:
-            if st.button("Borrowed", key=f"bor_{friend_id}"):
-                st.session_state.selected_friend = friend_id
-                st.session_state.transaction_type = 'borrowed'
-                st.rerun()
+            st.button("Borrowed", key=f"bor_{friend_id}", on_click=st.session_state.update,
+                      kwargs={'selected_friend': friend_id, 'transaction_type': 'borrowed'})
         
         with btn_cols[2]:
-            if st.button("🗑", key=f"del_f_{friend_id}"):
-                db.delete_friend(user['id'], friend_id)
-                st.rerun()
+            st.button("🗑", key=f"del_f_{friend_id}", on_click=db.delete_friend, args=(user['id'], friend_id))
         
         st.markdown('<div style="height: 8px;"></div>', unsafe_allow_html=True)
     
     # Quick transaction form
     if 'selected_friend' in st.session_state and st.session_state.selected_friend:
-        render_quick_transaction(user, db)
+        render_quick_transaction(user, db, friends)
 
-def render_quick_transaction(user: dict, db: DatabaseManager):
+def render_quick_transaction(user: dict, db: DatabaseManager, friends: list):
     """Render quick transaction form"""
     friend_id = st.session_state.selected_friend
     trans_type = st.session_state.get('transaction_type', 'lent')
     
-    friends = db.get_user_friends(user['id'])
     friend = next((f for f in friends if f['id'] == friend_id), None)
     
     if not friend:
@@ -120,31 +111,35 @@ def render_quick_transaction(user: dict, db: DatabaseManager):
     with st.form("quick_trans"):
         col1, col2 = st.columns(2)
         with col1:
-            amount = st.number_input("Amount", min_value=0.01, step=1.0)
+            st.number_input("Amount", min_value=0.01, step=1.0, key="quick_amount")
         with col2:
-            description = st.text_input("Description", placeholder="e.g., Lunch")
+            st.text_input("Description", placeholder="e.g., Lunch", key="quick_description")
         
         btn_col1, btn_col2 = st.columns(2)
         with btn_col1:
-            if st.form_submit_button("Add", type="primary", use_container_width=True):
-                if amount > 0:
-                    db.add_transaction(
-                        user_id=user['id'],
-                        friend_id=friend_id,
-                        transaction_type=trans_type,
-                        amount=amount,
-                        description=description or "Transaction",
-                        date=datetime.now().strftime("%Y-%m-%d")
-                    )
-                    st.session_state.selected_friend = None
-                    st.success("Added!")
-                    st.rerun()
+            st.form_submit_button("Add", type="primary", use_container_width=True,
+                                  on_click=_add_quick_transaction, args=(user['id'], db, friend_id, trans_type))
         
         with btn_col2:
-            if st.form_submit_button("Cancel", use_container_width=True):
-                st.session_state.selected_friend = None
-                st.rerun()
+            st.form_submit_button("Cancel", use_container_width=True,
+                                  on_click=st.session_state.update, kwargs={'selected_friend': None})
+
+def _add_quick_transaction(user_id: int, db: DatabaseManager, friend_id: int, trans_type: str):
+    """Submit callback of the quick transaction form."""
+    amount = st.session_state.quick_amount
+    if not amount or amount <= 0:
+        return
+    db.add_transaction(
+        user_id=user_id,
+        friend_id=friend_id,
+        transaction_type=trans_type,
+        amount=amount,
+        description=st.session_state.quick_description or "Transaction",
+        date=datetime.now().strftime("%Y-%m-%d")
+    )
+    st.session_state.selected_friend = None
 
+@st.fragment
 def render_add_friend(user: dict, db: DatabaseManager):
     """Render add friend form"""
     st.markdown("#### Add New Friend")
@@ -161,8 +156,14 @@ def render_add_friend(user: dict, db: DatabaseManager):
         notes = st.text_area("Notes (optional)", height=60)
         
         if st.form_submit_button("Add Friend", type="primary", use_container_width=True):
+            email_valid, email, email_message = validate_email(email) if email else (True, email, "")
+            existing = db.find_friends_by_contact(user['id'], phone=phone, email=email) if phone or email else []
             if not name:
                 st.error("Please enter a name")
+            elif not email_valid:
+                st.error(email_message)
+            elif existing:
+                st.error(f"{existing[0]['name']} already has that phone number or email")
             else:
                 result = db.add_friend(
                     user_id=user['id'],
@@ -174,10 +175,10 @@ def render_add_friend(user: dict, db: DatabaseManager):
                 
                 if result:
                     st.success(f"{name} added!")
-                    st.rerun()
                 else:
                     st.error("Failed to add friend")
 
+@st.fragment
 def render_transactions(user: dict, db: DatabaseManager):
     """Render transactions tab"""
     st.markdown("#### Transaction History")
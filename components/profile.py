@@ -2,22 +2,17 @@ import streamlit as st
 from datetime import datetime, date
 import config
 from database.db_manager import DatabaseManager
+from components.tabs import lazy_tabs
 
 def render_profile(user: dict, db: DatabaseManager):
     """Render user profile page"""
     st.markdown("### Profile")
     
-    # Create tabs
-    tab1, tab2, tab3 = st.tabs(["Personal Info", "Financial Settings", "Account"])
-    
-    with tab1:
-        render_personal_info(user, db)
-    
-    with tab2:
-        render_financial_settings(user, db)
-    
-    with tab3:
-        render_account_settings(user, db)
+    lazy_tabs("profile_tab", {
+        "Personal Info": render_personal_info,
+        "Financial Settings": render_financial_settings,
+        "Account": render_account_settings,
+    }, user, db)
 
 def render_personal_info(user: dict, db: DatabaseManager):
     """Render personal information section"""
@@ -1,9 +1,10 @@
 """Reminders component."""
 import streamlit as st
-from datetime import datetime
+from datetime import datetime, date as date_type
 from database.db_manager import DatabaseManager
 from utils.formatters import format_currency, format_date
 from utils.validators import validate_amount, sanitize_input
+from utils.recurrence import RECURRENCE_TYPES, iter_occurrences, to_date
 import config
 
 def render_reminders(user: dict, db: DatabaseManager):
@@ -36,8 +37,7 @@ def render_reminders(user: dict, db: DatabaseManager):
                     amount = st.text_input("Amount ($)", placeholder="Optional")
                     
                     if is_recurring:
-                        frequency = st.selectbox("Frequency", 
-                                                ["Daily", "Weekly", "Monthly", "Yearly"])
+                        frequency = st.selectbox("Frequency", RECURRENCE_TYPES, index=2)
                     else:
                         frequency = None
                     
@@ -66,16 +66,16 @@ def render_reminders(user: dict, db: DatabaseManager):
                                 st.error(error_msg)
                                 amount_float = None
                         
-                        reminder_id = db.add_reminder(
-                            user_id=user['id'],
-                            title=sanitize_input(title),
-                            reminder_type=reminder_type,
-                            date=date.strftime("%Y-%m-%d"),
-                            amount=amount_float,
-                            frequency=frequency if is_recurring else None,
-                            is_recurring=is_recurring,
-                            notes=sanitize_input(notes) if notes else None
-                        )
+                        reminder_id = db.add_reminder({
+                            'user_id': user['id'],
+                            'title': sanitize_input(title),
+                            'type': reminder_type,
+                            'due_date': date.strftime("%Y-%m-%d"),
+                            'amount': amount_float,
+                            'recurring': is_recurring,
+                            'recurrence_type': frequency if is_recurring else None,
+                            'description': sanitize_input(notes) if notes else None
+                        })
                         
                         if reminder_id:
                             st.success("Reminder added successfully!")
@@ -86,14 +86,18 @@ def render_reminders(user: dict, db: DatabaseManager):
     
     st.markdown("<br>", unsafe_allow_html=True)
     
-    reminders = db.get_user_reminders(user['id'])
+    reminders = db.query_reminders(user['id'], status='pending')
     
     today = datetime.now().date()
     past_reminders = []
     upcoming_reminders = []
     
     for reminder in reminders:
-        reminder_date = datetime.strptime(reminder['date'], "%Y-%m-%d").date()
+        if reminder.get('recurring') and reminder.get('recurrence_type'):
+            # A series is listed by its next occurrence
+            next_due = next(iter_occurrences(reminder['due_date'], reminder['recurrence_type'], today, date_type.max))
+            reminder = {**reminder, 'due_date': next_due.strftime("%Y-%m-%d")}
+        reminder_date = to_date(reminder['due_date'])
         if reminder_date < today:
             past_reminders.append(reminder)
         else:
@@ -109,9 +113,9 @@ def render_reminders(user: dict, db: DatabaseManager):
                 with rem_col1:
                     st.markdown(f"**{reminder['title']}**")
                     
-                    date_str = format_date(reminder['date'])
-                    badge = " • Monthly" if reminder['is_recurring'] else ""
-                    st.caption(f"{reminder['reminder_type']} • {date_str}{badge}")
+                    date_str = format_date(reminder['due_date'])
+                    badge = f" • {reminder['recurrence_type']}" if reminder.get('recurring') else ""
+                    st.caption(f"{reminder['type']} • {date_str}{badge}")
                     
                     st.markdown("<span style='color: #F44336; font-size: 12px;'>Overdue</span>", 
                                unsafe_allow_html=True)
@@ -129,7 +133,7 @@ def render_reminders(user: dict, db: DatabaseManager):
                                 st.rerun()
                     with del_col:
                         if st.button("Delete", key=f"del_past_{reminder['id']}", help="Delete"):
-                            if db.delete_reminder(user['id'], reminder['id']):
+                            if db.delete_reminder(reminder['id']):
                                 st.success("Reminder deleted!")
                                 st.rerun()
                 
@@ -147,9 +151,9 @@ def render_reminders(user: dict, db: DatabaseManager):
                 with rem_col1:
                     st.markdown(f"**{reminder['title']}**")
                     
-                    date_str = format_date(reminder['date'])
-                    badge = " • Monthly" if reminder['is_recurring'] else ""
-                    st.caption(f"{reminder['reminder_type']} • {date_str}{badge}")
+                    date_str = format_date(reminder['due_date'])
+                    badge = f" • {reminder['recurrence_type']}" if reminder.get('recurring') else ""
+                    st.caption(f"{reminder['type']} • {date_str}{badge}")
                 
                 with rem_col2:
                     if reminder['amount']:
@@ -164,7 +168,7 @@ def render_reminders(user: dict, db: DatabaseManager):
                                 st.rerun()
                     with del_col:
                         if st.button("Delete", key=f"del_upcoming_{reminder['id']}", help="Delete"):
-                            if db.delete_reminder(user['id'], reminder['id']):
+                            if db.delete_reminder(reminder['id']):
                                 st.success("Reminder deleted!")
                                 st.rerun()
                 
@@ -0,0 +1,27 @@
+"""Tabs that only render the selected tab.
+
+st.tabs runs every tab body on every rerun and hides the inactive ones in
+the browser. With a key and on_change="rerun" Streamlit tracks the selected
+tab in session state and reruns when it changes, so the bodies of the
+other tabs - their queries and charts included - can be skipped.
+The key, on_change and the containers' open flag need Streamlit 1.55.
+"""
+from typing import Callable, Dict
+
+import streamlit as st
+
+
+def lazy_tabs(key: str, tabs: Dict[str, Callable], *args, **kwargs):
+    """
+    Render tabs, calling only the selected tab's render function.
+
+    Args:
+        key: Widget key holding the selected tab
+        tabs: Tab label -> render function, in display order
+        *args, **kwargs: Passed to the render function
+    """
+    containers = st.tabs(list(tabs), key=key, on_change="rerun")
+    for container, render in zip(containers, tabs.values()):
+        if container.open:
+            with container:
+                render(*args, **kwargs)
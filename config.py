@@ -1,11 +1,33 @@
 """Configuration settings for Oscar Finance Tracker."""
 import os
+import sys
+import logging
 from dotenv import load_dotenv
-import streamlit as st
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables from .env file (for local development)
 load_dotenv()
 
+# Where Streamlit looks for secrets.toml
+SECRETS_FILES = [os.path.expanduser(os.path.join("~", ".streamlit", "secrets.toml")),
+                 os.path.join(os.getcwd(), ".streamlit", "secrets.toml")]
+
+
+def streamlit_secrets():
+    """
+    Streamlit secrets, or None when there cannot be any.
+    
+    Importing streamlit is the slowest part of a cold start, so workers,
+    CLIs and benchmarks only pay for it when a secrets file exists; inside
+    the app streamlit is already loaded.
+    """
+    if 'streamlit' not in sys.modules and not any(os.path.exists(path) for path in SECRETS_FILES):
+        return None
+    import streamlit as st
+    return st.secrets
+
+
 # Get configuration from environment variables or Streamlit secrets
 def get_config(key, default=None):
     """Get config from environment or Streamlit secrets."""
@@ -16,8 +38,9 @@ def get_config(key, default=None):
     
     # Then try Streamlit secrets (for cloud deployment)
     try:
-        if hasattr(st, 'secrets') and key in st.secrets:
-            return st.secrets[key]
+        secrets = streamlit_secrets()
+        if secrets is not None and key in secrets:
+            return secrets[key]
     except:
         pass
     
@@ -26,19 +49,76 @@ def get_config(key, default=None):
 # Application settings
 APP_NAME = "OSCAR"
 APP_URL = get_config("APP_URL", "http://localhost:8501")
-DATABASE_NAME = "oscar.db"
+# SQLite file; DatabaseManager checks os.environ first at construction time
+# (benchmarks switch databases that way), then falls back to this value
+DATABASE_NAME = get_config("DATABASE_NAME", "oscar.db")
 
 # Email settings (for verification emails)
 EMAIL_USER = get_config("EMAIL_USER", "")
 EMAIL_PASSWORD = get_config("EMAIL_PASSWORD", "")
 SMTP_SERVER = get_config("SMTP_SERVER", "smtp.gmail.com")
 SMTP_PORT = int(get_config("SMTP_PORT", "587"))
+SMTP_STARTTLS = str(get_config("SMTP_STARTTLS", "true")).lower() in ("1", "true", "yes", "on")
+EMAIL_FROM = get_config("EMAIL_FROM", EMAIL_USER)
+# Registration only checks address syntax unless deliverability is enabled;
+# MX lookups then run in the background and are cached per domain
+EMAIL_CHECK_DELIVERABILITY = str(get_config("EMAIL_CHECK_DELIVERABILITY", "false")).lower() in ("1", "true", "yes", "on")
+EMAIL_DNS_TIMEOUT = float(get_config("EMAIL_DNS_TIMEOUT", "3"))
+EMAIL_DNS_CACHE_SECONDS = float(get_config("EMAIL_DNS_CACHE_SECONDS", "3600"))
+# Outbox delivery worker: batch size, retries with exponential backoff, poll interval
+OUTBOX_BATCH_SIZE = int(get_config("OUTBOX_BATCH_SIZE", "20"))
+OUTBOX_MAX_ATTEMPTS = int(get_config("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_RETRY_SECONDS = float(get_config("OUTBOX_RETRY_SECONDS", "30"))
+OUTBOX_POLL_SECONDS = float(get_config("OUTBOX_POLL_SECONDS", "5"))
+# How long the SMTP session is kept open after the outbox runs empty
+SMTP_IDLE_SECONDS = float(get_config("SMTP_IDLE_SECONDS", "30"))
+# Reminder digest dispatcher interval (it also purges expired sessions);
+# 0 disables the in-process scheduler (use cron instead)
+REMINDER_DISPATCH_SECONDS = float(get_config("REMINDER_DISPATCH_SECONDS", "3600"))
 
-# Print config status (for debugging)
-print("[CONFIG] EMAIL_USER:", EMAIL_USER if EMAIL_USER else "Not configured")
-print("[CONFIG] SMTP_SERVER:", SMTP_SERVER)
-print("[CONFIG] SMTP_PORT:", SMTP_PORT)
-print("[CONFIG] APP_URL:", APP_URL)
+# Authentication settings
+# bcrypt runs on a worker process pool; 0 workers hashes on the calling thread
+AUTH_HASH_WORKERS = int(get_config("AUTH_HASH_WORKERS", "2"))
+AUTH_HASH_QUEUE = int(get_config("AUTH_HASH_QUEUE", "16"))
+AUTH_HASH_TIMEOUT = float(get_config("AUTH_HASH_TIMEOUT", "10"))
+# bcrypt cost is calibrated at startup to take about BCRYPT_TARGET_MS per hash;
+# set BCRYPT_ROUNDS to pin it instead
+BCRYPT_TARGET_MS = float(get_config("BCRYPT_TARGET_MS", "100"))
+BCRYPT_MIN_ROUNDS = int(get_config("BCRYPT_MIN_ROUNDS", "10"))
+BCRYPT_MAX_ROUNDS = int(get_config("BCRYPT_MAX_ROUNDS", "16"))
+BCRYPT_ROUNDS = int(get_config("BCRYPT_ROUNDS", "0") or 0)
+# Token buckets checked before any hashing (attempts per minute)
+LOGIN_ATTEMPTS_PER_EMAIL = int(get_config("LOGIN_ATTEMPTS_PER_EMAIL", "5"))
+LOGIN_ATTEMPTS_PER_IP = int(get_config("LOGIN_ATTEMPTS_PER_IP", "20"))
+# Login sessions. Tokens are signed with SESSION_SECRET; when it is unset a
+# random secret is generated once and stored in the database, so processes
+# sharing the database also share it.
+SESSION_SECRET = get_config("SESSION_SECRET", "")
+# The session token is carried in the page URL, so anyone given a copied
+# link is logged in until the session expires or the user logs out; keep
+# the TTL short where links may be shared.
+SESSION_TTL_HOURS = float(get_config("SESSION_TTL_HOURS", "168"))
+
+# Encryption settings
+# Friend contact fields are encrypted only when both keys below are set;
+# without them they are stored in plaintext.
+# Comma-separated Fernet keys, newest first: the first encrypts, all decrypt.
+# Prepend a new key and run `python -m utils.encryption reencrypt ...` to rotate.
+ENCRYPTION_KEY = get_config("ENCRYPTION_KEY", "")
+# HMAC key for the blind indexes that make encrypted fields searchable.
+# Keep it separate from ENCRYPTION_KEY; changing it requires `blind-index --rebuild`.
+BLIND_INDEX_KEY = get_config("BLIND_INDEX_KEY", "")
+
+# Developer settings
+# OSCAR_PROFILE=1 times every render_* function and its DB calls per rerun
+PROFILING_ENABLED = str(get_config("OSCAR_PROFILE", "")).lower() in ("1", "true", "yes", "on")
+# Directory that receives one JSON line per profiled rerun (optional)
+PROFILE_DIR = get_config("OSCAR_PROFILE_DIR", "")
+# Port of the local Prometheus endpoint; disabled when unset
+METRICS_PORT = int(get_config("METRICS_PORT", "0") or 0)
+
+# Config status (for debugging)
+logger.debug(f"EMAIL_USER: {EMAIL_USER or 'Not configured'}, SMTP: {SMTP_SERVER}:{SMTP_PORT}, APP_URL: {APP_URL}")
 
 # Categories for expenses
 CATEGORIES = [
@@ -54,6 +134,16 @@ CATEGORIES = [
     "Other"
 ]
 
+# Reminder types
+REMINDER_TYPES = [
+    "Bill Payment",
+    "Subscription",
+    "EMI",
+    "Insurance",
+    "Tax",
+    "Other"
+]
+
 # Currency symbols
 CURRENCIES = {
     "USD": "$",
@@ -1,7 +1,10 @@
 """Database manager for Oscar Finance Tracker with PostgreSQL/SQLite support."""
 import os
+import re
+import time
 import logging
-from datetime import datetime
+import calendar
+from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 import json
 from contextlib import contextmanager
@@ -9,22 +12,114 @@ from contextlib import contextmanager
 # Try to import psycopg2 for PostgreSQL
 try:
     import psycopg2
-    from psycopg2.extras import RealDictCursor
+    from psycopg2.extras import RealDictCursor, execute_values
     HAS_POSTGRES = True
 except ImportError:
     HAS_POSTGRES = False
 
 import sqlite3
+import config
 
 logger = logging.getLogger(__name__)
 
+# Callables invoked as listener(statement, seconds) after every statement
+_query_listeners = []
+
+
+def add_query_listener(listener):
+    """Register a listener notified of every executed statement."""
+    if listener not in _query_listeners:
+        _query_listeners.append(listener)
+
+
+def remove_query_listener(listener):
+    """Unregister a statement listener."""
+    if listener in _query_listeners:
+        _query_listeners.remove(listener)
+
+
+# Callables invoked as listener(backend, seconds) after acquiring a connection
+_connection_listeners = []
+
+
+def add_connection_listener(listener):
+    """Register a listener notified of every connection acquisition."""
+    if listener not in _connection_listeners:
+        _connection_listeners.append(listener)
+
+
+def remove_connection_listener(listener):
+    """Unregister a connection listener."""
+    if listener in _connection_listeners:
+        _connection_listeners.remove(listener)
+
+
+def _notify_connection(backend: str, seconds: float):
+    """Report connection acquisition time to all listeners."""
+    for listener in list(_connection_listeners):
+        try:
+            listener(backend, seconds)
+        except Exception as e:
+            logger.error(f"Connection listener error: {e}")
+
+
+def _notify_query(statement: str, seconds: float):
+    """Report an executed statement to all listeners."""
+    for listener in list(_query_listeners):
+        try:
+            listener(statement, seconds)
+        except Exception as e:
+            logger.error(f"Query listener error: {e}")
+
+
+class _InstrumentedCursor:
+    """Cursor wrapper that times statements for the query listeners."""
+    
+    def __init__(self, cursor):
+        self._cursor = cursor
+    
+    def execute(self, query, params=None):
+        start = time.perf_counter()
+        try:
+            if params is None:
+                return self._cursor.execute(query)
+            return self._cursor.execute(query, params)
+        finally:
+            _notify_query(query, time.perf_counter() - start)
+    
+    def executemany(self, query, seq_of_params):
+        start = time.perf_counter()
+        try:
+            return self._cursor.executemany(query, seq_of_params)
+        finally:
+            _notify_query(query, time.perf_counter() - start)
+    
+    def __iter__(self):
+        return iter(self._cursor)
+    
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _InstrumentedConnection:
+    """Connection wrapper whose cursors report to the query listeners."""
+    
+    def __init__(self, conn):
+        self._conn = conn
+    
+    def cursor(self, *args, **kwargs):
+        return _InstrumentedCursor(self._conn.cursor(*args, **kwargs))
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
 
 def get_database_url():
     """Get database URL from Streamlit secrets or environment."""
     try:
-        import streamlit as st
-        if hasattr(st, 'secrets') and 'database' in st.secrets:
-            return st.secrets['database'].get('url', None)
+        secrets = config.streamlit_secrets()
+        if secrets is not None and 'database' in secrets:
+            return secrets['database'].get('url', None)
     except:
         pass
     return os.environ.get('DATABASE_URL', None)
@@ -33,14 +128,15 @@ def get_database_url():
 class DatabaseManager:
     """Manages all database operations with PostgreSQL/SQLite support."""
     
-    def __init__(self, db_name: str = None):
+    def __init__(self, db_name: str = None, database_url: str = None):
         """Initialize database manager."""
-        self.database_url = get_database_url()
+        self.database_url = database_url or get_database_url()
         self.use_postgres = HAS_POSTGRES and self.database_url is not None
         
         if not self.use_postgres:
             # Fall back to SQLite for local development
-            self.db_name = db_name or "oscar.db"
+            # Read at call time so harnesses can point it elsewhere via the environment
+            self.db_name = db_name or os.environ.get('DATABASE_NAME') or config.DATABASE_NAME
             logger.info("Using SQLite database")
         else:
             logger.info("Using PostgreSQL database")
@@ -50,10 +146,12 @@ class DatabaseManager:
     @contextmanager
     def get_connection(self):
         """Get database connection - works with both PostgreSQL and SQLite."""
+        start = time.perf_counter()
         if self.use_postgres:
             conn = psycopg2.connect(self.database_url)
+            _notify_connection('postgres', time.perf_counter() - start)
             try:
-                yield conn
+                yield _InstrumentedConnection(conn) if _query_listeners else conn
                 conn.commit()
             except Exception as e:
                 conn.rollback()
@@ -62,9 +160,10 @@ class DatabaseManager:
                 conn.close()
         else:
             conn = sqlite3.connect(self.db_name)
+            _notify_connection('sqlite', time.perf_counter() - start)
             conn.row_factory = sqlite3.Row
             try:
-                yield conn
+                yield _InstrumentedConnection(conn) if _query_listeners else conn
                 conn.commit()
             finally:
                 conn.close()
@@ -155,6 +254,7 @@ class DatabaseManager:
                     payment_method VARCHAR(100) NOT NULL,
                     date DATE NOT NULL,
                     notes TEXT,
+                    version INTEGER NOT NULL DEFAULT 1,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
@@ -173,6 +273,8 @@ class DatabaseManager:
                     recurring BOOLEAN DEFAULT FALSE,
                     recurrence_type VARCHAR(50),
                     status VARCHAR(50) DEFAULT 'pending',
+                    notify_on DATE,
+                    notified_at TIMESTAMP,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
@@ -196,9 +298,11 @@ class DatabaseManager:
                     id SERIAL PRIMARY KEY,
                     user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
                     name VARCHAR(255) NOT NULL,
-                    phone VARCHAR(50),
-                    email VARCHAR(255),
+                    phone TEXT,
+                    email TEXT,
                     notes TEXT,
+                    phone_bidx VARCHAR(32),
+                    email_bidx VARCHAR(32),
                     balance DECIMAL(12,2) DEFAULT 0,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
@@ -218,13 +322,105 @@ class DatabaseManager:
                 )
             ''')
             
+            # Sessions table (only hashes of the opaque tokens are stored)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id SERIAL PRIMARY KEY,
+                    user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+                    token_hash VARCHAR(64) UNIQUE NOT NULL,
+                    expires_at TIMESTAMP NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Per-occurrence status of recurring reminders (only exceptions are stored)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS reminder_overrides (
+                    id SERIAL PRIMARY KEY,
+                    reminder_id INTEGER REFERENCES reminders(id) ON DELETE CASCADE,
+                    occurrence_date DATE NOT NULL,
+                    status VARCHAR(50) NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE (reminder_id, occurrence_date)
+                )
+            ''')
+            
+            # Secrets generated once and shared by every process (e.g. session signing)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS app_secrets (
+                    name VARCHAR(255) PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Checkpoints of resumable maintenance jobs (e.g. key rotation)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS maintenance_jobs (
+                    name VARCHAR(255) PRIMARY KEY,
+                    last_id INTEGER DEFAULT 0,
+                    status VARCHAR(20) NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Email outbox (drained by the background delivery worker)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS email_outbox (
+                    id SERIAL PRIMARY KEY,
+                    to_email VARCHAR(255) NOT NULL,
+                    subject TEXT NOT NULL,
+                    text_body TEXT NOT NULL,
+                    html_body TEXT,
+                    status VARCHAR(20) DEFAULT 'pending',
+                    attempts INTEGER DEFAULT 0,
+                    next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_error TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    sent_at TIMESTAMP
+                )
+            ''')
+            
             # Create indexes
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_expenses_user_id ON expenses(user_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses(date)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_expenses_user_date ON expenses(user_id, date)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_reminders_user_id ON reminders(user_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_reminders_user_status_due ON reminders(user_id, status, due_date)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_friends_user_id ON friends(user_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_transactions_user_id ON transactions(user_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_budget_user_id ON budget_settings(user_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions(user_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_outbox_due ON email_outbox(status, next_attempt_at)')
+            
+            # Reminder notification columns for databases created before they existed
+            cursor.execute('ALTER TABLE reminders ADD COLUMN IF NOT EXISTS notify_on DATE')
+            cursor.execute('ALTER TABLE reminders ADD COLUMN IF NOT EXISTS notified_at TIMESTAMP')
+            cursor.execute('''
+                UPDATE reminders SET notify_on = due_date - COALESCE(notify_days_before, 0)
+                WHERE notify_on IS NULL
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_reminders_notify ON reminders(status, notify_on)
+                WHERE notified_at IS NULL
+            ''')
+            
+            # Encrypted friend fields need wider columns and blind index columns
+            cursor.execute('''
+                SELECT column_name FROM information_schema.columns
+                WHERE table_name = 'friends' AND column_name IN ('phone', 'email') AND data_type <> 'text'
+            ''')
+            for (column,) in cursor.fetchall():
+                cursor.execute(f'ALTER TABLE friends ALTER COLUMN {column} TYPE TEXT')
+            cursor.execute('ALTER TABLE friends ADD COLUMN IF NOT EXISTS phone_bidx VARCHAR(32)')
+            cursor.execute('ALTER TABLE friends ADD COLUMN IF NOT EXISTS email_bidx VARCHAR(32)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_friends_phone_bidx ON friends(user_id, phone_bidx)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_friends_email_bidx ON friends(user_id, email_bidx)')
+            
+            # Row version for optimistic concurrency on expense edits
+            cursor.execute('ALTER TABLE expenses ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1')
+            # Per-user data version, bumped on expense writes to invalidate cached charts
+            cursor.execute('ALTER TABLE users ADD COLUMN IF NOT EXISTS data_version INTEGER NOT NULL DEFAULT 1')
     
     def _init_sqlite_schema(self):
         """Initialize SQLite schema."""
@@ -262,6 +458,7 @@ class DatabaseManager:
                 payment_method TEXT NOT NULL,
                 date TEXT NOT NULL,
                 notes TEXT,
+                version INTEGER NOT NULL DEFAULT 1,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
             )
@@ -281,6 +478,8 @@ class DatabaseManager:
                 recurring BOOLEAN DEFAULT 0,
                 recurrence_type TEXT,
                 status TEXT DEFAULT 'pending',
+                notify_on TEXT,
+                notified_at TIMESTAMP,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
             )
@@ -309,6 +508,8 @@ class DatabaseManager:
                 phone TEXT,
                 email TEXT,
                 notes TEXT,
+                phone_bidx TEXT,
+                email_bidx TEXT,
                 balance REAL DEFAULT 0,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
@@ -331,13 +532,111 @@ class DatabaseManager:
             )
         ''')
         
+        # Sessions table (only hashes of the opaque tokens are stored)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sessions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                token_hash TEXT UNIQUE NOT NULL,
+                expires_at TIMESTAMP NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            )
+        ''')
+        
+        # Per-occurrence status of recurring reminders (only exceptions are stored)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS reminder_overrides (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                reminder_id INTEGER NOT NULL,
+                occurrence_date TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (reminder_id, occurrence_date),
+                FOREIGN KEY (reminder_id) REFERENCES reminders(id) ON DELETE CASCADE
+            )
+        ''')
+        
+        # Secrets generated once and shared by every process (e.g. session signing)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS app_secrets (
+                name TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Checkpoints of resumable maintenance jobs (e.g. key rotation)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS maintenance_jobs (
+                name TEXT PRIMARY KEY,
+                last_id INTEGER DEFAULT 0,
+                status TEXT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Email outbox (drained by the background delivery worker)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS email_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                to_email TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                text_body TEXT NOT NULL,
+                html_body TEXT,
+                status TEXT DEFAULT 'pending',
+                attempts INTEGER DEFAULT 0,
+                next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                sent_at TIMESTAMP
+            )
+        ''')
+        
         # Create indexes
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_expenses_user_id ON expenses(user_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses(date)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_expenses_user_date ON expenses(user_id, date)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_reminders_user_id ON reminders(user_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_reminders_user_status_due ON reminders(user_id, status, due_date)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_friends_user_id ON friends(user_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_transactions_user_id ON transactions(user_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_budget_user_id ON budget_settings(user_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions(user_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_outbox_due ON email_outbox(status, next_attempt_at)')
+        
+        # Reminder notification columns for databases created before they existed
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(reminders)')}
+        if 'notify_on' not in columns:
+            cursor.execute('ALTER TABLE reminders ADD COLUMN notify_on TEXT')
+        if 'notified_at' not in columns:
+            cursor.execute('ALTER TABLE reminders ADD COLUMN notified_at TIMESTAMP')
+        cursor.execute('''
+            UPDATE reminders SET notify_on = date(due_date, '-' || COALESCE(notify_days_before, 0) || ' days')
+            WHERE notify_on IS NULL
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_reminders_notify ON reminders(status, notify_on)
+            WHERE notified_at IS NULL
+        ''')
+        
+        # Blind index columns for encrypted friend fields
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(friends)')}
+        for column in ('phone_bidx', 'email_bidx'):
+            if column not in columns:
+                cursor.execute(f'ALTER TABLE friends ADD COLUMN {column} TEXT')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_friends_phone_bidx ON friends(user_id, phone_bidx)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_friends_email_bidx ON friends(user_id, email_bidx)')
+        
+        # Row version for optimistic concurrency on expense edits
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(expenses)')}
+        if 'version' not in columns:
+            cursor.execute('ALTER TABLE expenses ADD COLUMN version INTEGER NOT NULL DEFAULT 1')
+        
+        # Per-user data version, bumped on expense writes to invalidate cached charts
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(users)')}
+        if 'data_version' not in columns:
+            cursor.execute('ALTER TABLE users ADD COLUMN data_version INTEGER NOT NULL DEFAULT 1')
         
         conn.commit()
         conn.close()
@@ -426,6 +725,15 @@ class DatabaseManager:
             logger.error(f"Error verifying user: {e}")
             return False
     
+    def update_password_hash(self, user_id: int, password_hash: str) -> bool:
+        """Replace a user's password hash."""
+        try:
+            query = 'UPDATE users SET password_hash = ? WHERE id = ?'
+            return self.execute_query(query, (password_hash, user_id))
+        except Exception as e:
+            logger.error(f"Error updating password hash: {e}")
+            return False
+    
     def update_user_profile(self, user_id: int, updates: Dict) -> bool:
         """Update user profile."""
         try:
@@ -447,6 +755,229 @@ class DatabaseManager:
             logger.error(f"Error updating user profile: {e}")
             return False
     
+    def get_data_version(self, user_id: int) -> int:
+        """Version of the user's expense data; it changes on every expense write."""
+        try:
+            row = self.execute_query('SELECT data_version FROM users WHERE id = ?', (user_id,), fetchone=True)
+            return int(row['data_version']) if row else 0
+        except Exception as e:
+            logger.error(f"Error getting data version: {e}")
+            return 0
+    
+    def _bump_data_version(self, cursor, user_id: int):
+        """Bump the user's data version inside the caller's transaction."""
+        marker = '%s' if self.use_postgres else '?'
+        cursor.execute(f'UPDATE users SET data_version = data_version + 1 WHERE id = {marker}', (user_id,))
+    
+    # ============ SESSION OPERATIONS ============
+    
+    def create_session(self, user_id: int, token_hash: str, expires_at: str) -> bool:
+        """Store a login session."""
+        try:
+            query = 'INSERT INTO sessions (user_id, token_hash, expires_at) VALUES (?, ?, ?)'
+            return bool(self.execute_query(query, (user_id, token_hash, expires_at)))
+        except Exception as e:
+            logger.error(f"Error creating session: {e}")
+            return False
+    
+    def get_session_user(self, token_hash: str, now: str) -> Optional[Dict]:
+        """Get the user of an unexpired session in one indexed lookup."""
+        try:
+            query = '''
+                SELECT u.*, s.id AS session_id, s.expires_at AS session_expires_at
+                FROM sessions s JOIN users u ON u.id = s.user_id
+                WHERE s.token_hash = ? AND s.expires_at > ?
+            '''
+            user = self.execute_query(query, (token_hash, now), fetchone=True)
+            if user and user.get('session_expires_at'):
+                user['session_expires_at'] = str(user['session_expires_at'])
+            return self._convert_user_types(user) if user else None
+        except Exception as e:
+            logger.error(f"Error getting session: {e}")
+            return None
+    
+    def extend_session(self, session_id: int, expires_at: str) -> bool:
+        """Slide a session's expiry forward."""
+        try:
+            query = 'UPDATE sessions SET expires_at = ? WHERE id = ?'
+            return self.execute_query(query, (expires_at, session_id))
+        except Exception as e:
+            logger.error(f"Error extending session: {e}")
+            return False
+    
+    def delete_session(self, token_hash: str) -> bool:
+        """Delete a session (logout)."""
+        try:
+            query = 'DELETE FROM sessions WHERE token_hash = ?'
+            return self.execute_query(query, (token_hash,))
+        except Exception as e:
+            logger.error(f"Error deleting session: {e}")
+            return False
+    
+    def delete_expired_sessions(self, now: str) -> bool:
+        """Remove sessions that have expired."""
+        try:
+            query = 'DELETE FROM sessions WHERE expires_at <= ?'
+            return self.execute_query(query, (now,))
+        except Exception as e:
+            logger.error(f"Error deleting expired sessions: {e}")
+            return False
+    
+    # ============ EMAIL OUTBOX OPERATIONS ============
+    
+    def enqueue_email(self, to_email: str, subject: str, text_body: str, html_body: str,
+                      next_attempt_at: str) -> Optional[int]:
+        """Queue an email for the delivery worker."""
+        try:
+            query = '''
+                INSERT INTO email_outbox (to_email, subject, text_body, html_body, next_attempt_at)
+                VALUES (?, ?, ?, ?, ?)
+            '''
+            if self.use_postgres:
+                query += ' RETURNING id'
+            return self.execute_query(query, (to_email, subject, text_body, html_body, next_attempt_at))
+        except Exception as e:
+            logger.error(f"Error queueing email: {e}")
+            return None
+    
+    def claim_outbox_batch(self, now: str, lease_until: str, limit: int) -> List[Dict]:
+        """
+        Claim due outbox messages for delivery.
+        
+        Claimed rows move to 'sending' with next_attempt_at pushed to
+        lease_until, so a worker that dies mid-batch releases them when the
+        lease runs out. SKIP LOCKED lets several workers drain in parallel.
+        """
+        try:
+            lock = ' FOR UPDATE SKIP LOCKED' if self.use_postgres else ''
+            query = f'''
+                UPDATE email_outbox SET status = 'sending', next_attempt_at = ?
+                WHERE id IN (
+                    SELECT id FROM email_outbox
+                    WHERE status IN ('pending', 'sending') AND next_attempt_at <= ?
+                    ORDER BY next_attempt_at, id LIMIT ?{lock}
+                )
+                RETURNING *
+            '''
+            return self.execute_query(query, (lease_until, now, limit), fetch=True) or []
+        except Exception as e:
+            logger.error(f"Error claiming outbox batch: {e}")
+            return []
+    
+    def mark_email_sent(self, email_id: int, sent_at: str) -> bool:
+        """Record a delivered outbox message."""
+        try:
+            query = '''
+                UPDATE email_outbox SET status = 'sent', attempts = attempts + 1, sent_at = ?, last_error = NULL
+                WHERE id = ?
+            '''
+            return self.execute_query(query, (sent_at, email_id))
+        except Exception as e:
+            logger.error(f"Error marking email sent: {e}")
+            return False
+    
+    def mark_email_failed(self, email_id: int, error: str, next_attempt_at: str = None) -> bool:
+        """Record a failed attempt; without next_attempt_at the message is given up."""
+        try:
+            query = '''
+                UPDATE email_outbox
+                SET status = ?, attempts = attempts + 1, last_error = ?, next_attempt_at = COALESCE(?, next_attempt_at)
+                WHERE id = ?
+            '''
+            status = 'pending' if next_attempt_at else 'failed'
+            return self.execute_query(query, (status, error[:500], next_attempt_at, email_id))
+        except Exception as e:
+            logger.error(f"Error marking email failed: {e}")
+            return False
+    
+    def get_outbox_counts(self) -> Dict[str, int]:
+        """Number of outbox messages per status."""
+        try:
+            query = 'SELECT status, COUNT(*) AS count FROM email_outbox GROUP BY status'
+            rows = self.execute_query(query, fetch=True) or []
+            return {row['status']: int(row['count']) for row in rows}
+        except Exception as e:
+            logger.error(f"Error counting outbox: {e}")
+            return {}
+    
+    # ============ MAINTENANCE OPERATIONS ============
+    
+    @staticmethod
+    def _check_identifiers(*names: str):
+        """Table and column names are interpolated into SQL, so only allow plain identifiers."""
+        for name in names:
+            if not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*', name):
+                raise ValueError(f"Invalid identifier: {name!r}")
+    
+    def get_column_chunk(self, table: str, columns: List[str], after_id: int, limit: int) -> List[Dict]:
+        """Next `limit` rows (id plus columns) of a table in primary key order."""
+        self._check_identifiers(table, *columns)
+        try:
+            query = f'SELECT id, {", ".join(columns)} FROM {table} WHERE id > ? ORDER BY id LIMIT ?'
+            return self.execute_query(query, (after_id, limit), fetch=True) or []
+        except Exception as e:
+            logger.error(f"Error reading {table} chunk: {e}")
+            return []
+    
+    def update_column_chunk(self, table: str, columns: List[str], updates: List[tuple]) -> bool:
+        """
+        Rewrite column values in one short transaction.
+        
+        Each update is (*new_values, id, *old_values); a row is only changed if
+        it still holds the old values, so concurrent edits are never clobbered.
+        """
+        self._check_identifiers(table, *columns)
+        if not updates:
+            return True
+        marker = '%s' if self.use_postgres else '?'
+        same = 'IS NOT DISTINCT FROM' if self.use_postgres else 'IS'
+        query = (f"UPDATE {table} SET {', '.join(f'{c} = {marker}' for c in columns)} "
+                 f"WHERE id = {marker} AND {' AND '.join(f'{c} {same} {marker}' for c in columns)}")
+        try:
+            with self.get_connection() as conn:
+                conn.cursor().executemany(query, updates)
+            return True
+        except Exception as e:
+            logger.error(f"Error updating {table} chunk: {e}")
+            return False
+    
+    def get_or_create_app_secret(self, name: str, value: str) -> Optional[str]:
+        """
+        Stored secret of the given name, storing `value` first if there is none.
+        
+        The first process to insert wins; everyone else reads its value back.
+        """
+        try:
+            self.execute_query('INSERT INTO app_secrets (name, value) VALUES (?, ?) ON CONFLICT (name) DO NOTHING',
+                               (name, value))
+            row = self.execute_query('SELECT value FROM app_secrets WHERE name = ?', (name,), fetchone=True)
+            return row['value'] if row else None
+        except Exception as e:
+            logger.error(f"Error loading app secret {name}: {e}")
+            return None
+    
+    def get_job_checkpoint(self, name: str) -> Optional[Dict]:
+        """Progress of a resumable maintenance job."""
+        try:
+            return self.execute_query('SELECT * FROM maintenance_jobs WHERE name = ?', (name,), fetchone=True)
+        except Exception as e:
+            logger.error(f"Error getting job checkpoint: {e}")
+            return None
+    
+    def save_job_checkpoint(self, name: str, last_id: int, status: str) -> bool:
+        """Record how far a maintenance job got."""
+        try:
+            query = '''
+                INSERT INTO maintenance_jobs (name, last_id, status, updated_at)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (name) DO UPDATE
+                SET last_id = excluded.last_id, status = excluded.status, updated_at = excluded.updated_at
+            '''
+            return self.execute_query(query, (name, last_id, status)) is not False
+        except Exception as e:
+            logger.error(f"Error saving job checkpoint: {e}")
+            return False
+    
     # ============ EXPENSE OPERATIONS ============
     
     def add_expense(self, user_id: int, title: str, amount: float, category: str,
@@ -463,6 +994,7 @@ class DatabaseManager:
                     cursor.execute(query, (user_id, title, amount, category, payment_method, date, notes))
                     result = cursor.fetchone()
                     expense_id = result['id'] if result else None
+                    self._bump_data_version(cursor, user_id)
             else:
                 query = '''
                     INSERT INTO expenses (user_id, title, amount, category, payment_method, date, notes)
@@ -472,6 +1004,7 @@ class DatabaseManager:
                     cursor = conn.cursor()
                     cursor.execute(query, (user_id, title, amount, category, payment_method, date, notes))
                     expense_id = cursor.lastrowid
+                    self._bump_data_version(cursor, user_id)
             
             logger.info(f"Expense added for user {user_id}")
             return expense_id
@@ -533,11 +1066,161 @@ class DatabaseManager:
             logger.error(f"Error getting expenses: {e}")
             return []
     
+    # Columns the expense grid may sort by, mapped to their ORDER BY clause
+    EXPENSE_SORTS = {
+        'date': 'date {dir}, created_at {dir}, id {dir}',
+        'amount': 'amount {dir}, id {dir}',
+        'title': 'title {dir}, id {dir}',
+        'category': 'category {dir}, date DESC, id DESC',
+    }
+    
+    def _expense_filters(self, user_id: int, category: str = None, month: str = None) -> tuple:
+        """WHERE clause and params shared by the paginated expense queries."""
+        where = 'user_id = ?'
+        params = [user_id]
+        if category and category != "All Categories":
+            where += ' AND category = ?'
+            params.append(category)
+        if month:
+            # A date range instead of formatting every row keeps (user_id, date) usable
+            year, mon = (int(part) for part in month.split('-'))
+            end = f"{year + 1}-01-01" if mon == 12 else f"{year}-{mon + 1:02d}-01"
+            where += ' AND date >= ? AND date < ?'
+            params += [f"{year}-{mon:02d}-01", end]
+        return where, params
+    
+    def count_user_expenses(self, user_id: int, category: str = None, month: str = None) -> Dict:
+        """Number and total amount of the expenses matching the filters."""
+        try:
+            where, params = self._expense_filters(user_id, category, month)
+            query = f'SELECT COUNT(*) as count, COALESCE(SUM(amount), 0) as total FROM expenses WHERE {where}'
+            row = self.execute_query(query, tuple(params), fetchone=True)
+            if row:
+                return {'count': int(row['count']), 'total': float(row['total'] or 0)}
+            return {'count': 0, 'total': 0.0}
+        except Exception as e:
+            logger.error(f"Error counting expenses: {e}")
+            return {'count': 0, 'total': 0.0}
+    
+    def get_expenses_page(self, user_id: int, category: str = None, month: str = None,
+                          sort_by: str = 'date', descending: bool = True,
+                          limit: int = 25, offset: int = 0) -> List[Dict]:
+        """
+        One page of filtered expenses, sorted in the database.
+        
+        sort_by must be a key of EXPENSE_SORTS; every order ends on a unique
+        column so pages never overlap or skip rows.
+        """
+        try:
+            if sort_by not in self.EXPENSE_SORTS:
+                raise ValueError(f"Cannot sort expenses by {sort_by!r}")
+            where, params = self._expense_filters(user_id, category, month)
+            order = self.EXPENSE_SORTS[sort_by].format(dir='DESC' if descending else 'ASC')
+            query = f'SELECT * FROM expenses WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?'
+            expenses = self.execute_query(query, tuple(params + [limit, offset]), fetch=True)
+            if expenses and self.use_postgres:
+                for exp in expenses:
+                    if exp.get('date'):
+                        exp['date'] = str(exp['date'])
+                    if exp.get('amount'):
+                        exp['amount'] = float(exp['amount'])
+            return expenses or []
+        except Exception as e:
+            logger.error(f"Error getting expenses page: {e}")
+            return []
+    
+    def delete_expenses_bulk(self, user_id: int, expense_ids: List[int]) -> int:
+        """Delete several expenses in one transaction; returns how many were deleted."""
+        if not expense_ids:
+            return 0
+        marker = '%s' if self.use_postgres else '?'
+        try:
+            deleted = 0
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                # Stay well below SQLite's bound parameter limit
+                for start in range(0, len(expense_ids), 500):
+                    chunk = [int(i) for i in expense_ids[start:start + 500]]
+                    cursor.execute(
+                        f"DELETE FROM expenses WHERE user_id = {marker} "
+                        f"AND id IN ({', '.join([marker] * len(chunk))})",
+                        (user_id, *chunk))
+                    deleted += cursor.rowcount
+                if deleted:
+                    self._bump_data_version(cursor, user_id)
+            return deleted
+        except Exception as e:
+            logger.error(f"Error deleting expenses: {e}")
+            return 0
+    
+    # Columns an expense edit may change, in the order update_expenses_bulk binds them
+    EXPENSE_EDITABLE = ['title', 'amount', 'category', 'payment_method', 'date', 'notes']
+    
+    def update_expenses_bulk(self, user_id: int, changes: List[Dict]) -> Optional[Dict]:
+        """
+        Apply edited expenses in one transaction.
+        
+        Each change holds the id, the version the edit was based on and every
+        column of EXPENSE_EDITABLE. A row is only written if its version is
+        unchanged, and its version is then bumped; rows edited elsewhere in
+        the meantime are reported as conflicts and left alone.
+        
+        Returns:
+            {'updated': [ids], 'conflicts': [ids]}, or None on error
+        """
+        if not changes:
+            return {'updated': [], 'conflicts': []}
+        rows = [(int(c['id']), int(c['version']), *(c[column] for column in self.EXPENSE_EDITABLE))
+                for c in changes]
+        try:
+            with self.get_connection() as conn:
+                if self.use_postgres:
+                    # One UPDATE ... FROM (VALUES ...) statement for all rows
+                    query = f'''
+                        UPDATE expenses AS e
+                        SET {', '.join(f'{c} = v.{c}' for c in self.EXPENSE_EDITABLE)}, version = e.version + 1
+                        FROM (VALUES %s) AS v(id, version, {', '.join(self.EXPENSE_EDITABLE)})
+                        WHERE e.id = v.id AND e.version = v.version AND e.user_id = {int(user_id)}
+                        RETURNING e.id
+                    '''
+                    updated = {row[0] for row in execute_values(
+                        conn.cursor(), query, rows, template='(%s, %s, %s, %s::numeric, %s, %s, %s::date, %s)',
+                        page_size=len(rows), fetch=True)}
+                else:
+                    cursor = conn.cursor()
+                    # Take the write lock first so versions cannot change between the check and the update
+                    cursor.execute('BEGIN IMMEDIATE')
+                    current = {}
+                    ids = [row[0] for row in rows]
+                    for start in range(0, len(ids), 500):
+                        chunk = ids[start:start + 500]
+                        cursor.execute(f"SELECT id, version FROM expenses WHERE user_id = ? "
+                                       f"AND id IN ({', '.join('?' * len(chunk))})", (user_id, *chunk))
+                        current.update((row[0], row[1]) for row in cursor.fetchall())
+                    fresh = [row for row in rows if current.get(row[0]) == row[1]]
+                    cursor.executemany(
+                        f"UPDATE expenses SET {', '.join(f'{c} = ?' for c in self.EXPENSE_EDITABLE)}, "
+                        f"version = version + 1 WHERE id = ? AND user_id = ? AND version = ?",
+                        [(*row[2:], row[0], user_id, row[1]) for row in fresh])
+                    updated = {row[0] for row in fresh}
+                if updated:
+                    self._bump_data_version(conn.cursor(), user_id)
+            logger.info(f"Updated {len(updated)} expenses for user {user_id}")
+            return {'updated': sorted(updated), 'conflicts': sorted({row[0] for row in rows} - updated)}
+        except Exception as e:
+            logger.error(f"Error updating expenses: {e}")
+            return None
+    
     def delete_expense(self, user_id: int, expense_id: int) -> bool:
         """Delete an expense."""
+        marker = '%s' if self.use_postgres else '?'
         try:
-            query = 'DELETE FROM expenses WHERE id = ? AND user_id = ?'
-            return self.execute_query(query, (expense_id, user_id))
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f'DELETE FROM expenses WHERE id = {marker} AND user_id = {marker}', (expense_id, user_id))
+                if cursor.rowcount:
+                    self._bump_data_version(cursor, user_id)
+            return True
         except Exception as e:
             logger.error(f"Error deleting expense: {e}")
             return False
@@ -598,6 +1281,204 @@ class DatabaseManager:
             logger.error(f"Error getting expense stats: {e}")
             return {'total_count': 0, 'total_spent': 0, 'avg_expense': 0, 'categories': []}
     
+    # ============ ANALYTICS OPERATIONS ============
+    
+    def monthly_totals(self, user_id: int, limit: int = None) -> List[Dict]:
+        """
+        Spending per calendar month, oldest first.
+        
+        Args:
+            user_id: User ID
+            limit: Only the latest `limit` months with expenses
+        
+        Returns:
+            [{'month': 'YYYY-MM', 'total', 'count'}]
+        """
+        try:
+            if self.use_postgres:
+                month = "TO_CHAR(date_trunc('month', date), 'YYYY-MM')"
+            else:
+                month = "strftime('%Y-%m', date)"
+            query = f'''
+                SELECT {month} as month, SUM(amount) as total, COUNT(*) as count
+                FROM expenses
+                WHERE user_id = ?
+                GROUP BY 1
+                ORDER BY 1 DESC
+            '''
+            params = [user_id]
+            if limit:
+                query += ' LIMIT ?'
+                params.append(limit)
+            rows = self.execute_query(query, tuple(params), fetch=True) or []
+            return [{'month': row['month'], 'total': float(row['total'] or 0), 'count': int(row['count'])}
+                    for row in reversed(rows)]
+        except Exception as e:
+            logger.error(f"Error getting monthly totals: {e}")
+            return []
+    
+    def weekday_totals(self, user_id: int, month: str = None) -> List[Dict]:
+        """
+        Spending per day of the week, Monday first.
+        
+        Returns:
+            [{'weekday': 0-6 with Monday as 0, 'day': day name, 'total', 'count'}]
+            for the days that have expenses
+        """
+        try:
+            if self.use_postgres:
+                weekday = "EXTRACT(ISODOW FROM date)::int - 1"
+            else:
+                weekday = "(CAST(strftime('%w', date) AS INTEGER) + 6) % 7"
+            where, params = self._expense_filters(user_id, month=month)
+            query = f'''
+                SELECT {weekday} as weekday, SUM(amount) as total, COUNT(*) as count
+                FROM expenses
+                WHERE {where}
+                GROUP BY 1
+                ORDER BY 1
+            '''
+            rows = self.execute_query(query, tuple(params), fetch=True) or []
+            return [{'weekday': int(row['weekday']), 'day': calendar.day_name[int(row['weekday'])],
+                     'total': float(row['total'] or 0), 'count': int(row['count'])} for row in rows]
+        except Exception as e:
+            logger.error(f"Error getting weekday totals: {e}")
+            return []
+    
+    def category_totals(self, user_id: int, month: str = None) -> List[Dict]:
+        """
+        Spending per category, largest first.
+        
+        Returns:
+            [{'category', 'total', 'count'}]
+        """
+        try:
+            where, params = self._expense_filters(user_id, month=month)
+            query = f'''
+                SELECT category, SUM(amount) as total, COUNT(*) as count
+                FROM expenses
+                WHERE {where}
+                GROUP BY category
+                ORDER BY total DESC, category
+            '''
+            rows = self.execute_query(query, tuple(params), fetch=True) or []
+            return [{'category': row['category'], 'total': float(row['total'] or 0), 'count': int(row['count'])}
+                    for row in rows]
+        except Exception as e:
+            logger.error(f"Error getting category totals: {e}")
+            return []
+    
+    def summary(self, user_id: int, month: str = None) -> Dict:
+        """
+        Number, total and average amount of the user's expenses.
+        
+        Returns:
+            {'count', 'total', 'average'}
+        """
+        try:
+            where, params = self._expense_filters(user_id, month=month)
+            query = f'''
+                SELECT COUNT(*) as count, COALESCE(SUM(amount), 0) as total, COALESCE(AVG(amount), 0) as average
+                FROM expenses
+                WHERE {where}
+            '''
+            row = self.execute_query(query, tuple(params), fetchone=True)
+            if row:
+                return {'count': int(row['count']), 'total': float(row['total'] or 0),
+                        'average': float(row['average'] or 0)}
+            return {'count': 0, 'total': 0.0, 'average': 0.0}
+        except Exception as e:
+            logger.error(f"Error getting expense summary: {e}")
+            return {'count': 0, 'total': 0.0, 'average': 0.0}
+    
+    def get_dashboard_summary(self, user_id: int, today: str = None, horizon_days: int = 366) -> Dict:
+        """
+        Everything the dashboard shows, in one statement.
+        
+        The month's count and total, the monthly budget, the four latest
+        expenses of the month and the next pending reminders are selected
+        by CTEs and returned as one UNION ALL result. Recurring series come
+        back whole, with their occurrence overrides up to horizon_days
+        ahead, to be expanded with utils.recurrence.expand_reminders.
+        
+        Args:
+            user_id: User ID
+            today: 'YYYY-MM-DD', defaults to the current date
+            horizon_days: How far ahead recurring overrides are loaded
+        
+        Returns:
+            {'monthly_budget', 'budget_used' (percent), 'total', 'count',
+             'recent_expenses', 'reminders', 'overrides'}
+        """
+        today = today or datetime.now().strftime("%Y-%m-%d")
+        horizon = (datetime.strptime(today, "%Y-%m-%d") + timedelta(days=horizon_days)).strftime("%Y-%m-%d")
+        summary = {'monthly_budget': 0.0, 'budget_used': 0.0, 'total': 0.0, 'count': 0,
+                   'recent_expenses': [], 'reminders': [], 'overrides': {}}
+        try:
+            where, params = self._expense_filters(user_id, month=today[:7])
+            series = "COALESCE(recurring, FALSE) AND recurrence_type IS NOT NULL"
+            # The expense branch comes first so Postgres takes the column types from it
+            query = f'''
+                WITH month_expenses AS (
+                    SELECT id, title, amount, category, date, created_at FROM expenses WHERE {where}
+                ),
+                recent AS (
+                    SELECT id, title, amount, category, date,
+                           ROW_NUMBER() OVER (ORDER BY date DESC, created_at DESC, id DESC) as pos
+                    FROM month_expenses ORDER BY pos LIMIT 4
+                ),
+                upcoming AS (
+                    SELECT id, title, amount, type, due_date,
+                           ROW_NUMBER() OVER (ORDER BY due_date, id) as pos
+                    FROM reminders
+                    WHERE user_id = ? AND status = 'pending' AND NOT ({series})
+                    ORDER BY pos LIMIT 4
+                )
+                SELECT 'expense' as kind, pos, id, title, amount, category as label, date, NULL as recurrence_type
+                FROM recent
+                UNION ALL
+                SELECT 'reminder', pos, id, title, amount, type, due_date, NULL FROM upcoming
+                UNION ALL
+                SELECT 'series', 0, id, title, amount, type, due_date, recurrence_type
+                FROM reminders WHERE user_id = ? AND status = 'pending' AND {series}
+                UNION ALL
+                SELECT 'override', 0, o.reminder_id, o.status, NULL, NULL, o.occurrence_date, NULL
+                FROM reminder_overrides o JOIN reminders r ON r.id = o.reminder_id
+                WHERE r.user_id = ? AND o.occurrence_date BETWEEN ? AND ?
+                UNION ALL
+                SELECT 'total', 0, COUNT(*), NULL, COALESCE(SUM(amount), 0), NULL, NULL, NULL FROM month_expenses
+                UNION ALL
+                SELECT 'budget', 0, NULL, NULL, monthly_budget, NULL, NULL, NULL FROM users WHERE id = ?
+                ORDER BY kind, pos
+            '''
+            rows = self.execute_query(query, (*params, user_id, user_id, user_id, today, horizon, user_id),
+                                      fetch=True)
+            if rows is None:
+                return summary
+            for row in rows:
+                kind = row['kind']
+                amount = float(row['amount']) if row['amount'] is not None else None
+                if kind == 'expense':
+                    summary['recent_expenses'].append({'id': row['id'], 'title': row['title'], 'amount': amount,
+                                                       'category': row['label'], 'date': str(row['date'])})
+                elif kind in ('reminder', 'series'):
+                    summary['reminders'].append({'id': row['id'], 'title': row['title'], 'amount': amount,
+                                                 'type': row['label'], 'due_date': str(row['date']),
+                                                 'recurring': kind == 'series',
+                                                 'recurrence_type': row['recurrence_type'], 'status': 'pending'})
+                elif kind == 'override':
+                    summary['overrides'][(row['id'], str(row['date']))] = row['title']
+                elif kind == 'total':
+                    summary['count'], summary['total'] = int(row['id']), amount or 0.0
+                elif kind == 'budget':
+                    summary['monthly_budget'] = amount or 0.0
+            if summary['monthly_budget'] > 0:
+                summary['budget_used'] = summary['total'] / summary['monthly_budget'] * 100
+            return summary
+        except Exception as e:
+            logger.error(f"Error getting dashboard summary: {e}")
+            return summary
+    
     # ============ BUDGET OPERATIONS ============
     
     def get_budget_settings(self, user_id: int) -> Optional[Dict]:
@@ -653,25 +1534,33 @@ class DatabaseManager:
     def add_reminder(self, reminder_data: dict) -> bool:
         """Add a new reminder."""
         try:
-            recurring_val = reminder_data.get('recurring', False)
+            recurrence_type = reminder_data.get('recurrence_type') or None
+            recurring_val = bool(reminder_data.get('recurring', False) and recurrence_type)
+            if not recurring_val:
+                recurrence_type = None
             if not self.use_postgres:
                 recurring_val = 1 if recurring_val else 0
             
+            # Date the notification becomes due; indexed for the dispatcher
+            notify_days = reminder_data.get('notify_days_before', 3)
+            notify_on = (datetime.strptime(reminder_data['due_date'], "%Y-%m-%d")
+                         - timedelta(days=notify_days or 0)).strftime("%Y-%m-%d")
+            
             if self.use_postgres:
                 query = '''
                     INSERT INTO reminders (
                         user_id, title, type, due_date, amount, 
                         description, notify_days_before, recurring, 
-                        recurrence_type, status
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        recurrence_type, status, notify_on
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                 '''
             else:
                 query = '''
                     INSERT INTO reminders (
                         user_id, title, type, due_date, amount, 
                         description, notify_days_before, recurring, 
-                        recurrence_type, status
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        recurrence_type, status, notify_on
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 '''
             
             params = (
@@ -681,10 +1570,11 @@ class DatabaseManager:
                 reminder_data['due_date'],
                 reminder_data.get('amount'),
                 reminder_data.get('description'),
-                reminder_data.get('notify_days_before', 3),
+                notify_days,
                 recurring_val,
-                reminder_data.get('recurrence_type'),
-                reminder_data.get('status', 'pending')
+                recurrence_type,
+                reminder_data.get('status', 'pending'),
+                notify_on
             )
             
             return self.execute_query(query, params)
@@ -705,45 +1595,54 @@ class DatabaseManager:
                     rem['created_at'] = str(rem['created_at'])
         return reminders
     
-    def get_reminders(self, user_id: int, status: str = 'pending') -> List[Dict]:
-        """Get reminders for a user by status."""
-        try:
-            query = '''
-                SELECT * FROM reminders 
-                WHERE user_id = ? AND status = ?
-                ORDER BY due_date ASC
-            '''
-            reminders = self.execute_query(query, (user_id, status), fetch=True)
-            return self._convert_reminder_types(reminders or [])
-        except Exception as e:
-            logger.error(f"Error getting reminders: {e}")
-            return []
-    
-    def get_all_reminders(self, user_id: int) -> List[Dict]:
-        """Get all reminders for a user."""
-        try:
-            query = '''
-                SELECT * FROM reminders 
-                WHERE user_id = ?
-                ORDER BY due_date DESC
-            '''
-            reminders = self.execute_query(query, (user_id,), fetch=True)
-            return self._convert_reminder_types(reminders or [])
-        except Exception as e:
-            logger.error(f"Error getting all reminders: {e}")
-            return []
-    
-    def get_user_reminders(self, user_id: int, include_completed: bool = False) -> List[Dict]:
-        """Get user reminders."""
+    def query_reminders(self, user_id: int, status: str = None, reminder_type: str = None,
+                        due_from: str = None, due_to: str = None, limit: int = None,
+                        descending: bool = False) -> List[Dict]:
+        """
+        A user's reminders, filtered and ordered by due date in the database.
+        
+        Served by the (user_id, status, due_date) index. With a due date
+        window, recurring series that started before the window are
+        returned as well, since their occurrences may fall inside it;
+        expand them with utils.recurrence.expand_reminders.
+        
+        Args:
+            user_id: User ID
+            status: Only reminders with this status
+            reminder_type: Only reminders of this type
+            due_from: First due date, 'YYYY-MM-DD'
+            due_to: Last due date, 'YYYY-MM-DD'
+            limit: At most this many reminders
+            descending: Latest due date first
+        """
         try:
-            if include_completed:
-                query = 'SELECT * FROM reminders WHERE user_id = ? ORDER BY due_date ASC'
-                params = (user_id,)
-            else:
-                query = 'SELECT * FROM reminders WHERE user_id = ? AND status = ? ORDER BY due_date ASC'
-                params = (user_id, 'pending')
-            
-            reminders = self.execute_query(query, params, fetch=True)
+            where = ['user_id = ?']
+            params = [user_id]
+            if status:
+                where.append('status = ?')
+                params.append(status)
+            if reminder_type:
+                where.append('type = ?')
+                params.append(reminder_type)
+            if due_from or due_to:
+                window = []
+                if due_from:
+                    window.append('due_date >= ?')
+                    params.append(due_from)
+                if due_to:
+                    window.append('due_date <= ?')
+                    params.append(due_to)
+                series = 'COALESCE(recurring, FALSE) AND recurrence_type IS NOT NULL'
+                if due_to:
+                    series += ' AND due_date <= ?'
+                    params.append(due_to)
+                where.append(f"(({' AND '.join(window)}) OR ({series}))")
+            direction = 'DESC' if descending else 'ASC'
+            query = f"SELECT * FROM reminders WHERE {' AND '.join(where)} ORDER BY due_date {direction}, id {direction}"
+            if limit:
+                query += ' LIMIT ?'
+                params.append(limit)
+            reminders = self.execute_query(query, tuple(params), fetch=True)
             return self._convert_reminder_types(reminders or [])
         except Exception as e:
             logger.error(f"Error getting reminders: {e}")
@@ -776,30 +1675,165 @@ class DatabaseManager:
             logger.error(f"Error deleting reminder: {e}")
             return False
     
+    def get_reminder_overrides(self, user_id: int, start: str, end: str) -> Dict[tuple, str]:
+        """Occurrence statuses of a user's recurring reminders within a window."""
+        try:
+            query = '''
+                SELECT o.reminder_id, o.occurrence_date, o.status
+                FROM reminder_overrides o JOIN reminders r ON r.id = o.reminder_id
+                WHERE r.user_id = ? AND o.occurrence_date BETWEEN ? AND ?
+            '''
+            rows = self.execute_query(query, (user_id, start, end), fetch=True) or []
+            return {(row['reminder_id'], str(row['occurrence_date'])): row['status'] for row in rows}
+        except Exception as e:
+            logger.error(f"Error getting reminder overrides: {e}")
+            return {}
+    
+    def get_occurrence_overrides(self, reminder_id: int, start: str) -> Dict[str, str]:
+        """Statuses of one recurring reminder's occurrences on or after start."""
+        try:
+            query = '''
+                SELECT occurrence_date, status FROM reminder_overrides
+                WHERE reminder_id = ? AND occurrence_date >= ?
+            '''
+            rows = self.execute_query(query, (reminder_id, start), fetch=True) or []
+            return {str(row['occurrence_date']): row['status'] for row in rows}
+        except Exception as e:
+            logger.error(f"Error getting occurrence overrides: {e}")
+            return {}
+    
+    def set_occurrence_status(self, reminder_id: int, occurrence_date: str, status: str) -> bool:
+        """Complete or skip one occurrence of a recurring reminder."""
+        try:
+            query = '''
+                INSERT INTO reminder_overrides (reminder_id, occurrence_date, status)
+                VALUES (?, ?, ?)
+                ON CONFLICT (reminder_id, occurrence_date) DO UPDATE SET status = excluded.status
+            '''
+            return self.execute_query(query, (reminder_id, occurrence_date, status)) is not False
+        except Exception as e:
+            logger.error(f"Error setting occurrence status: {e}")
+            return False
+    
+    def get_due_notifications(self, today: str, after_user_id: int = 0, limit: int = 500) -> List[Dict]:
+        """
+        Pending reminders whose notification date has arrived, for the next
+        `limit` users with due reminders after after_user_id.
+        
+        Uses the partial (status, notify_on) index, so already-notified rows
+        are never scanned. Batches are cut on user boundaries, so all of a
+        user's due reminders arrive together and make one digest.
+        """
+        try:
+            query = '''
+                SELECT r.id, r.user_id, r.title, r.type, r.due_date, r.amount,
+                       r.recurring, r.recurrence_type, r.notify_on, r.notify_days_before,
+                       u.email, u.full_name, u.currency_symbol
+                FROM reminders r JOIN users u ON u.id = r.user_id
+                WHERE r.status = 'pending' AND r.notified_at IS NULL
+                  AND r.notify_on <= ? AND (r.recurring OR r.due_date >= ?)
+                  AND r.user_id IN (
+                      SELECT DISTINCT user_id FROM reminders
+                      WHERE status = 'pending' AND notified_at IS NULL
+                        AND notify_on <= ? AND (recurring OR due_date >= ?) AND user_id > ?
+                      ORDER BY user_id
+                      LIMIT ?
+                  )
+                ORDER BY r.user_id, r.due_date
+            '''
+            params = (today, today, today, today, after_user_id, limit)
+            reminders = self._convert_reminder_types(self.execute_query(query, params, fetch=True) or [])
+            for reminder in reminders:
+                reminder['notify_on'] = str(reminder['notify_on'])
+            return reminders
+        except Exception as e:
+            logger.error(f"Error getting due notifications: {e}")
+            return []
+    
+    def queue_reminder_digest(self, to_email: str, subject: str, text_body: str, html_body: str,
+                              reminder_ids: List[int], now: str,
+                              advance: Dict[int, tuple] = None) -> bool:
+        """
+        Queue a digest email and record its reminders as notified in one transaction.
+        
+        One-off reminders get notified_at; recurring series in `advance`
+        ({reminder_id: (current notify_on, next notify_on)}) move on to their
+        next occurrence instead. Returns False without queueing if any row was
+        already handled (e.g. by a dispatcher in another process).
+        """
+        advance = advance or {}
+        placeholders = ', '.join('?' * len(reminder_ids))
+        mark = f'UPDATE reminders SET notified_at = ? WHERE notified_at IS NULL AND id IN ({placeholders})'
+        move = 'UPDATE reminders SET notify_on = ? WHERE id = ? AND notify_on = ? AND notified_at IS NULL'
+        insert = '''
+            INSERT INTO email_outbox (to_email, subject, text_body, html_body, next_attempt_at)
+            VALUES (?, ?, ?, ?, ?)
+        '''
+        if self.use_postgres:
+            mark, move, insert = mark.replace('?', '%s'), move.replace('?', '%s'), insert.replace('?', '%s')
+        
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                if reminder_ids:
+                    cursor.execute(mark, (now, *reminder_ids))
+                    if cursor.rowcount != len(reminder_ids):
+                        raise RuntimeError("reminders already notified")
+                for reminder_id, (current, following) in advance.items():
+                    cursor.execute(move, (following, reminder_id, current))
+                    if cursor.rowcount != 1:
+                        raise RuntimeError("recurring reminder already notified")
+                cursor.execute(insert, (to_email, subject, text_body, html_body, now))
+            return True
+        except Exception as e:
+            logger.error(f"Error queueing reminder digest: {e}")
+            return False
+    
+    def advance_reminder_notification(self, reminder_id: int, current: str, following: str) -> bool:
+        """Move a recurring reminder's notification date without notifying."""
+        try:
+            query = 'UPDATE reminders SET notify_on = ? WHERE id = ? AND notify_on = ?'
+            return self.execute_query(query, (following, reminder_id, current))
+        except Exception as e:
+            logger.error(f"Error advancing reminder notification: {e}")
+            return False
+    
     # ============ FRIEND OPERATIONS ============
     
     def add_friend(self, user_id: int, name: str, phone: str = None,
                    email: str = None, notes: str = None) -> Optional[int]:
-        """Add a new friend."""
+        """
+        Add a new friend.
+        
+        Contact fields are stored encrypted with blind indexes when both
+        ENCRYPTION_KEY and BLIND_INDEX_KEY are set, and in plaintext otherwise.
+        """
+        # cryptography is only loaded by the friend operations that need it
+        from utils.encryption import encrypt_many, blind_index, field_encryption_enabled
         try:
+            if field_encryption_enabled():
+                params = (user_id, name, *encrypt_many([phone, email, notes]),
+                          blind_index('phone', phone), blind_index('email', email))
+            else:
+                params = (user_id, name, phone, email, notes, None, None)
             if self.use_postgres:
                 query = '''
-                    INSERT INTO friends (user_id, name, phone, email, notes)
-                    VALUES (%s, %s, %s, %s, %s) RETURNING id
+                    INSERT INTO friends (user_id, name, phone, email, notes, phone_bidx, email_bidx)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING id
                 '''
                 with self.get_connection() as conn:
                     cursor = conn.cursor(cursor_factory=RealDictCursor)
-                    cursor.execute(query, (user_id, name, phone, email, notes))
+                    cursor.execute(query, params)
                     result = cursor.fetchone()
                     friend_id = result['id'] if result else None
             else:
                 query = '''
-                    INSERT INTO friends (user_id, name, phone, email, notes)
-                    VALUES (?, ?, ?, ?, ?)
+                    INSERT INTO friends (user_id, name, phone, email, notes, phone_bidx, email_bidx)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
                 '''
                 with self.get_connection() as conn:
                     cursor = conn.cursor()
-                    cursor.execute(query, (user_id, name, phone, email, notes))
+                    cursor.execute(query, params)
                     friend_id = cursor.lastrowid
             
             logger.info(f"Friend added for user {user_id}")
@@ -808,20 +1842,63 @@ class DatabaseManager:
             logger.error(f"Error adding friend: {e}")
             return None
     
+    def _convert_friends(self, friends: List[Dict]) -> List[Dict]:
+        """Decrypt contact fields and normalize balances."""
+        from utils.encryption import reveal_many
+        fields = ('phone', 'email', 'notes')
+        values = iter(reveal_many(friend.get(field) for friend in friends for field in fields))
+        for friend in friends:
+            for field in fields:
+                friend[field] = next(values)
+            if friend.get('balance') and self.use_postgres:
+                friend['balance'] = float(friend['balance'])
+        return friends
+    
     def get_user_friends(self, user_id: int) -> List[Dict]:
         """Get user's friends."""
         try:
             query = 'SELECT * FROM friends WHERE user_id = ? ORDER BY name'
             friends = self.execute_query(query, (user_id,), fetch=True)
-            if friends and self.use_postgres:
-                for friend in friends:
-                    if friend.get('balance'):
-                        friend['balance'] = float(friend['balance'])
-            return friends or []
+            return self._convert_friends(friends or [])
         except Exception as e:
             logger.error(f"Error getting friends: {e}")
             return []
     
+    def find_friends_by_contact(self, user_id: int, phone: str = None, email: str = None) -> List[Dict]:
+        """
+        Friends whose phone or email equals the given value.
+        
+        Matches on the blind index columns, so the lookup is an index seek
+        rather than a decrypt-and-compare scan. Without encryption keys the
+        contact fields are plaintext and are compared directly.
+        """
+        from utils.encryption import blind_index, field_encryption_enabled
+        conditions, params = [], [user_id]
+        encrypted = field_encryption_enabled()
+        for field, value in (('phone', phone), ('email', email)):
+            if not value or not value.strip():
+                continue
+            if encrypted:
+                digest = blind_index(field, value)
+                if digest:
+                    conditions.append(f'{field}_bidx = ?')
+                    params.append(digest)
+            elif field == 'email':
+                conditions.append('LOWER(email) = ?')
+                params.append(value.strip().lower())
+            else:
+                conditions.append('phone = ?')
+                params.append(value.strip())
+        if not conditions:
+            return []
+        try:
+            query = f'SELECT * FROM friends WHERE user_id = ? AND ({" OR ".join(conditions)}) ORDER BY name'
+            friends = self.execute_query(query, tuple(params), fetch=True)
+            return self._convert_friends(friends or [])
+        except Exception as e:
+            logger.error(f"Error finding friends: {e}")
+            return []
+    
     def get_friends(self, user_id: int) -> List[Dict]:
         """Alias for get_user_friends."""
         return self.get_user_friends(user_id)
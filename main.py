@@ -1,13 +1,10 @@
+import sys
 import streamlit as st
-from database.db_manager import DatabaseManager
-from components.auth import render_auth
-from components.dashboard import render_dashboard
-from components.expenses import render_expenses
-from components.dates import render_dates
-from components.budget import render_budget
-from components.friends import render_friends
-from components.analytics import render_analytics
-from components.profile import render_profile
+import config
+from app_pages import PAGES, page, all_pages, login_page
+from utils import assets, profiler, metrics, notifications
+from auth import hashing, outbox
+from auth.sessions import get_session_manager
 
 # Page config
 st.set_page_config(
@@ -17,212 +14,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# All CSS styles
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-    @import url('https://cdn.lineicons.com/3.0/lineicons.css');
-    @import url('https://cdn.lineicons.com/3.0/lineicons.css');
-
-    *, html, body, [class*="st-"], .stApp, .stMarkdown, p, span, div, label, button, input, textarea, select, h1, h2, h3, h4, h5, h6 {
-        font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif !important;
-    }
-
-    .stApp {
-        background: linear-gradient(135deg, #1a2332 0%, #2d3e50 100%);
-    }
-
-    [data-testid="collapsedControl"],
-    [data-testid="stSidebarCollapseButton"] {
-        display: none !important;
-    }
-
-    [data-testid="stSidebar"] {
-        background: linear-gradient(180deg, #0f1419 0%, #1a1f2e 100%) !important;
-        border-right: 1px solid rgba(255, 255, 255, 0.05);
-        min-width: 260px !important;
-        width: 260px !important;
-    }
-
-    [data-testid="stSidebar"] > div:first-child {
-        background: transparent !important;
-        padding-top: 1rem !important;
-    }
-
-    .block-container {
-        padding-top: 2rem !important;
-        padding-bottom: 2rem !important;
-        max-width: 1400px !important;
-    }
-
-    h1 {
-        color: #ffffff !important;
-        font-weight: 700 !important;
-        font-size: 2.5rem !important;
-        background: linear-gradient(135deg, #ffffff 0%, #3b82f6 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-    }
-
-    h2 { color: #ffffff !important; font-weight: 600 !important; font-size: 1.8rem !important; }
-    h3 { color: #ffffff !important; font-weight: 600 !important; font-size: 1.5rem !important; }
-    h4, h5, h6 { color: #ffffff !important; font-weight: 600 !important; }
-    p, span, label, .stMarkdown { color: rgba(255, 255, 255, 0.85) !important; }
-
-    [data-testid="stMetric"] {
-        background: rgba(30, 45, 65, 0.5) !important;
-        border: 1px solid rgba(255, 255, 255, 0.05) !important;
-        border-radius: 16px !important;
-        padding: 24px !important;
-    }
-
-    [data-testid="stMetric"] label { color: rgba(255, 255, 255, 0.6) !important; font-size: 0.85rem !important; }
-    [data-testid="stMetric"] [data-testid="stMetricValue"] { color: #ffffff !important; font-size: 2rem !important; }
-
-    .stTextInput > div > div > input,
-    .stNumberInput > div > div > input,
-    .stDateInput > div > div > input,
-    .stTextArea textarea {
-        background: rgba(255, 255, 255, 0.05) !important;
-        border: 1px solid rgba(255, 255, 255, 0.1) !important;
-        border-radius: 12px !important;
-        color: #ffffff !important;
-        padding: 12px 16px !important;
-    }
-
-    .stSelectbox > div > div {
-        background: rgba(255, 255, 255, 0.05) !important;
-        border: 1px solid rgba(255, 255, 255, 0.1) !important;
-        border-radius: 12px !important;
-    }
-
-    .stSelectbox [data-baseweb="select"] span,
-    .stSelectbox [data-baseweb="select"] > div > div {
-        color: #ffffff !important;
-        -webkit-text-fill-color: #ffffff !important;
-    }
-
-    [data-baseweb="popover"] {
-        background: rgba(15, 20, 30, 0.98) !important;
-        border: 1px solid rgba(255, 255, 255, 0.15) !important;
-        border-radius: 12px !important;
-    }
-
-    [role="option"] { color: #ffffff !important; padding: 12px 16px !important; border-radius: 8px !important; }
-    [role="option"]:hover { background: rgba(59, 130, 246, 0.15) !important; }
-
-    .stButton > button[kind="primary"] {
-        background: linear-gradient(135deg, #FF9000 0%, #FF7A00 100%) !important;
-        color: #ffffff !important;
-        border: none !important;
-        border-radius: 12px !important;
-        padding: 12px 28px !important;
-        font-weight: 600 !important;
-    }
-
-    .stButton > button {
-        background: rgba(255, 255, 255, 0.05) !important;
-        color: #ffffff !important;
-        border: 1px solid rgba(255, 255, 255, 0.1) !important;
-        border-radius: 12px !important;
-        padding: 12px 28px !important;
-    }
-
-    .stButton > button:hover { background: rgba(255, 255, 255, 0.1) !important; }
-
-    [data-testid="stSidebar"] .stButton { margin: 0 !important; padding: 0 !important; }
-    [data-testid="stSidebar"] .stButton > button { margin: 2px 0 !important; padding: 10px 16px !important; border-radius: 8px !important; }
-
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px;
-        background: rgba(255, 255, 255, 0.03);
-        border-radius: 16px;
-        padding: 6px;
-        border: 1px solid rgba(255, 255, 255, 0.08);
-    }
-
-    .stTabs [data-baseweb="tab"] {
-        background: transparent !important;
-        border-radius: 12px !important;
-        color: rgba(255, 255, 255, 0.6) !important;
-        padding: 12px 24px !important;
-    }
-
-    .stTabs [aria-selected="true"] {
-        background: rgba(59, 130, 246, 0.15) !important;
-        color: #3b82f6 !important;
-    }
-
-    [data-testid="stForm"] {
-        background: rgba(255, 255, 255, 0.03) !important;
-        border: 1px solid rgba(255, 255, 255, 0.08) !important;
-        border-radius: 16px !important;
-        padding: 24px !important;
-    }
-
-    .stAlert {
-        background: rgba(255, 255, 255, 0.05) !important;
-        border: 1px solid rgba(255, 255, 255, 0.1) !important;
-        border-radius: 12px !important;
-    }
-
-    .stProgress > div > div > div > div { background: linear-gradient(90deg, #3b82f6 0%, #60a5fa 100%) !important; }
-    .stProgress > div > div > div { background: rgba(255, 255, 255, 0.1) !important; }
-
-    #MainMenu, footer, header { visibility: hidden; }
-    hr { border-color: rgba(255, 255, 255, 0.1) !important; margin: 0.5rem 0 !important; }
-
-    /* ========== MOBILE STYLES ========== */
-    @media (max-width: 768px) {
-        [data-testid="stSidebar"] { display: none !important; }
-
-        .block-container {
-            padding-top: 70px !important;
-            padding-bottom: 100px !important;
-            padding-left: 8px !important;
-            padding-right: 8px !important;
-            max-width: 100% !important;
-        }
-
-        h1 { font-size: 1.3rem !important; }
-        h2 { font-size: 1.1rem !important; }
-        h3 { font-size: 0.95rem !important; }
-        h4 { font-size: 0.85rem !important; }
-        p, span, label, .stMarkdown { font-size: 0.8rem !important; }
-
-        [data-testid="stMetric"] { padding: 8px !important; border-radius: 8px !important; }
-        [data-testid="stMetric"] label { font-size: 0.55rem !important; }
-        [data-testid="stMetric"] [data-testid="stMetricValue"] { font-size: 0.9rem !important; }
-
-        .stTextInput > div > div > input,
-        .stNumberInput > div > div > input,
-        .stDateInput > div > div > input,
-        .stTextArea textarea {
-            padding: 6px 8px !important;
-            font-size: 0.8rem !important;
-            border-radius: 6px !important;
-        }
-
-        .stButton > button {
-            padding: 5px 10px !important;
-            font-size: 0.7rem !important;
-            border-radius: 6px !important;
-        }
-
-        .stTabs [data-baseweb="tab-list"] { padding: 2px; gap: 2px; border-radius: 8px; }
-        .stTabs [data-baseweb="tab"] { padding: 5px 8px !important; font-size: 0.65rem !important; border-radius: 6px !important; }
-
-        [data-testid="stForm"] { padding: 10px !important; border-radius: 8px !important; }
-        [role="option"] { padding: 6px 8px !important; font-size: 0.8rem !important; }
-        .stAlert { padding: 6px 8px !important; border-radius: 6px !important; }
-    }
-
-    /* Hide mobile elements on desktop */
-    @media (min-width: 769px) {
-        .mobile-top-bar { display: none !important; }
-    }
-</style>
-""", unsafe_allow_html=True)
+# Global stylesheet, served from static/ and cached by the browser
+assets.inject_styles()
 
 
 def initialize_session_state():
@@ -230,8 +23,30 @@ def initialize_session_state():
         st.session_state.authenticated = False
     if 'user' not in st.session_state:
         st.session_state.user = None
-    if 'current_page' not in st.session_state:
-        st.session_state.current_page = "Dashboard"
+
+    if not st.session_state.authenticated:
+        restore_session()
+    elif st.session_state.get('session_token'):
+        new_expiry = get_session_manager().renew_if_needed(st.session_state.session_token,
+                                                     st.session_state.get('session_expires_at'))
+        if new_expiry:
+            st.session_state.session_expires_at = new_expiry
+
+
+def restore_session():
+    """Log in from the session token in the URL without re-checking the password."""
+    token = st.query_params.get('session')
+    if not token:
+        return
+    user = get_session_manager().validate_session(token)
+    if not user:
+        if 'session' in st.query_params:
+            del st.query_params['session']
+        return
+    st.session_state.session_expires_at = user.pop('session_expires_at')
+    st.session_state.session_token = token
+    st.session_state.authenticated = True
+    st.session_state.user = user
 
 
 def render_mobile_top_bar(user: dict):
@@ -270,80 +85,23 @@ def render_mobile_top_bar(user: dict):
 
 
 def render_mobile_bottom_nav():
-    """Render mobile bottom navigation using Streamlit buttons."""
-    current_page = st.session_state.get('current_page', 'Dashboard')
-
-    nav_items = [
-        ("Dashboard", "🏠", "Home"),
-        ("Expenses", "💰", "Expense"),
-        ("Dates", "📅", "Dates"),
-        ("Budget Tracker", "📊", "Budget"),
-        ("Friends", "👥", "Friends"),
-        ("Analytics", "📈", "Stats"),
-        ("Profile", "👤", "Profile"),
-    ]
-
-    # Create a special container for mobile navigation
-    st.markdown('<div class="mobile-nav-wrapper">', unsafe_allow_html=True)
-
-    # Create a container for navigation buttons
-    cols = st.columns(len(nav_items))
-
-    for idx, (page, icon, label) in enumerate(nav_items):
-        with cols[idx]:
-            # Use a unique key for each button
-            if st.button(
-                f"{icon}\n{label}",
-                key=f"mobile_nav_{page}",
-                use_container_width=True,
-                type="primary" if current_page == page else "secondary"
-            ):
-                st.session_state.current_page = page
-                st.rerun()
-
-    st.markdown('</div>', unsafe_allow_html=True)
-
-    # Add CSS to style the mobile nav buttons
-    st.markdown("""
-    <style>
-        .mobile-nav-wrapper {
-            position: fixed;
-            bottom: 0;
-            left: 0;
-            right: 0;
-            background: linear-gradient(180deg, #1a1f2e 0%, #0f1419 100%);
-            border-top: 1px solid rgba(255, 255, 255, 0.1);
-            padding: 8px 4px 35px 4px;
-            z-index: 99999;
-            border-radius: 16px 16px 0 0;
-            display: none;
-        }
-
-        @media (max-width: 768px) {
-            .mobile-nav-wrapper {
-                display: block !important;
-            }
-
-            .mobile-nav-wrapper [data-testid="column"] {
-                padding: 0 2px !important;
-            }
-
-            .mobile-nav-wrapper button {
-                font-size: 0.65rem !important;
-                padding: 8px 2px !important;
-                white-space: pre-line !important;
-                line-height: 1.2 !important;
-                min-height: 60px !important;
-            }
-        }
-
-        /* Hide Streamlit footer on mobile */
-        @media (max-width: 768px) {
-            footer { display: none !important; }
-            .stDeployButton { display: none !important; }
-        }
-    </style>
-    """, unsafe_allow_html=True)
+    """Render mobile bottom navigation as links to the pages."""
+    with st.container(key="mobile_nav"):
+        cols = st.columns(len(PAGES))
+        for col, (title, (_, icon, label)) in zip(cols, PAGES.items()):
+            with col:
+                st.page_link(page(title), label=label, icon=icon, use_container_width=True)
+
+
+def logout():
+    """Logout callback: end the session; the rerun then shows the login page."""
+    if st.session_state.get('session_token'):
+        get_session_manager().end_session(st.session_state.session_token)
+        st.session_state.session_token = None
+    if 'session' in st.query_params:
+        del st.query_params['session']
+    st.session_state.authenticated = False
+    st.session_state.user = None
 
 
 def render_sidebar(user: dict):
@@ -359,13 +117,6 @@ def render_sidebar(user: dict):
         </div>
     """, unsafe_allow_html=True)
 
-    st.sidebar.markdown("---")
-
-    for item in ["Dashboard", "Expenses", "Dates", "Budget Tracker", "Friends", "Analytics", "Profile"]:
-        if st.sidebar.button(item, key=f"nav_{item}", use_container_width=True):
-            st.session_state.current_page = item
-            st.rerun()
-
     st.sidebar.markdown('<div style="height: 40px;"></div>', unsafe_allow_html=True)
     st.sidebar.markdown("---")
 
@@ -386,39 +137,18 @@ def render_sidebar(user: dict):
             </div>
         ''', unsafe_allow_html=True)
 
-    if st.sidebar.button("Logout", use_container_width=True, key="logout_btn"):
-        st.session_state.authenticated = False
-        st.session_state.user = None
-        st.session_state.current_page = "Dashboard"
-        st.rerun()
-
-    return st.session_state.current_page
-
+    st.sidebar.button("Logout", use_container_width=True, key="logout_btn", on_click=logout)
 
-def render_main_content(user: dict):
-    db = DatabaseManager()
 
+def render_main_content(user: dict, pg: st.Page):
     # Mobile top bar
     render_mobile_top_bar(user)
 
-    # Desktop sidebar
-    page = render_sidebar(user)
-
-    # Page content
-    if page == "Dashboard":
-        render_dashboard(user, db)
-    elif page == "Expenses":
-        render_expenses(user, db)
-    elif page == "Dates":
-        render_dates(user, db)
-    elif page == "Budget Tracker":
-        render_budget(user, db)
-    elif page == "Friends":
-        render_friends(user, db)
-    elif page == "Analytics":
-        render_analytics(user, db)
-    elif page == "Profile":
-        render_profile(user, db)
+    # Desktop sidebar, below the page navigation
+    render_sidebar(user)
+
+    # Page content: only the selected page script runs
+    pg.run()
 
     # Mobile bottom navigation
     render_mobile_bottom_nav()
@@ -426,7 +156,7 @@ def render_main_content(user: dict):
 
 def handle_query_params():
     """Handle page navigation via query parameters - disabled to prevent conflicts."""
-    # This function is disabled because we're using session state for navigation
+    # This function is disabled because st.navigation owns the page URLs
     # Query params should only be used for authentication (verify email, etc.)
     pass
 
@@ -435,10 +165,30 @@ def main():
     initialize_session_state()
     handle_query_params()
 
+    if config.METRICS_PORT:
+        metrics.start_metrics_server(config.METRICS_PORT)
+    hashing.start_calibration()
+    outbox.start_outbox_worker()
+    notifications.start_reminder_scheduler()
+
     if not st.session_state.authenticated:
-        render_auth()
+        pg = st.navigation([login_page()], position="hidden")
     else:
-        render_main_content(st.session_state.user)
+        pg = st.navigation(all_pages())
+        # Keep the session token in the URL across page links
+        if st.session_state.get('session_token') and 'session' not in st.query_params:
+            st.query_params['session'] = st.session_state.session_token
+
+    with metrics.RERUN_DURATION.time(page=pg.title), profiler.profile_rerun(pg.title):
+        if not st.session_state.authenticated:
+            pg.run()
+        else:
+            render_main_content(st.session_state.user, pg)
+
+    profiler.render_overlay()
+
+
+profiler.instrument_module(sys.modules[__name__])
 
 
 if __name__ == "__main__":
@@ -1,16 +1,27 @@
-"""Utility modules for Oscar Finance Tracker."""
-from .encryption import encrypt_data, decrypt_data
-from .validators import validate_email, validate_phone, validate_amount
-from .formatters import format_currency, format_date, format_percentage
-import sqlite3
+"""Utility modules for Oscar Finance Tracker.
 
-__all__ = [
-    'encrypt_data',
-    'decrypt_data',
-    'validate_email',
-    'validate_phone',
-    'validate_amount',
-    'format_currency',
-    'format_date',
-    'format_percentage'
-]
\ No newline at end of file
+The helpers below are re-exported lazily: importing a submodule such as
+utils.recurrence does not load cryptography or email_validator.
+"""
+import importlib
+
+_EXPORTS = {
+    'encrypt_data': 'encryption',
+    'decrypt_data': 'encryption',
+    'encrypt_many': 'encryption',
+    'decrypt_many': 'encryption',
+    'validate_email': 'validators',
+    'validate_phone': 'validators',
+    'validate_amount': 'validators',
+    'format_currency': 'formatters',
+    'format_date': 'formatters',
+    'format_percentage': 'formatters',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
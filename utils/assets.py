@@ -0,0 +1,118 @@
+"""Static asset pipeline.
+
+assets/styles.css is the source of the global stylesheet. It is copied to
+static/css/styles.<hash>.css, served by Streamlit's static file serving
+(server.enableStaticServing), and linked from every page. Streamlit sends
+Last-Modified but no Cache-Control, so browsers cache the file
+heuristically; the hash in the name changes whenever the CSS does, so a
+deploy never serves a stale copy. Each rerun only sends a one-line <link>
+instead of the whole stylesheet. Streamlit serves .css files as text/css
+from 1.60 on; older versions send text/plain, which browsers refuse.
+
+static/css is build output and not tracked by git: build it at deploy
+time, or let the first page view build it.
+
+Fonts are self-hosted: @font-face rules are generated for the files in
+FONTS that exist under static/fonts, and browsers fall back to the
+system font stack otherwise. No stylesheet or font is loaded from a CDN.
+
+    python -m utils.assets    # build at deploy time, prints the URL
+"""
+import os
+import glob
+import hashlib
+import logging
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE = os.path.join(ROOT, 'assets', 'styles.css')
+STATIC_DIR = os.path.join(ROOT, 'static')
+STATIC_URL = 'app/static'
+
+# (family, file under static/fonts, weight range, style)
+FONTS = [
+    ("Inter", "InterVariable.woff2", "100 900", "normal"),
+    ("Inter", "InterVariable-Italic.woff2", "100 900", "italic"),
+]
+
+_stylesheet_url = None
+_lock = threading.Lock()
+
+
+def _font_faces() -> str:
+    rules = []
+    for family, filename, weight, style in FONTS:
+        if os.path.exists(os.path.join(STATIC_DIR, 'fonts', filename)):
+            rules.append(
+                f"@font-face {{ font-family: '{family}'; font-style: {style}; font-weight: {weight}; "
+                f"font-display: swap; src: local('{family}'), url('../fonts/{filename}') format('woff2'); }}"
+            )
+    return '\n'.join(rules)
+
+
+def build_css() -> str:
+    """The full stylesheet: font faces followed by assets/styles.css."""
+    with open(SOURCE, encoding='utf-8') as f:
+        source = f.read()
+    faces = _font_faces()
+    return f"{faces}\n\n{source}" if faces else source
+
+
+def build_stylesheet() -> str:
+    """
+    Write the hashed stylesheet if it does not exist yet and remove stale ones.
+
+    Returns:
+        URL of the stylesheet relative to the app
+    """
+    css = build_css().encode('utf-8')
+    name = f"styles.{hashlib.sha256(css).hexdigest()[:12]}.css"
+    css_dir = os.path.join(STATIC_DIR, 'css')
+    path = os.path.join(css_dir, name)
+    if not os.path.exists(path):
+        os.makedirs(css_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(css)
+        os.replace(tmp, path)
+        logger.info(f"Built stylesheet {name}")
+    for stale in glob.glob(os.path.join(css_dir, 'styles.*.css')):
+        if os.path.basename(stale) != name:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    return f"{STATIC_URL}/css/{name}"
+
+
+def stylesheet_url() -> Optional[str]:
+    """URL of the built stylesheet, building it on first use; None if static/ is not writable."""
+    global _stylesheet_url
+    if _stylesheet_url is None:
+        with _lock:
+            if _stylesheet_url is None:
+                try:
+                    _stylesheet_url = build_stylesheet()
+                except OSError as e:
+                    logger.warning(f"Cannot build static stylesheet, inlining it instead: {e}")
+                    _stylesheet_url = ''
+    return _stylesheet_url or None
+
+
+def inject_styles():
+    """Link the global stylesheet; call once per run, before other elements."""
+    import streamlit as st
+
+    url = stylesheet_url()
+    if url:
+        st.markdown(f'<link rel="stylesheet" href="{url}">', unsafe_allow_html=True)
+    else:
+        st.markdown(f"<style>{build_css()}</style>", unsafe_allow_html=True)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(build_stylesheet())
@@ -1,38 +1,129 @@
-"""Data encryption utilities."""
-from cryptography.fernet import Fernet
+"""Data encryption utilities.
+
+ENCRYPTION_KEY holds one or more comma-separated Fernet keys, newest
+first. They are loaded once into a MultiFernet keyring: the first key
+encrypts, every key can decrypt. To rotate, prepend a new key and run
+
+    python -m utils.encryption reencrypt <table> <column> [<column> ...]
+
+which rewrites the table in small chunks under the new key and can be
+interrupted and resumed. Tokens written before the keyring existed were
+base64-encoded a second time; they still decrypt and are shrunk back to
+plain Fernet tokens when re-encrypted.
+
+Ciphertext cannot be compared, so searchable fields also get a blind
+index: an HMAC of the normalized value under BLIND_INDEX_KEY, stored in
+an indexed column next to the token. Equality lookups hash the search
+term and seek on that column. Rows written before the columns existed
+are filled in with
+
+    python -m utils.encryption blind-index
+
+Encryption is opt-in: without ENCRYPTION_KEY nothing can be encrypted or
+decrypted, and asking for the keyring raises EncryptionNotConfiguredError
+rather than inventing a key that the next process would not have.
+"""
+from cryptography.fernet import Fernet, MultiFernet, InvalidToken
 import config
+import re
+import hmac
 import base64
+import hashlib
+import time
 import logging
-import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Fernet tokens start with version byte 0x80, i.e. "gAAAAA" in base64;
+# the old double encoding turned that into "Z0FBQUFB"
+TOKEN_PREFIX = "gAAAAA"
+LEGACY_PREFIX = "Z0FBQUFB"
+
+# Blind index columns per table: {column: index column}
+BLIND_INDEXES = {'friends': {'phone': 'phone_bidx', 'email': 'email_bidx'}}
+
+_cipher = None
+_cipher_lock = threading.Lock()
+_blind_key = None
+
+
+class EncryptionNotConfiguredError(RuntimeError):
+    """Raised when a key is needed but ENCRYPTION_KEY or BLIND_INDEX_KEY is not set."""
+
+
+def _configured_keys() -> List[str]:
+    return [key.strip() for key in (config.ENCRYPTION_KEY or "").split(',') if key.strip()]
+
+
+def encryption_enabled() -> bool:
+    """True when ENCRYPTION_KEY holds at least one key."""
+    return bool(_configured_keys())
+
+
+def field_encryption_enabled() -> bool:
+    """True when both the keyring and the blind index key are configured."""
+    return encryption_enabled() and bool(config.BLIND_INDEX_KEY)
+
+
+def get_cipher() -> MultiFernet:
+    """Get the process-wide keyring, building it on first use."""
+    global _cipher
+    if _cipher is None:
+        with _cipher_lock:
+            if _cipher is None:
+                keys = _configured_keys()
+                if not keys:
+                    raise EncryptionNotConfiguredError(
+                        "ENCRYPTION_KEY is not set; generate one with `python -m utils.encryption generate-key`")
+                _cipher = MultiFernet([Fernet(key.encode()) for key in keys])
+    return _cipher
+
+
+def reset_cipher():
+    """Drop the cached keyring and blind index key so the next call reloads them."""
+    global _cipher, _blind_key
+    with _cipher_lock:
+        _cipher = None
+        _blind_key = None
+
+
+def _get_blind_key() -> bytes:
+    global _blind_key
+    if _blind_key is None:
+        with _cipher_lock:
+            if _blind_key is None:
+                if not config.BLIND_INDEX_KEY:
+                    raise EncryptionNotConfiguredError(
+                        "BLIND_INDEX_KEY is not set; generate one with `python -m utils.encryption generate-key`")
+                _blind_key = config.BLIND_INDEX_KEY.encode()
+    return _blind_key
+
 
-def get_cipher():
-    """Get Fernet cipher instance."""
-    if not config.ENCRYPTION_KEY:
-        # Generate a key if not provided (for development only)
-        key = Fernet.generate_key()
-        logger.warning("Using generated encryption key. Set ENCRYPTION_KEY in production!")
-        return Fernet(key)
-    
-    return Fernet(config.ENCRYPTION_KEY.encode())
+def _token_bytes(encrypted_data: str) -> bytes:
+    if encrypted_data.startswith(LEGACY_PREFIX):
+        return base64.urlsafe_b64decode(encrypted_data.encode())
+    return encrypted_data.encode()
+
+
+def is_encrypted(value: Optional[str]) -> bool:
+    """True for current and legacy Fernet tokens."""
+    return bool(value) and value.startswith((TOKEN_PREFIX, LEGACY_PREFIX))
 
 
 def encrypt_data(data: str) -> str:
     """
     Encrypt sensitive data.
-    
+
     Args:
         data: Plain text string to encrypt
-        
+
     Returns:
         Encrypted string
     """
     try:
-        cipher = get_cipher()
-        encrypted = cipher.encrypt(data.encode())
-        return base64.urlsafe_b64encode(encrypted).decode()
+        return get_cipher().encrypt(data.encode()).decode()
     except Exception as e:
         logger.error(f"Encryption error: {e}")
         raise
@@ -41,18 +132,251 @@ def encrypt_data(data: str) -> str:
 def decrypt_data(encrypted_data: str) -> str:
     """
     Decrypt encrypted data.
-    
+
     Args:
         encrypted_data: Encrypted string
-        
+
     Returns:
         Decrypted plain text string
     """
     try:
-        cipher = get_cipher()
-        decoded = base64.urlsafe_b64decode(encrypted_data.encode())
-        decrypted = cipher.decrypt(decoded)
-        return decrypted.decode()
+        return get_cipher().decrypt(_token_bytes(encrypted_data)).decode()
     except Exception as e:
         logger.error(f"Decryption error: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+def encrypt_many(values: Iterable[Optional[str]]) -> List[Optional[str]]:
+    """Encrypt a column's worth of values; None and empty strings pass through."""
+    cipher = get_cipher()
+    return [cipher.encrypt(value.encode()).decode() if value else value for value in values]
+
+
+def decrypt_many(values: Iterable[Optional[str]]) -> List[Optional[str]]:
+    """Decrypt a column's worth of values; None and empty strings pass through."""
+    cipher = get_cipher()
+    try:
+        return [cipher.decrypt(_token_bytes(value)).decode() if value else value for value in values]
+    except InvalidToken as e:
+        logger.error(f"Decryption error: {e}")
+        raise
+
+
+def reveal_many(values: Iterable[Optional[str]]) -> List[Optional[str]]:
+    """
+    Decrypt stored values for display.
+
+    Plaintext written before a column was encrypted passes through, and a
+    token no configured key can open becomes None instead of failing the
+    whole read. The keyring is only needed once a token shows up, so
+    plaintext-only data reads fine without ENCRYPTION_KEY.
+    """
+    cipher = get_cipher() if encryption_enabled() else None
+    revealed, failed = [], 0
+    for value in values:
+        if is_encrypted(value):
+            try:
+                value = cipher.decrypt(_token_bytes(value)).decode() if cipher else None
+            except InvalidToken:
+                value = None
+            failed += value is None
+        revealed.append(value)
+    if failed and cipher is None:
+        logger.error(f"{failed} stored value(s) are encrypted but ENCRYPTION_KEY is not set")
+    elif failed:
+        logger.error(f"{failed} stored value(s) cannot be decrypted with any configured key")
+    return revealed
+
+
+def normalize_for_index(field: str, value: str) -> str:
+    """Canonical form compared by a blind index, so "+1 (555) 010" matches "1555010"."""
+    if field == 'phone':
+        return re.sub(r'\D', '', value)
+    return value.strip().lower()
+
+
+def blind_index(field: str, value: Optional[str]) -> Optional[str]:
+    """
+    Keyed hash of a field value for equality search.
+
+    The field name is part of the message, so equal values in different
+    columns do not share an index entry.
+
+    Returns:
+        32 hex characters, or None for empty values
+    """
+    if not value or not normalize_for_index(field, value):
+        return None
+    message = f"{field}:{normalize_for_index(field, value)}".encode()
+    return hmac.new(_get_blind_key(), message, hashlib.sha256).hexdigest()[:32]
+
+
+def rotate_value(value: Optional[str], encrypt_plaintext: bool = False) -> Optional[str]:
+    """
+    Re-encrypt a stored value under the newest key.
+
+    Args:
+        value: Stored value (token, legacy token or plaintext)
+        encrypt_plaintext: Encrypt values that are not tokens yet (initial migration)
+
+    Returns:
+        New token, or the value unchanged if it is empty or plaintext left alone
+    """
+    if not value:
+        return value
+    if is_encrypted(value):
+        return get_cipher().rotate(_token_bytes(value)).decode()
+    return encrypt_data(value) if encrypt_plaintext else value
+
+
+def reencrypt_table(table: str, columns: List[str], db=None, chunk_size: int = 500,
+                    encrypt_plaintext: bool = False, pause: float = 0.0,
+                    stop_event: threading.Event = None) -> Dict:
+    """
+    Re-encrypt columns of a table under the newest key, chunk by chunk.
+
+    Every chunk is its own short transaction and the last processed id is
+    checkpointed, so the job never holds a long lock and resumes where it
+    stopped after an interruption.
+
+    Returns:
+        Counts of scanned, rewritten and undecryptable rows, and the job status
+    """
+    from database.db_manager import DatabaseManager
+
+    db = db or DatabaseManager()
+    name = f"reencrypt:{table}:{','.join(columns)}"
+    checkpoint = db.get_job_checkpoint(name)
+    last_id = checkpoint['last_id'] if checkpoint and checkpoint['status'] == 'running' else 0
+    stats = {'scanned': 0, 'rewritten': 0, 'failed': 0, 'resumed_from': last_id}
+    db.save_job_checkpoint(name, last_id, 'running')
+
+    while not (stop_event and stop_event.is_set()):
+        rows = db.get_column_chunk(table, columns, last_id, chunk_size)
+        if not rows:
+            db.save_job_checkpoint(name, last_id, 'done')
+            stats['status'] = 'done'
+            break
+
+        updates = []
+        for row in rows:
+            old = [row[column] for column in columns]
+            try:
+                new = [rotate_value(value, encrypt_plaintext) for value in old]
+            except InvalidToken:
+                logger.error(f"{table}.id={row['id']} cannot be decrypted with any configured key")
+                stats['failed'] += 1
+                continue
+            if new != old:
+                updates.append((*new, row['id'], *old))
+
+        if not db.update_column_chunk(table, columns, updates):
+            stats['status'] = 'error'
+            break
+        last_id = rows[-1]['id']
+        db.save_job_checkpoint(name, last_id, 'running')
+        stats['scanned'] += len(rows)
+        stats['rewritten'] += len(updates)
+        if pause:
+            time.sleep(pause)
+    else:
+        stats['status'] = 'stopped'
+
+    logger.info(f"Re-encryption of {table} {stats}")
+    return stats
+
+
+def backfill_blind_indexes(table: str = 'friends', db=None, chunk_size: int = 500,
+                           rebuild: bool = False, pause: float = 0.0,
+                           stop_event: threading.Event = None) -> Dict:
+    """
+    Compute blind indexes for rows that do not have them yet.
+
+    Works through the table in id order like reencrypt_table, checkpointing
+    after every chunk. With rebuild=True every index is recomputed, which is
+    needed after BLIND_INDEX_KEY changes.
+
+    Returns:
+        Counts of scanned and updated rows, and the job status
+    """
+    from database.db_manager import DatabaseManager
+
+    db = db or DatabaseManager()
+    fields = BLIND_INDEXES[table]
+    sources, targets = list(fields), list(fields.values())
+    name = f"blind-index:{table}"
+    checkpoint = db.get_job_checkpoint(name)
+    last_id = checkpoint['last_id'] if checkpoint and checkpoint['status'] == 'running' else 0
+    stats = {'scanned': 0, 'updated': 0, 'resumed_from': last_id}
+    db.save_job_checkpoint(name, last_id, 'running')
+
+    while not (stop_event and stop_event.is_set()):
+        rows = db.get_column_chunk(table, sources + targets, last_id, chunk_size)
+        if not rows:
+            db.save_job_checkpoint(name, last_id, 'done')
+            stats['status'] = 'done'
+            break
+
+        updates = []
+        for row in rows:
+            old = [row[column] for column in targets]
+            if not rebuild and all(old[i] or not row[source] for i, source in enumerate(sources)):
+                continue
+            plain = reveal_many(row[source] for source in sources)
+            new = [blind_index(source, value) for source, value in zip(sources, plain)]
+            if new != old:
+                updates.append((*new, row['id'], *old))
+
+        if not db.update_column_chunk(table, targets, updates):
+            stats['status'] = 'error'
+            break
+        last_id = rows[-1]['id']
+        db.save_job_checkpoint(name, last_id, 'running')
+        stats['scanned'] += len(rows)
+        stats['updated'] += len(updates)
+        if pause:
+            time.sleep(pause)
+    else:
+        stats['status'] = 'stopped'
+
+    logger.info(f"Blind index backfill of {table} {stats}")
+    return stats
+
+
+def start_reencryption(table: str, columns: List[str], **kwargs) -> threading.Thread:
+    """Run reencrypt_table on a daemon thread."""
+    thread = threading.Thread(target=reencrypt_table, args=(table, columns), kwargs=kwargs,
+                              name=f'oscar-reencrypt-{table}', daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Encryption key management")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('generate-key', help="Print a new Fernet key")
+    rotate = commands.add_parser('reencrypt', help="Re-encrypt table columns under the newest key")
+    rotate.add_argument('table')
+    rotate.add_argument('columns', nargs='+')
+    rotate.add_argument('--chunk-size', type=int, default=500)
+    rotate.add_argument('--pause', type=float, default=0.0, help="Seconds to sleep between chunks")
+    rotate.add_argument('--encrypt-plaintext', action='store_true', help="Also encrypt values stored in clear")
+    backfill = commands.add_parser('blind-index', help="Fill in missing blind index columns")
+    backfill.add_argument('table', nargs='?', default='friends', choices=sorted(BLIND_INDEXES))
+    backfill.add_argument('--chunk-size', type=int, default=500)
+    backfill.add_argument('--pause', type=float, default=0.0, help="Seconds to sleep between chunks")
+    backfill.add_argument('--rebuild', action='store_true', help="Recompute every index (after changing the key)")
+    args = parser.parse_args()
+
+    if args.command == 'generate-key':
+        print(Fernet.generate_key().decode())
+    elif args.command == 'blind-index':
+        logging.basicConfig(level=logging.INFO)
+        print(backfill_blind_indexes(args.table, chunk_size=args.chunk_size,
+                                     rebuild=args.rebuild, pause=args.pause))
+    else:
+        logging.basicConfig(level=logging.INFO)
+        print(reencrypt_table(args.table, args.columns, chunk_size=args.chunk_size,
+                              encrypt_plaintext=args.encrypt_plaintext, pause=args.pause))
@@ -0,0 +1,285 @@
+"""In-process metrics registry with a Prometheus text endpoint.
+
+Counters and histograms are recorded unconditionally (they are cheap);
+the HTTP exporter and the per-statement DB hooks only run once
+start_metrics_server() has been called, which main.py does when
+METRICS_PORT is set.
+"""
+import re
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition format."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple, extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonically increasing counter with optional labels."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict) -> Tuple:
+        return tuple(labels.get(name, '') for name in self.labelnames)
+
+    def inc(self, amount: float = 1.0, **labels):
+        """Increment the counter for the given labels."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        """Current value for the given labels."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def collect(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict) -> Tuple:
+        return tuple(labels.get(name, '') for name in self.labelnames)
+
+    def observe(self, value: float, **labels):
+        """Record one observation for the given labels."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+                self._series[key] = series
+            series['counts'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        """Number of observations for the given labels."""
+        series = self._series.get(self._key(labels))
+        return series['count'] if series else 0
+
+    def collect(self):
+        with self._lock:
+            items = sorted((key, {'counts': list(s['counts']), 'sum': s['sum'], 'count': s['count']})
+                           for key, s in self._series.items())
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series['counts']):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series['sum'])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {series['count']}"
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, documentation, tuple(labelnames), **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        """Get or create a counter."""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames=(),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram."""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+RERUN_DURATION = REGISTRY.histogram(
+    'oscar_rerun_duration_seconds', 'Script rerun duration per page.', ('page',))
+DB_QUERY_DURATION = REGISTRY.histogram(
+    'oscar_db_query_duration_seconds', 'DB statement latency per statement shape.', ('statement',))
+DB_CONNECTION_WAIT = REGISTRY.histogram(
+    'oscar_db_connection_wait_seconds', 'Time spent acquiring a DB connection.', ('backend',))
+BCRYPT_DURATION = REGISTRY.histogram(
+    'oscar_bcrypt_seconds', 'bcrypt hash and verify time.', ('operation',))
+SMTP_SEND_DURATION = REGISTRY.histogram(
+    'oscar_smtp_send_seconds', 'SMTP send time per message.', ('result',))
+CACHE_REQUESTS = REGISTRY.counter(
+    'oscar_cache_requests_total', 'Cache lookups by cache and result (hit/miss).', ('cache', 'result'))
+
+
+def record_cache(cache: str, hit: bool):
+    """Count a cache lookup; hit ratio is hit / (hit + miss)."""
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+_TABLE_RE = {
+    'SELECT': re.compile(r'\bFROM\s+(\w+)', re.IGNORECASE),
+    'WITH': re.compile(r'\bFROM\s+(\w+)', re.IGNORECASE),
+    'INSERT': re.compile(r'\bINTO\s+(\w+)', re.IGNORECASE),
+    'UPDATE': re.compile(r'^\s*UPDATE\s+(\w+)', re.IGNORECASE),
+    'DELETE': re.compile(r'\bFROM\s+(\w+)', re.IGNORECASE),
+}
+
+
+def statement_label(statement: str) -> str:
+    """Reduce SQL to a low-cardinality label such as 'SELECT expenses'."""
+    words = statement.split(None, 1)
+    if not words:
+        return 'OTHER'
+    verb = words[0].upper()
+    if verb in ('CREATE', 'ALTER', 'DROP', 'PRAGMA'):
+        return 'DDL'
+    pattern = _TABLE_RE.get(verb)
+    if pattern is None:
+        return 'OTHER'
+    match = pattern.search(statement)
+    return f"{verb} {match.group(1).lower()}" if match else verb
+
+
+def _on_query(statement: str, seconds: float):
+    DB_QUERY_DURATION.observe(seconds, statement=statement_label(statement))
+
+
+def _on_connection(backend: str, seconds: float):
+    DB_CONNECTION_WAIT.observe(seconds, backend=backend)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the registry at /metrics."""
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("metrics: " + format, *args)
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_failed = False
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int, host: str = '127.0.0.1') -> Optional[ThreadingHTTPServer]:
+    """
+    Start the exporter thread once per process and hook DB statements.
+
+    Returns None if the port cannot be bound (e.g. another process on the
+    host already serves it); the failure is logged once and not retried.
+    """
+    global _server, _server_failed
+    with _server_lock:
+        if _server is not None or _server_failed:
+            return _server
+
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            _server_failed = True
+            logger.error(f"Metrics endpoint disabled, cannot listen on {host}:{port}: {e}")
+            return None
+
+        from database.db_manager import add_query_listener, add_connection_listener
+        add_query_listener(_on_query)
+        add_connection_listener(_on_connection)
+
+        thread = threading.Thread(target=_server.serve_forever, name='oscar-metrics', daemon=True)
+        thread.start()
+        logger.info(f"Metrics endpoint listening on http://{host}:{_server.server_port}/metrics")
+        return _server
+
+
+def stop_metrics_server():
+    """Shut the exporter down (used by tests and benchmarks)."""
+    global _server, _server_failed
+    with _server_lock:
+        _server_failed = False
+        if _server is None:
+            return
+        from database.db_manager import remove_query_listener, remove_connection_listener
+        remove_query_listener(_on_query)
+        remove_connection_listener(_on_connection)
+        _server.shutdown()
+        _server.server_close()
+        _server = None
@@ -0,0 +1,200 @@
+"""Reminder notification dispatcher.
+
+Finds reminders whose notify_days_before window has opened, groups them
+into one digest email per user and queues the digests in the email outbox,
+whose worker sends them over a reused SMTP session. Marking the reminders
+as notified happens in the same transaction as queueing, so running the
+dispatcher again (or from several processes) never sends duplicates.
+
+Runs hourly on a background thread inside the app, or from cron:
+    python -m utils.notifications
+
+The same thread also deletes expired login sessions.
+"""
+import html
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from typing import Dict, List
+import config
+from database.db_manager import DatabaseManager
+from auth import outbox
+from auth.sessions import get_session_manager
+from utils.formatters import format_date
+from utils.recurrence import iter_occurrences, next_occurrence, to_date
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+REMINDER_DIGESTS = REGISTRY.counter(
+    'oscar_reminder_digests_total', 'Reminder digest emails by result (queued/skipped).', ('result',))
+REMINDERS_NOTIFIED = REGISTRY.counter(
+    'oscar_reminders_notified_total', 'Reminders included in a queued digest.')
+
+# Occurrence statuses set from the Upcoming list that need no notification
+CLOSED_STATUSES = ('completed', 'cancelled')
+
+
+def _describe(reminder: Dict, today) -> str:
+    due = to_date(reminder['due_date'])
+    days = (due - today).days
+    when = "today" if days == 0 else "tomorrow" if days == 1 else f"in {days} days"
+    currency = reminder.get('currency_symbol') or "$"
+    symbol = config.CURRENCIES.get(currency, currency)
+    amount = f" ({symbol}{reminder['amount']:,.2f})" if reminder.get('amount') else ""
+    return f"{reminder['title']}{amount} - {reminder['type']}, due {format_date(due)} ({when})"
+
+
+def build_digest(full_name: str, reminders: List[Dict], today) -> tuple:
+    """Subject, plain text and HTML bodies of one user's digest."""
+    count = len(reminders)
+    subject = f"{config.APP_NAME}: {count} upcoming reminder{'s' if count != 1 else ''}"
+    lines = [_describe(reminder, today) for reminder in reminders]
+
+    text = f"Hi {full_name},\n\nHere is what is coming up:\n\n" + \
+        "\n".join(f"- {line}" for line in lines) + \
+        f"\n\nOpen {config.APP_NAME}: {config.APP_URL}\n"
+    items = "".join(f"<li>{html.escape(line)}</li>" for line in lines)
+    html_body = f"""
+    <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <h2>Hi {html.escape(full_name)},</h2>
+            <p>Here is what is coming up:</p>
+            <ul>{items}</ul>
+            <p><a href="{config.APP_URL}">Open {config.APP_NAME}</a></p>
+        </body>
+    </html>
+    """
+    return subject, text, html_body
+
+
+def _plan_recurring(db: DatabaseManager, reminder: Dict, today) -> tuple:
+    """
+    Resolve the occurrence a recurring reminder's notify_on points at.
+
+    Occurrences already marked done or skipped are passed over, as are
+    past ones that were missed while nothing was dispatched.
+
+    Returns:
+        (occurrence due date, notify_on of the following occurrence), or
+        None when the next open occurrence is not due yet (notify_on is
+        moved forward to it)
+    """
+    notify_days = timedelta(days=reminder['notify_days_before'] or 0)
+    anchor, rule = reminder['due_date'], reminder['recurrence_type']
+    start = max(to_date(reminder['notify_on']) + notify_days, today)
+    overrides = db.get_occurrence_overrides(reminder['id'], start.strftime("%Y-%m-%d"))
+    due = next(day for day in iter_occurrences(anchor, rule, start, date.max)
+               if overrides.get(day.strftime("%Y-%m-%d")) not in CLOSED_STATUSES)
+    if due - notify_days > today:
+        db.advance_reminder_notification(reminder['id'], reminder['notify_on'],
+                                         (due - notify_days).strftime("%Y-%m-%d"))
+        return None
+    following = next_occurrence(anchor, rule, due) - notify_days
+    return due, following.strftime("%Y-%m-%d")
+
+
+def dispatch_due_reminders(db: DatabaseManager = None, today=None, batch_size: int = 500) -> Dict:
+    """
+    Queue one digest per user for every reminder whose notification is due.
+
+    Users are walked in id order, batch_size users at a time, so each
+    user's reminders are always handled together.
+
+    Returns:
+        Counts of queued digests, notified reminders and skipped digests
+    """
+    db = db or DatabaseManager()
+    today = today or datetime.now().date()
+    stats = {'digests': 0, 'reminders': 0, 'skipped': 0}
+    after_user_id = 0
+
+    while True:
+        due = db.get_due_notifications(today.strftime("%Y-%m-%d"), after_user_id, batch_size)
+        if not due:
+            break
+        after_user_id = due[-1]['user_id']
+        for _, group in groupby(due, key=lambda r: r['user_id']):
+            reminders, one_off, advance = [], [], {}
+            for reminder in group:
+                if reminder['recurring'] and reminder['recurrence_type']:
+                    plan = _plan_recurring(db, reminder, today)
+                    if plan is None:
+                        continue
+                    advance[reminder['id']] = (reminder['notify_on'], plan[1])
+                    reminder = {**reminder, 'due_date': plan[0].strftime("%Y-%m-%d")}
+                else:
+                    one_off.append(reminder['id'])
+                reminders.append(reminder)
+            if not reminders:
+                # Only future occurrences were found; they have been moved on
+                continue
+
+            reminders.sort(key=lambda r: r['due_date'])
+            subject, text, html_body = build_digest(reminders[0]['full_name'], reminders, today)
+            queued = db.queue_reminder_digest(reminders[0]['email'], subject, text, html_body, one_off,
+                                              datetime.now().strftime("%Y-%m-%d %H:%M:%S"), advance)
+            if queued:
+                stats['digests'] += 1
+                stats['reminders'] += len(reminders)
+                REMINDER_DIGESTS.inc(result='queued')
+                REMINDERS_NOTIFIED.inc(len(reminders))
+            else:
+                # Left for the next run
+                stats['skipped'] += 1
+                REMINDER_DIGESTS.inc(result='skipped')
+
+    if stats['digests']:
+        outbox.OUTBOX_ENQUEUED.inc(stats['digests'])
+        outbox.wake_worker()
+        logger.info(f"Queued {stats['digests']} reminder digests covering {stats['reminders']} reminders")
+    return stats
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def _run_scheduler(stop: threading.Event, interval: float):
+    while not stop.is_set():
+        try:
+            dispatch_due_reminders()
+            get_session_manager().purge_expired()
+        except Exception as e:
+            logger.error(f"Reminder dispatcher error: {e}")
+        stop.wait(interval)
+
+
+def start_reminder_scheduler() -> bool:
+    """Dispatch reminder digests and purge expired sessions every REMINDER_DISPATCH_SECONDS on a daemon thread."""
+    global _scheduler
+    if config.REMINDER_DISPATCH_SECONDS <= 0:
+        return False
+    with _scheduler_lock:
+        if _scheduler is None:
+            stop = threading.Event()
+            thread = threading.Thread(target=_run_scheduler, args=(stop, config.REMINDER_DISPATCH_SECONDS),
+                                      name='oscar-reminder-dispatcher', daemon=True)
+            thread.start()
+            _scheduler = (thread, stop)
+    return True
+
+
+def stop_reminder_scheduler():
+    """Stop the dispatcher thread (used by benchmarks and tests)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is not None:
+            thread, stop = _scheduler
+            stop.set()
+            thread.join(10)
+            _scheduler = None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(dispatch_due_reminders())
+    get_session_manager().purge_expired()
+    # Deliver what was queued before exiting
+    outbox.OutboxWorker().drain_once()
@@ -0,0 +1,241 @@
+"""Opt-in render profiler for Oscar Finance Tracker.
+
+Enable with OSCAR_PROFILE=1. Every rerun then records the wall time and DB
+statements of each render_* function, the tracemalloc peak and the number of
+st.rerun() calls, shown in a sidebar expander and optionally dumped as JSON
+lines to OSCAR_PROFILE_DIR.
+"""
+import os
+import json
+import time
+import logging
+import threading
+import functools
+import tracemalloc
+from datetime import datetime
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import streamlit as st
+import config
+from database.db_manager import add_query_listener
+
+logger = logging.getLogger(__name__)
+
+HISTORY_KEY = '_profiler_history'
+RERUN_COUNT_KEY = '_profiler_rerun_count'
+HISTORY_SIZE = 20
+
+_local = threading.local()
+_installed = False
+
+
+class RenderProfile:
+    """Timings collected during a single script run."""
+
+    def __init__(self, page: str):
+        self.page = page
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.start = time.perf_counter()
+        self.seconds = 0.0
+        self.sections: List[Dict] = []
+        self.stack: List[Dict] = []
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.statements: Dict[str, Dict] = {}
+        self.reruns = 0
+        self.peak_memory = 0
+
+    def record_query(self, statement: str, seconds: float):
+        """Attribute a DB statement to this run."""
+        self.db_queries += 1
+        self.db_seconds += seconds
+        key = ' '.join(statement.split())
+        entry = self.statements.setdefault(key, {'count': 0, 'seconds': 0.0})
+        entry['count'] += 1
+        entry['seconds'] += seconds
+
+    def to_dict(self) -> Dict:
+        """Serialize for the overlay and the JSON dump."""
+        return {
+            'page': self.page,
+            'started_at': self.started_at,
+            'seconds': round(self.seconds, 6),
+            'db_queries': self.db_queries,
+            'db_seconds': round(self.db_seconds, 6),
+            'peak_memory_kb': round(self.peak_memory / 1024, 1),
+            'reruns': self.reruns,
+            'sections': self.sections,
+            'statements': [
+                {'statement': stmt, 'count': v['count'], 'seconds': round(v['seconds'], 6)}
+                for stmt, v in sorted(self.statements.items(), key=lambda item: -item[1]['seconds'])
+            ]
+        }
+
+
+def current_profile() -> Optional[RenderProfile]:
+    """Profile of the run executing on this thread, if any."""
+    return getattr(_local, 'profile', None)
+
+
+def _on_query(statement: str, seconds: float):
+    profile = current_profile()
+    if profile:
+        profile.record_query(statement, seconds)
+
+
+def _install():
+    """Hook DB statements and st.rerun() once per process."""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    add_query_listener(_on_query)
+
+    original_rerun = st.rerun
+
+    @functools.wraps(original_rerun)
+    def counting_rerun(*args, **kwargs):
+        profile = current_profile()
+        if profile:
+            profile.reruns += 1
+        st.session_state[RERUN_COUNT_KEY] = st.session_state.get(RERUN_COUNT_KEY, 0) + 1
+        return original_rerun(*args, **kwargs)
+
+    st.rerun = counting_rerun
+
+
+@contextmanager
+def profile_section(name: str):
+    """Time a block and the DB statements it issues."""
+    profile = current_profile()
+    if not profile:
+        yield
+        return
+
+    section = {'name': name, 'depth': len(profile.stack)}
+    profile.sections.append(section)
+    profile.stack.append(section)
+    queries, db_seconds = profile.db_queries, profile.db_seconds
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        section['seconds'] = round(time.perf_counter() - start, 6)
+        section['db_queries'] = profile.db_queries - queries
+        section['db_seconds'] = round(profile.db_seconds - db_seconds, 6)
+        profile.stack.pop()
+
+
+def profiled(func):
+    """Wrap a render function in a profile section."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with profile_section(func.__name__):
+            return func(*args, **kwargs)
+    wrapper.__profiled__ = True
+    return wrapper
+
+
+def instrument_module(module):
+    """Wrap every render_* function defined in a module when profiling is on."""
+    if not config.PROFILING_ENABLED:
+        return
+    for name, value in list(vars(module).items()):
+        if (name.startswith('render_') and callable(value)
+                and getattr(value, '__module__', None) == module.__name__
+                and not getattr(value, '__profiled__', False)):
+            setattr(module, name, profiled(value))
+
+
+@contextmanager
+def profile_rerun(page: str):
+    """Profile one script run; no-op unless OSCAR_PROFILE is set."""
+    if not config.PROFILING_ENABLED:
+        yield None
+        return
+
+    _install()
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+
+    profile = RenderProfile(page)
+    _local.profile = profile
+    try:
+        yield profile
+    finally:
+        profile.seconds = time.perf_counter() - profile.start
+        profile.peak_memory = tracemalloc.get_traced_memory()[1]
+        _local.profile = None
+        _store(profile.to_dict())
+
+
+def _store(record: Dict):
+    """Keep the run in session history and append it to the JSON dump."""
+    history = st.session_state.get(HISTORY_KEY, [])
+    history.append(record)
+    st.session_state[HISTORY_KEY] = history[-HISTORY_SIZE:]
+
+    if config.PROFILE_DIR:
+        try:
+            os.makedirs(config.PROFILE_DIR, exist_ok=True)
+            path = os.path.join(config.PROFILE_DIR, f"profile-{datetime.now():%Y%m%d}.jsonl")
+            with open(path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+        except OSError as e:
+            logger.error(f"Could not write profile: {e}")
+
+
+def render_overlay():
+    """Render the collapsible timing breakdown in the sidebar."""
+    if not config.PROFILING_ENABLED:
+        return
+
+    history = st.session_state.get(HISTORY_KEY, [])
+    if not history:
+        return
+
+    latest = history[-1]
+    with st.sidebar.expander("Profiler", expanded=False):
+        st.caption(
+            f"{latest['page']} • {latest['seconds'] * 1000:.0f} ms • "
+            f"{latest['db_queries']} queries ({latest['db_seconds'] * 1000:.0f} ms) • "
+            f"peak {latest['peak_memory_kb']:,.0f} KB • "
+            f"{st.session_state.get(RERUN_COUNT_KEY, 0)} st.rerun() calls"
+        )
+
+        rows = [{
+            'section': '  ' * s['depth'] + s['name'],
+            'ms': round(s.get('seconds', 0) * 1000, 1),
+            'db': s.get('db_queries', 0),
+            'db ms': round(s.get('db_seconds', 0) * 1000, 1),
+            'other ms': round((s.get('seconds', 0) - s.get('db_seconds', 0)) * 1000, 1)
+        } for s in latest['sections']]
+        if rows:
+            st.dataframe(rows, hide_index=True, use_container_width=True)
+
+        if latest['statements']:
+            st.markdown("**Statements**")
+            st.dataframe([{
+                'statement': s['statement'][:120],
+                'count': s['count'],
+                'ms': round(s['seconds'] * 1000, 1)
+            } for s in latest['statements']], hide_index=True, use_container_width=True)
+
+        st.markdown("**Recent runs**")
+        st.dataframe([{
+            'page': r['page'],
+            'ms': round(r['seconds'] * 1000, 1),
+            'db': r['db_queries'],
+            'peak KB': r['peak_memory_kb'],
+            'reruns': r['reruns']
+        } for r in reversed(history)], hide_index=True, use_container_width=True)
+
+        st.download_button(
+            "Download JSON",
+            data=json.dumps(history, indent=2),
+            file_name="oscar-profile.json",
+            mime="application/json",
+            key="profiler_download"
+        )
@@ -0,0 +1,113 @@
+"""Recurring reminder occurrences.
+
+A recurring reminder is stored once: its due_date is the anchor of the
+series and recurrence_type the rule. Occurrences inside a date window are
+generated on demand, and the few that differ from the series (completed
+or skipped) live in reminder_overrides, so storage grows with the number
+of series rather than the number of occurrences.
+"""
+import heapq
+import calendar
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+RECURRENCE_TYPES = ["Daily", "Weekly", "Monthly", "Yearly"]
+
+_DAYS = {"Daily": 1, "Weekly": 7}
+_MONTHS = {"Monthly": 1, "Yearly": 12}
+
+
+def to_date(value) -> date:
+    """Accept a date, datetime or YYYY-MM-DD string."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def _add_months(anchor: date, months: int) -> date:
+    """Shift by whole months, clamping to the month end (Jan 31 -> Feb 28 -> Mar 31)."""
+    month_index = anchor.month - 1 + months
+    year, month = anchor.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(anchor.day, calendar.monthrange(year, month)[1]))
+
+
+def occurrence(anchor: date, recurrence_type: str, n: int) -> date:
+    """The n-th occurrence of a series (n=0 is the anchor)."""
+    if recurrence_type in _DAYS:
+        return anchor + timedelta(days=_DAYS[recurrence_type] * n)
+    return _add_months(anchor, _MONTHS[recurrence_type] * n)
+
+
+def _first_index(anchor: date, recurrence_type: str, start: date) -> int:
+    """Index of the first occurrence on or after start, without iterating."""
+    if start <= anchor:
+        return 0
+    if recurrence_type in _DAYS:
+        return -(-(start - anchor).days // _DAYS[recurrence_type])
+    step = _MONTHS[recurrence_type]
+    n = max(0, ((start.year - anchor.year) * 12 + start.month - anchor.month) // step)
+    while occurrence(anchor, recurrence_type, n) < start:
+        n += 1
+    return n
+
+
+def iter_occurrences(anchor, recurrence_type: Optional[str], start, end) -> Iterator[date]:
+    """Lazily yield the occurrence dates of a series inside [start, end]."""
+    anchor, start, end = to_date(anchor), to_date(start), to_date(end)
+    if recurrence_type not in _DAYS and recurrence_type not in _MONTHS:
+        if start <= anchor <= end:
+            yield anchor
+        return
+    n = _first_index(anchor, recurrence_type, start)
+    while True:
+        day = occurrence(anchor, recurrence_type, n)
+        if day > end:
+            return
+        yield day
+        n += 1
+
+
+def next_occurrence(anchor, recurrence_type: str, after) -> date:
+    """First occurrence strictly after the given date."""
+    return next(iter_occurrences(anchor, recurrence_type, to_date(after) + timedelta(days=1), date.max))
+
+
+def _series(reminder: Dict, start: date, end: date, overrides: Dict[Tuple[int, str], str],
+            include_overdue: bool) -> Iterator[Tuple[date, int, Dict]]:
+    if reminder.get('recurring') and reminder.get('recurrence_type'):
+        if reminder.get('status', 'pending') != 'pending':
+            return
+        for day in iter_occurrences(reminder['due_date'], reminder['recurrence_type'], start, end):
+            key = day.strftime("%Y-%m-%d")
+            yield day, reminder['id'], {**reminder, 'due_date': key, 'occurrence_date': key,
+                                        'status': overrides.get((reminder['id'], key), 'pending')}
+    else:
+        day = to_date(reminder['due_date'])
+        if day <= end and (include_overdue or day >= start):
+            key = day.strftime("%Y-%m-%d")
+            yield day, reminder['id'], {**reminder, 'due_date': key, 'occurrence_date': key}
+
+
+def expand_reminders(reminders: Iterable[Dict], start, end,
+                     overrides: Dict[Tuple[int, str], str] = None,
+                     include_overdue: bool = False) -> Iterator[Dict]:
+    """
+    Yield reminder occurrences in [start, end] ordered by date.
+
+    Recurring series are expanded lazily and merged, so taking the first few
+    items never materializes the whole window. Each occurrence carries
+    occurrence_date and its status after overrides.
+
+    Args:
+        reminders: Reminder rows (series and one-off reminders)
+        start: First day of the window
+        end: Last day of the window
+        overrides: {(reminder_id, 'YYYY-MM-DD'): status} per-occurrence statuses
+        include_overdue: Also yield one-off reminders due before start
+    """
+    start, end, overrides = to_date(start), to_date(end), overrides or {}
+    streams = [_series(reminder, start, end, overrides, include_overdue) for reminder in reminders]
+    for _, _, item in heapq.merge(*streams, key=lambda entry: entry[:2]):
+        yield item
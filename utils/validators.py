@@ -1,29 +1,153 @@
 """Input validation utilities."""
 import re
-from email_validator import validate_email as email_validate, EmailNotValidError
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Tuple
+from email_validator import validate_email as email_validate, EmailNotValidError, EmailUndeliverableError
 import logging
 import sqlite3
+import config
+from utils.metrics import record_cache
 
 logger = logging.getLogger(__name__)
 
+# Deliverability lookups run on a small pool and their answers are cached per
+# domain: {domain: (expires_at, error message or None if deliverable)}.
+# Domains are user-supplied, so the cache keeps at most DOMAIN_CACHE_SIZE
+# entries, least recently used first out.
+DOMAIN_CACHE_SIZE = 4096
+_domain_cache: 'OrderedDict[str, Tuple[float, Optional[str]]]' = OrderedDict()
+_inflight: Dict[str, Future] = {}
+_dns_lock = threading.Lock()
+_dns_pool = None
+_resolver = None
 
-def validate_email(email: str) -> tuple[bool, str, str]:
+
+def _get_resolver():
+    global _resolver
+    if _resolver is None:
+        import dns.resolver
+        resolver = dns.resolver.Resolver()
+        resolver.lifetime = config.EMAIL_DNS_TIMEOUT
+        _resolver = resolver
+    return _resolver
+
+
+def _resolve_domain(domain: str) -> Optional[str]:
+    """Look up MX (or A/AAAA fallback) records; only definite answers are cached."""
+    from email_validator.deliverability import validate_email_deliverability
+    try:
+        info = validate_email_deliverability(domain, domain, dns_resolver=_get_resolver())
+    except EmailUndeliverableError as e:
+        result = str(e)
+    except Exception as e:
+        # No resolver configuration or network: unknown, so neither reject nor cache
+        logger.warning(f"Deliverability check for {domain} failed: {e}")
+        return None
+    else:
+        if info.get('unknown-deliverability'):
+            return None
+        result = None
+    with _dns_lock:
+        _domain_cache[domain] = (time.monotonic() + config.EMAIL_DNS_CACHE_SECONDS, result)
+        _domain_cache.move_to_end(domain)
+        while len(_domain_cache) > DOMAIN_CACHE_SIZE:
+            _domain_cache.popitem(last=False)
+    return result
+
+
+def check_deliverability_async(email: str) -> Future:
+    """
+    Start (or join) a deliverability lookup for the address's domain.
+    
+    Cached answers come back as an already completed future, and concurrent
+    checks of the same domain share one lookup.
+    
+    Returns:
+        Future resolving to an error message, or None if the domain accepts
+        mail or could not be checked
+    """
+    global _dns_pool
+    domain = email.rsplit('@', 1)[-1].lower()
+    with _dns_lock:
+        cached = _domain_cache.get(domain)
+        hit = bool(cached) and cached[0] > time.monotonic()
+        record_cache('email_domain', hit=hit)
+        if cached and not hit:
+            del _domain_cache[domain]
+        if hit:
+            _domain_cache.move_to_end(domain)
+            future = Future()
+            future.set_result(cached[1])
+            return future
+        future = _inflight.get(domain)
+        if future is None:
+            if _dns_pool is None:
+                _dns_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='oscar-dns')
+            future = _dns_pool.submit(_resolve_domain, domain)
+            _inflight[domain] = future
+            future.add_done_callback(lambda _: _inflight.pop(domain, None))
+    return future
+
+
+def _check_syntax(email: str) -> tuple[bool, str, str]:
+    email = email.strip().lower()  # normalize
+    try:
+        valid = email_validate(email, check_deliverability=False)
+        return True, valid.normalized, "Valid email"
+    except EmailNotValidError as e:
+        return False, email, str(e)
+
+
+def validate_email(email: str, check_deliverability: bool = False,
+                   wait_seconds: float = 0.0) -> tuple[bool, str, str]:
     """
     Validate email address format.
     
+    Syntax checking is local and never touches the network. With
+    check_deliverability the domain's MX records are looked up in the
+    background; a domain known to reject mail fails validation, while an
+    answer that is not back within wait_seconds lets the address through
+    and the lookup finishes into the cache.
+    
     Args:
         email: Email address to validate
+        check_deliverability: Also consult DNS for the domain
+        wait_seconds: How long to wait for an uncached DNS answer (0 never blocks)
         
     Returns:
         Tuple of (is_valid, validated_email, message)
     """
-    email = email.strip().lower()  # normalize
+    return validate_emails([email], check_deliverability, wait_seconds)[0]
+
+
+def validate_emails(emails: Iterable[str], check_deliverability: bool = False,
+                    wait_seconds: float = 0.0) -> List[tuple[bool, str, str]]:
+    """
+    Validate many addresses at once, e.g. for a contact import.
     
-    try:
-        valid = email_validate(email)
-        return True, valid.email, "Valid email"
-    except EmailNotValidError as e:
-        return False, email, str(e)
+    Each distinct domain is looked up once and all lookups run in parallel,
+    so the whole batch waits at most wait_seconds for DNS.
+    
+    Returns:
+        One (is_valid, validated_email, message) tuple per input, in order
+    """
+    results = [_check_syntax(email) for email in emails]
+    if not check_deliverability:
+        return results
+    
+    lookups = {email.rsplit('@', 1)[-1]: None for valid, email, _ in results if valid}
+    for domain in lookups:
+        lookups[domain] = check_deliverability_async(domain)
+    wait(list(lookups.values()), timeout=wait_seconds)
+    
+    for i, (valid, email, _) in enumerate(results):
+        future = lookups.get(email.rsplit('@', 1)[-1]) if valid else None
+        if future and future.done() and future.result():
+            results[i] = (False, email, future.result())
+    return results
 
 def validate_phone(phone: str) -> tuple[bool, str, str]:
     """